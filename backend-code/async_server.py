@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+import aiohttp
+from aiohttp import web
+from dotenv import load_dotenv
+from database.async_pool import AsyncConnectionPool
+from database.connection_pool import get_pool
+from database.migrations import apply_migrations
+from services.async_job_queue import AsyncJobQueue
+from services.async_pipeline import AsyncDocumentPipeline, run_process_document_job_async
+from services.document_pipeline import DocumentPipeline, fail_abandoned_document_job
+from services.document_processor import close_pdf_pool
+from services.job_queue import JobQueueFullError
+from services.http_client import create_aiohttp_session, use_aiohttp_session
+from services.llm_router import get_router
+from services.metrics import REGISTRY
+from config import JOB_CONFIG, METRICS_CONFIG
+
+# asyncio serving mode for the extraction and streaming endpoints: python async_server.py
+# Run it beside server.py and route POST /api/documents/<id>/process, GET /api/jobs/<id> and
+# GET /api/llm-streams/<id>/events to it; every other route stays on the Flask app.
+
+load_dotenv()
+
+routes = web.RouteTableDef()
+
+DB_PATH = web.AppKey('db_path', str)
+ADB = web.AppKey('adb', AsyncConnectionPool)
+HTTP_SESSION = web.AppKey('http_session', aiohttp.ClientSession)
+JOB_QUEUE = web.AppKey('job_queue', AsyncJobQueue)
+
+
+def json_response(data, status=200):
+    return web.json_response(data, status=status, dumps=lambda value: json.dumps(value, default=str))
+
+
+@routes.get('/api/health')
+async def health_check(request):
+    return json_response({
+        'status': 'healthy',
+        'message': 'Async API is running',
+        'database_pool': request.app[ADB].pool.stats()
+    })
+
+
+@routes.get('/api/diagnostics')
+async def diagnostics(request):
+    try:
+        return json_response({
+            'job_queue_depth': await request.app[ADB].run(request.app[JOB_QUEUE].depth),
+            # Scoring reads each target's quota from rate_limit.db
+            'llm_targets': await asyncio.to_thread(get_router().status)
+        })
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+
+@routes.post('/api/documents/{document_id}/process')
+async def process_document(request):
+    document_id = request.match_info['document_id']
+    adb = request.app[ADB]
+    try:
+        document = await adb.fetch_one(
+            'SELECT * FROM documents WHERE document_id = ? AND status != ?',
+            (document_id, 'deleted')
+        )
+
+        if not document:
+            return json_response({'error': 'Document not found'}, 404)
+
+        if request.query.get('mode') == 'stream':
+            stream = await adb.run(DocumentPipeline(adb.pool).start_stream, document_id)
+            stream['events_url'] = f"/api/llm-streams/{stream['stream_id']}/events"
+            return json_response(stream, 202)
+
+        # Mark as queued first so a fast worker's 'processing' update is never overwritten
+        await adb.execute_query(
+            'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+            ('queued', datetime.utcnow(), document_id)
+        )
+
+        try:
+            job = await adb.run(request.app[JOB_QUEUE].enqueue, 'process_document', {'document_id': document_id})
+        except JobQueueFullError as e:
+            await adb.execute_query(
+                'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+                (document['status'], datetime.utcnow(), document_id)
+            )
+            return json_response({'error': str(e)}, 503)
+
+        return json_response(job, 202)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+
+@routes.get('/api/jobs/{job_id}')
+async def get_job(request):
+    try:
+        job = await request.app[ADB].run(request.app[JOB_QUEUE].get_job, request.match_info['job_id'])
+
+        if not job:
+            return json_response({'error': 'Job not found'}, 404)
+
+        return json_response(job)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+
+@routes.get('/api/llm-streams/{stream_id}/events')
+async def stream_events(request):
+    stream_id = request.match_info['stream_id']
+    adb = request.app[ADB]
+    try:
+        stream = await adb.fetch_one('SELECT * FROM llm_streams WHERE stream_id = ?', (stream_id,))
+
+        if not stream:
+            return json_response({'error': 'Stream not found'}, 404)
+
+        if stream['status'] == 'success':
+            # Late subscribers get the finished result straight away
+            events = _single_event({'event': 'done', 'data': stream})
+        elif stream['status'] == 'pending':
+            # Another client may have claimed it since the read above
+            if not await adb.run(DocumentPipeline(adb.pool).claim_stream, stream_id):
+                return json_response({'error': 'Stream is already running'}, 409)
+            events = AsyncDocumentPipeline(adb).stream(stream_id)
+        else:
+            return json_response({'error': f"Stream is {stream['status']}"}, 409)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'
+    })
+    await response.prepare(request)
+    async for event in events:
+        await response.write(f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+                             .encode('utf-8'))
+    await response.write_eof()
+    return response
+
+
+async def _single_event(event):
+    yield event
+
+
+async def _start(app):
+    pool = get_pool(app[DB_PATH])
+    await asyncio.to_thread(apply_migrations, pool)
+    app[ADB] = AsyncConnectionPool(pool)
+    await app[ADB].run(DocumentPipeline(pool).expire_stale_streams, JOB_CONFIG['pending_stream_seconds'],
+                       JOB_CONFIG['stale_after_seconds'])
+
+    # One keep-alive session for every Azure call this process makes
+    app[HTTP_SESSION] = create_aiohttp_session(JOB_CONFIG['async_concurrency'])
+    use_aiohttp_session(app[HTTP_SESSION])
+
+    job_queue = AsyncJobQueue(
+        app[ADB],
+        worker_count=JOB_CONFIG['async_concurrency'],
+        max_queue_size=JOB_CONFIG['max_queue_size'],
+        stale_after_seconds=JOB_CONFIG['stale_after_seconds'],
+        max_attempts=JOB_CONFIG['max_attempts']
+    )
+    job_queue.register_handler('process_document', run_process_document_job_async, fail_abandoned_document_job)
+    await job_queue.start()
+    app[JOB_QUEUE] = job_queue
+
+
+async def _stop(app):
+    await app[JOB_QUEUE].shutdown()
+    use_aiohttp_session(None)
+    await app[HTTP_SESSION].close()
+    app[ADB].close()
+    close_pdf_pool()
+
+
+def create_app(db_path=None):
+    app = web.Application()
+    app[DB_PATH] = db_path or os.getenv(
+        'DATABASE_PATH', os.path.join(os.path.dirname(__file__), 'database', 'ids.db')
+    )
+    app.add_routes(routes)
+    app.on_startup.append(_start)
+    app.on_cleanup.append(_stop)
+    return app
+
+
+if __name__ == '__main__':
+    if METRICS_CONFIG['shared']:
+        # This process has no /api/metrics of its own; the Flask app's reports it from the shared file
+        REGISTRY.share(METRICS_CONFIG['state_path'], METRICS_CONFIG['flush_seconds'])
+    web.run_app(create_app(), host='0.0.0.0', port=int(os.getenv('ASYNC_PORT', 5001)))
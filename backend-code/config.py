@@ -1,3 +1,4 @@
+import json
 import os
 
 # Azure OpenAI Configuration
@@ -20,6 +21,121 @@ OPENAI_CONFIG = {
     ),
     "max_tokens": 4000,
     "temperature": 0.7,
-    "top_p": 0.9
+    "top_p": 0.9,
+    # Documents longer than this are split and extracted chunk by chunk
+    "chunk_max_chars": int(os.environ.get("AZURE_OPENAI_CHUNK_MAX_CHARS", 60000)),
+    "chunk_concurrency": int(os.environ.get("AZURE_OPENAI_CHUNK_CONCURRENCY", 4))
 }
 
+
+# Azure OpenAI quota governor; state is shared by every worker process through state_path
+RATE_LIMIT_CONFIG = {
+    "enabled": os.environ.get("AZURE_OPENAI_RATE_LIMIT_ENABLED", "true").lower() == "true",
+    "tokens_per_minute": int(os.environ.get("AZURE_OPENAI_TPM", 80000)),
+    "requests_per_minute": int(os.environ.get("AZURE_OPENAI_RPM", 480)),
+    "max_wait_seconds": float(os.environ.get("AZURE_OPENAI_MAX_QUEUE_WAIT", 120)),
+    "max_retries": int(os.environ.get("AZURE_OPENAI_MAX_RETRIES", 5)),
+    "backoff_base_seconds": float(os.environ.get("AZURE_OPENAI_BACKOFF_BASE", 1.0)),
+    "backoff_max_seconds": float(os.environ.get("AZURE_OPENAI_BACKOFF_MAX", 60.0)),
+    "state_path": os.environ.get(
+        "AZURE_OPENAI_RATE_LIMIT_STATE",
+        os.path.join(os.path.dirname(__file__), 'database', 'rate_limit.db')
+    )
+}
+
+# Azure OpenAI deployments that calls are spread over. AZURE_OPENAI_TARGETS is a JSON list of objects
+# with "endpoint" and "deployment", and optionally "name", "api_key", "api_version", "weight",
+# "tokens_per_minute" and "requests_per_minute"; missing fields fall back to the settings above.
+# Every target must serve the model AZURE_OPENAI_DEPLOYMENT names, which results are cached under.
+ROUTING_CONFIG = {
+    "targets": json.loads(os.environ.get("AZURE_OPENAI_TARGETS") or "[{}]"),
+    # Consecutive failures after which a target gets no traffic for eject_seconds, doubling while it keeps failing
+    "eject_after_failures": int(os.environ.get("AZURE_OPENAI_EJECT_AFTER_FAILURES", 3)),
+    "eject_seconds": float(os.environ.get("AZURE_OPENAI_EJECT_SECONDS", 30)),
+    "eject_max_seconds": float(os.environ.get("AZURE_OPENAI_EJECT_MAX_SECONDS", 600)),
+    # Weight of the newest sample in each target's moving latency average
+    "latency_smoothing": float(os.environ.get("AZURE_OPENAI_LATENCY_SMOOTHING", 0.2))
+}
+
+# Shared keep-alive HTTP client for Azure OpenAI calls, and hedging of slow first bytes
+HTTP_CONFIG = {
+    "pool_size": int(os.environ.get("AZURE_OPENAI_POOL_SIZE", 32)),
+    "connect_timeout": float(os.environ.get("AZURE_OPENAI_CONNECT_TIMEOUT", 5)),
+    # Longest silence between bytes; a blocking completion sends nothing until it is finished
+    "read_timeout": float(os.environ.get("AZURE_OPENAI_READ_TIMEOUT", 120)),
+    # openai's aiohttp client takes a connect and a total timeout rather than a read timeout
+    "total_timeout": float(os.environ.get("AZURE_OPENAI_TOTAL_TIMEOUT", 300)),
+    "hedge_enabled": os.environ.get("AZURE_OPENAI_HEDGE_ENABLED", "false").lower() == "true",
+    # A call with no first byte by this percentile of recent latencies gets a duplicate
+    "hedge_percentile": float(os.environ.get("AZURE_OPENAI_HEDGE_PERCENTILE", 95)),
+    # At most this fraction of calls are hedged
+    "hedge_budget": float(os.environ.get("AZURE_OPENAI_HEDGE_BUDGET", 0.05)),
+    "hedge_min_samples": int(os.environ.get("AZURE_OPENAI_HEDGE_MIN_SAMPLES", 20))
+}
+
+# Revisions linked to a previous document only re-extract the sections that changed
+VERSIONING_CONFIG = {
+    "enabled": os.environ.get("INCREMENTAL_EXTRACTION_ENABLED", "true").lower() == "true",
+    # Small top-level sections are grouped until a unit reaches this size; each unit is one LLM call
+    "unit_min_chars": int(os.environ.get("SECTION_UNIT_MIN_CHARS", 4000)),
+    "unit_max_chars": int(os.environ.get("SECTION_UNIT_MAX_CHARS", 16000))
+}
+
+# Prometheus metrics; every process serving the API writes its samples to state_path, so
+# /api/metrics on any gunicorn worker (or the async server) reports the whole server
+METRICS_CONFIG = {
+    "shared": os.environ.get("METRICS_SHARED", "true").lower() == "true",
+    "state_path": os.environ.get(
+        "METRICS_STATE_PATH",
+        os.path.join(os.path.dirname(__file__), 'database', 'metrics.db')
+    ),
+    "flush_seconds": float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+}
+
+# Background job configuration
+JOB_CONFIG = {
+    "worker_count": int(os.environ.get("JOB_WORKER_COUNT", 2)),
+    "max_queue_size": int(os.environ.get("JOB_MAX_QUEUE_SIZE", 100)),
+    "stale_after_seconds": int(os.environ.get("JOB_STALE_AFTER_SECONDS", 900)),
+    # A job still running after this many stale recoveries keeps killing its worker and is failed instead
+    "max_attempts": int(os.environ.get("JOB_MAX_ATTEMPTS", 3)),
+    # A streamed extraction no client attached to within this long is failed on the next start
+    "pending_stream_seconds": int(os.environ.get("PENDING_STREAM_SECONDS", 600)),
+    # Jobs the asyncio server runs at once; each one waiting on Azure is a coroutine, not a thread
+    "async_concurrency": int(os.environ.get("ASYNC_JOB_CONCURRENCY", 200))
+}
+
+# LLM result cache configuration
+CACHE_CONFIG = {
+    "enabled": os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+}
+
+# Input compaction before the LLM call; set TEXT_COMPACTION_ENABLED=false to compare extraction quality
+COMPACTION_CONFIG = {
+    "enabled": os.environ.get("TEXT_COMPACTION_ENABLED", "true").lower() == "true"
+}
+
+# Document text extraction configuration
+DOCUMENT_CONFIG = {
+    "pdf_parallel": os.environ.get("PDF_PARALLEL_EXTRACTION", "true").lower() == "true",
+    "pdf_workers": int(os.environ.get("PDF_EXTRACTION_WORKERS", os.cpu_count() or 2)),
+    # Below this page count the process pool costs more than it saves
+    "pdf_parallel_min_pages": int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 40)),
+    "max_batch_files": int(os.environ.get("UPLOAD_MAX_BATCH_FILES", 50)),
+    # Chunked uploads: each chunk must fit in MAX_CONTENT_LENGTH, the whole file in max_upload_size
+    "upload_chunk_size": int(os.environ.get("UPLOAD_CHUNK_SIZE", 5 * 1024 * 1024)),
+    "max_upload_size": int(os.environ.get("UPLOAD_MAX_FILE_SIZE", 500 * 1024 * 1024)),
+    # An upload with no chunk for this long is expired and its partial file deleted
+    "upload_session_ttl_seconds": int(os.environ.get("UPLOAD_SESSION_TTL_SECONDS", 24 * 60 * 60))
+}
+
+# SQLite connection pool configuration
+DATABASE_CONFIG = {
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Negative values are KiB, per SQLite's cache_size convention
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64000)),
+    "busy_timeout_ms": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "cached_statements": int(os.environ.get("SQLITE_CACHED_STATEMENTS", 256)),
+    # Threads the asyncio server runs statements on; writes are serialised anyway, so a few suffice
+    "async_threads": int(os.environ.get("SQLITE_ASYNC_THREADS", 4))
+}
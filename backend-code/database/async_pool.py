@@ -0,0 +1,43 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config import DATABASE_CONFIG
+
+
+class AsyncConnectionPool:
+    """
+    Awaitable front for a ConnectionPool, for the asyncio server.
+
+    Statements run on a few dedicated threads, each holding its own pooled
+    connection, so coroutines never block the event loop on SQLite and never
+    queue behind other executor work. Statements that must be atomic go
+    through run() as one function using pool.transaction().
+    """
+
+    def __init__(self, pool, max_threads=None):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_threads or DATABASE_CONFIG['async_threads'],
+            thread_name_prefix='sqlite'
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) on a database thread and await its result"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def fetch_one(self, query, params=()):
+        return await self.run(self.pool.fetch_one, query, params)
+
+    async def fetch_all(self, query, params=()):
+        return await self.run(self.pool.fetch_all, query, params)
+
+    async def execute_query(self, query, params=()):
+        return await self.run(self.pool.execute_query, query, params)
+
+    async def execute_many(self, query, params_list):
+        return await self.run(self.pool.execute_many, query, params_list)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,214 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from config import DATABASE_CONFIG
+from services.metrics import DB_WRITE_SECONDS
+
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+STATEMENT_TABLE = re.compile(r'\b(?:INTO|UPDATE|FROM|TABLE(?: IF NOT EXISTS)?|ON)\s+(\w+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _statement_labels(query):
+    # Queries are module constants, so this is parsed once per statement
+    operation = query.split(None, 1)[0].upper() if query.strip() else 'UNKNOWN'
+    table = STATEMENT_TABLE.search(query)
+    return {'operation': operation, 'table': table.group(1) if table else ''}
+
+
+def get_pool(db_path):
+    """
+    Return the application-wide pool for a database file, creating it once.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        ConnectionPool: Shared pool for db_path
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(key)
+        return _pools[key]
+
+
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
+
+
+class ConnectionPool:
+    """
+    Per-thread SQLite connections that are opened once and reused.
+
+    Each thread keeps its own connection for its lifetime. When a thread
+    exits, its connection is handed to the next new thread instead of being
+    reopened, which keeps thread-per-request servers from paying connection
+    and PRAGMA setup on every request. Exposes the same fetch_one / fetch_all /
+    execute_query interface as DatabaseManager.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Serialises writers in this process so they queue here instead of spinning on SQLITE_BUSY
+        self._write_lock = threading.Lock()
+        self._owned = {}
+        self._idle = []
+        self._stats = {
+            'connections_opened': 0,
+            'connections_reused': 0,
+            'pool_hits': 0,
+            'pool_misses': 0,
+            'write_wait_ms_total': 0.0,
+            'write_wait_ms_max': 0.0,
+            'writes': 0
+        }
+
+    def fetch_one(self, query, params=()):
+        row = self._connection().execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def fetch_all(self, query, params=()):
+        return [dict(row) for row in self._connection().execute(query, params).fetchall()]
+
+    def execute_query(self, query, params=()):
+        with DB_WRITE_SECONDS.time(**_statement_labels(query)):
+            if getattr(self._local, 'in_transaction', False):
+                return self._connection().execute(query, params).rowcount
+            with self._acquire_write_lock():
+                return self._connection().execute(query, params).rowcount
+
+    def execute_many(self, query, params_list):
+        with DB_WRITE_SECONDS.time(**_statement_labels(query)):
+            if getattr(self._local, 'in_transaction', False):
+                return self._connection().executemany(query, params_list).rowcount
+            with self.transaction():
+                return self._connection().executemany(query, params_list).rowcount
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements atomically on this thread's connection.
+
+        Nested calls join the outer transaction.
+        """
+        if getattr(self._local, 'in_transaction', False):
+            yield self
+            return
+
+        connection = self._connection()
+        with self._acquire_write_lock():
+            connection.execute('BEGIN IMMEDIATE')
+            self._local.in_transaction = True
+            try:
+                yield self
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            finally:
+                self._local.in_transaction = False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_connections'] = len(self._owned) + len(self._idle)
+            stats['idle_connections'] = len(self._idle)
+        stats['write_wait_ms_total'] = round(stats['write_wait_ms_total'], 3)
+        stats['write_wait_ms_max'] = round(stats['write_wait_ms_max'], 3)
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._owned.values()) + self._idle
+            self._owned = {}
+            self._idle = []
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error as e:
+                print(f"Error closing SQLite connection: {str(e)}")
+        # Threads still holding a reference will reconnect on next use
+        self._local = threading.local()
+
+    @contextmanager
+    def _acquire_write_lock(self):
+        start = time.perf_counter()
+        with self._write_lock:
+            wait_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._stats['writes'] += 1
+                self._stats['write_wait_ms_total'] += wait_ms
+                self._stats['write_wait_ms_max'] = max(self._stats['write_wait_ms_max'], wait_ms)
+            yield
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            with self._lock:
+                self._stats['pool_hits'] += 1
+            return connection
+
+        with self._lock:
+            self._reclaim_dead_thread_connections()
+            if self._idle:
+                connection = self._idle.pop()
+                self._stats['connections_reused'] += 1
+                self._stats['pool_hits'] += 1
+            else:
+                self._stats['pool_misses'] += 1
+
+        if connection is None:
+            connection = self._open_connection()
+            with self._lock:
+                self._stats['connections_opened'] += 1
+
+        thread = threading.current_thread()
+        with self._lock:
+            self._owned[thread] = connection
+        self._local.connection = connection
+        return connection
+
+    def _reclaim_dead_thread_connections(self):
+        for thread, connection in list(self._owned.items()):
+            if not thread.is_alive():
+                del self._owned[thread]
+                self._idle.append(connection)
+
+    def _open_connection(self):
+        synchronous = DATABASE_CONFIG['synchronous'].upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid SQLITE_SYNCHRONOUS value: {synchronous}")
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # check_same_thread is off only so close_all() and reuse after a thread exits work;
+        # a connection is never used by two live threads at once
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=DATABASE_CONFIG['busy_timeout_ms'] / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=DATABASE_CONFIG['cached_statements']
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(f"PRAGMA synchronous={synchronous}")
+        connection.execute(f"PRAGMA cache_size={DATABASE_CONFIG['cache_size']}")
+        connection.execute('PRAGMA temp_store=MEMORY')
+        return connection
@@ -0,0 +1,311 @@
+from datetime import datetime
+
+
+def _sync_sow_tables(db):
+    # Imported here so applying the schema does not load the services for a database that is up to date
+    from services.sow_store import SowStore
+    print(f"Backfilled the normalized SoW tables for {SowStore(db).sync_all()} workspace(s)")
+
+
+def _backfill_search_index(db):
+    from services.search_index import SearchIndex
+    print(f"Indexed {SearchIndex(db).backfill()} document(s) for search")
+
+
+# Append new migrations at the end; never edit one that has shipped. A statement may also be a
+# function of the pool, for backfills that need application code; it runs once, like the SQL.
+MIGRATIONS = [
+    (1, 'Core tables', [
+        '''CREATE TABLE IF NOT EXISTS workspaces (
+               workspace_id TEXT PRIMARY KEY,
+               name TEXT NOT NULL,
+               project_type TEXT NOT NULL,
+               status TEXT DEFAULT 'active',
+               licenses TEXT,
+               created_by TEXT,
+               created_at TIMESTAMP,
+               updated_by TEXT,
+               updated_at TIMESTAMP
+           )''',
+        '''CREATE TABLE IF NOT EXISTS documents (
+               document_id TEXT PRIMARY KEY,
+               workspace_id TEXT,
+               document_type TEXT NOT NULL,
+               file_name TEXT NOT NULL,
+               storage_path TEXT NOT NULL,
+               status TEXT DEFAULT 'uploaded',
+               created_by TEXT,
+               created_at TIMESTAMP,
+               updated_by TEXT,
+               updated_at TIMESTAMP,
+               FOREIGN KEY (workspace_id) REFERENCES workspaces (workspace_id)
+           )''',
+        '''CREATE TABLE IF NOT EXISTS llm_streams (
+               stream_id TEXT PRIMARY KEY,
+               document_id TEXT,
+               request_payload TEXT,
+               response_payload TEXT,
+               tokens_used INTEGER,
+               latency_ms INTEGER,
+               status TEXT,
+               created_by TEXT,
+               created_at TIMESTAMP,
+               updated_by TEXT,
+               updated_at TIMESTAMP,
+               FOREIGN KEY (document_id) REFERENCES documents (document_id)
+           )'''
+    ]),
+    (2, 'Background jobs', [
+        '''CREATE TABLE IF NOT EXISTS jobs (
+               job_id TEXT PRIMARY KEY,
+               job_type TEXT NOT NULL,
+               payload TEXT,
+               status TEXT DEFAULT 'queued',
+               result TEXT,
+               error TEXT,
+               attempts INTEGER DEFAULT 0,
+               claimed_by TEXT,
+               created_at TIMESTAMP,
+               started_at TIMESTAMP,
+               completed_at TIMESTAMP,
+               updated_at TIMESTAMP
+           )''',
+        'CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)'
+    ]),
+    (3, 'LLM result cache', [
+        '''CREATE TABLE IF NOT EXISTS llm_result_cache (
+               cache_key TEXT PRIMARY KEY,
+               text_hash TEXT NOT NULL,
+               model_fingerprint TEXT NOT NULL,
+               response_payload TEXT NOT NULL,
+               tokens_used INTEGER DEFAULT 0,
+               hit_count INTEGER DEFAULT 0,
+               created_at TIMESTAMP,
+               last_hit_at TIMESTAMP
+           )''',
+        '''CREATE INDEX IF NOT EXISTS idx_llm_result_cache_fingerprint
+           ON llm_result_cache (model_fingerprint)'''
+    ]),
+    (4, 'Extracted text store', [
+        '''CREATE TABLE IF NOT EXISTS extracted_texts (
+               content_hash TEXT PRIMARY KEY,
+               extractor_version TEXT NOT NULL,
+               compressed_text BLOB NOT NULL,
+               char_count INTEGER DEFAULT 0,
+               created_at TIMESTAMP
+           )'''
+    ]),
+    (5, 'Composite indexes for hot lookups', [
+        '''CREATE INDEX IF NOT EXISTS idx_workspaces_status_created
+           ON workspaces (status, created_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_documents_workspace_status_created
+           ON documents (workspace_id, status, created_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_llm_streams_document_status_created
+           ON llm_streams (document_id, status, created_at)'''
+    ]),
+    (6, 'Keyset pagination indexes', [
+        # The id tie-breaker lets paged listings walk the index without a sort
+        'DROP INDEX IF EXISTS idx_workspaces_status_created',
+        '''CREATE INDEX IF NOT EXISTS idx_workspaces_status_created_id
+           ON workspaces (status, created_at, workspace_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_documents_workspace_created_id
+           ON documents (workspace_id, created_at, document_id)'''
+    ]),
+    (7, 'Resumable uploads', [
+        '''CREATE TABLE IF NOT EXISTS upload_sessions (
+               upload_id TEXT PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_type TEXT NOT NULL,
+               file_name TEXT NOT NULL,
+               temp_path TEXT NOT NULL,
+               total_size INTEGER NOT NULL,
+               received_bytes INTEGER DEFAULT 0,
+               status TEXT DEFAULT 'open',
+               document_id TEXT,
+               created_at TIMESTAMP,
+               updated_at TIMESTAMP
+           )''',
+        'ALTER TABLE documents ADD COLUMN content_hash TEXT'
+    ]),
+    (8, 'Normalized SoW tables', [
+        # One set of rows per workspace, mirroring its latest successful extraction;
+        # text columns compare case-insensitively so the lookup indexes match user input
+        '''CREATE TABLE IF NOT EXISTS sow_sources (
+               workspace_id TEXT PRIMARY KEY,
+               document_id TEXT,
+               stream_id TEXT,
+               updated_at TIMESTAMP
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_scope_items (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               scope TEXT NOT NULL,
+               item TEXT NOT NULL COLLATE NOCASE,
+               position INTEGER NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_modules (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               module_name TEXT NOT NULL COLLATE NOCASE,
+               description TEXT,
+               position INTEGER NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_processes (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               module_position INTEGER NOT NULL,
+               module_name TEXT NOT NULL COLLATE NOCASE,
+               process TEXT NOT NULL,
+               position INTEGER NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_business_units (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               name TEXT NOT NULL COLLATE NOCASE,
+               position INTEGER NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_stakeholders (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               business_unit_position INTEGER NOT NULL,
+               business_unit TEXT NOT NULL COLLATE NOCASE,
+               name TEXT COLLATE NOCASE,
+               designation TEXT,
+               email TEXT COLLATE NOCASE,
+               position INTEGER NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS sow_licenses (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               stream_id TEXT NOT NULL,
+               license_type TEXT NOT NULL COLLATE NOCASE,
+               license_count INTEGER,
+               count_text TEXT,
+               position INTEGER NOT NULL
+           )''',
+        'CREATE INDEX IF NOT EXISTS idx_sow_scope_items_workspace ON sow_scope_items (workspace_id, scope)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_scope_items_scope ON sow_scope_items (scope)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_modules_workspace ON sow_modules (workspace_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_modules_name ON sow_modules (module_name)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_processes_workspace ON sow_processes (workspace_id, module_position)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_processes_module ON sow_processes (module_name)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_business_units_workspace ON sow_business_units (workspace_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_business_units_name ON sow_business_units (name)',
+        '''CREATE INDEX IF NOT EXISTS idx_sow_stakeholders_workspace
+           ON sow_stakeholders (workspace_id, business_unit_position)''',
+        'CREATE INDEX IF NOT EXISTS idx_sow_stakeholders_business_unit ON sow_stakeholders (business_unit)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_stakeholders_email ON sow_stakeholders (email)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_licenses_workspace ON sow_licenses (workspace_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sow_licenses_type ON sow_licenses (license_type)'
+    ]),
+    (9, 'Full-text search', [
+        # search_entries.id is the FTS rowid, so a document's entries are found without scanning the index
+        '''CREATE TABLE IF NOT EXISTS search_entries (
+               id INTEGER PRIMARY KEY,
+               workspace_id TEXT NOT NULL,
+               document_id TEXT NOT NULL,
+               kind TEXT NOT NULL,
+               stream_id TEXT,
+               created_at TIMESTAMP
+           )''',
+        'CREATE INDEX IF NOT EXISTS idx_search_entries_document ON search_entries (document_id)',
+        'CREATE INDEX IF NOT EXISTS idx_search_entries_workspace ON search_entries (workspace_id)',
+        # workspace_id and kind are indexed too so filters narrow the MATCH instead of post-filtering it
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5 (
+               title, body, workspace_id, kind, tokenize = 'porter unicode61', prefix = '2 3'
+           )''',
+        # File name hits outrank body hits; the filter columns never affect the score
+        "INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(4.0, 1.0, 0.0, 0.0)')"
+    ]),
+    (10, 'Document versions', [
+        'ALTER TABLE documents ADD COLUMN previous_document_id TEXT',
+        'ALTER TABLE documents ADD COLUMN version INTEGER DEFAULT 1',
+        'ALTER TABLE upload_sessions ADD COLUMN previous_document_id TEXT',
+        'CREATE INDEX IF NOT EXISTS idx_documents_previous ON documents (previous_document_id)',
+        # Per-section extraction results of a document's latest run, reused by its next version
+        '''CREATE TABLE IF NOT EXISTS extraction_units (
+               document_id TEXT NOT NULL,
+               position INTEGER NOT NULL,
+               unit_key TEXT NOT NULL,
+               model_fingerprint TEXT NOT NULL,
+               result_payload TEXT NOT NULL,
+               char_count INTEGER,
+               reused_from TEXT,
+               created_at TIMESTAMP,
+               PRIMARY KEY (document_id, position)
+           )'''
+    ]),
+    (11, 'Workspace consolidation', [
+        # sources is the ordered [document_id, stream_id] list the cached result was merged from
+        '''CREATE TABLE IF NOT EXISTS workspace_consolidations (
+               workspace_id TEXT PRIMARY KEY,
+               sources TEXT NOT NULL,
+               result_payload TEXT NOT NULL,
+               updated_at TIMESTAMP
+           )'''
+    ]),
+    (12, 'Upload session expiry', [
+        'CREATE INDEX IF NOT EXISTS idx_upload_sessions_status ON upload_sessions (status, updated_at)'
+    ]),
+    # Workspaces extracted before migration 8; every later extraction syncs its own rows
+    (13, 'Backfill normalized SoW tables', [_sync_sow_tables]),
+    # Documents completed before migration 9; later ones are indexed as they complete
+    (14, 'Backfill search index', [_backfill_search_index])
+]
+
+
+def apply_migrations(db):
+    """
+    Bring the schema up to the latest version.
+
+    Each migration runs in its own transaction and is recorded in
+    schema_migrations, so it is applied exactly once even when several
+    workers start at the same time.
+
+    Args:
+        db (ConnectionPool): Pool for the application database
+
+    Returns:
+        list: Versions applied by this call
+    """
+    db.execute_query(
+        '''CREATE TABLE IF NOT EXISTS schema_migrations (
+               version INTEGER PRIMARY KEY,
+               description TEXT,
+               applied_at TIMESTAMP
+           )''',
+        ()
+    )
+
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        with db.transaction():
+            # Re-checked under the write lock in case another worker got here first
+            if db.fetch_one('SELECT version FROM schema_migrations WHERE version = ?', (version,)):
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(db)
+                else:
+                    db.execute_query(statement, ())
+            db.execute_query(
+                'INSERT INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)',
+                (version, description, datetime.utcnow())
+            )
+        applied.append(version)
+        print(f"Applied schema migration {version}: {description}")
+
+    if applied:
+        db.execute_query('PRAGMA optimize', ())
+    return applied
@@ -0,0 +1,26 @@
+import os
+from services.document_processor import preload_parsers
+from services.llm_service import get_openai
+from services.metrics import reset_shared_metrics
+from config import METRICS_CONFIG
+
+# gunicorn -c gunicorn.conf.py server:app
+# Runs in the master. server.py starts job worker threads, so it is imported per worker (no
+# --preload); the heavy parsers and openai client are loaded here once and shared copy-on-write.
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+if os.getenv('PRELOAD_DEPENDENCIES', 'true').lower() == 'true':
+    preload_parsers()
+    get_openai()
+
+
+def on_starting(server):
+    # Workers share metrics through a file; a new server starts counting from zero
+    if METRICS_CONFIG['shared']:
+        reset_shared_metrics(METRICS_CONFIG['state_path'])
+
+
+def worker_exit(server, worker):
+    from server import shutdown
+    shutdown()
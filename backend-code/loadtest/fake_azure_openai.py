@@ -0,0 +1,182 @@
+"""
+Local stand-in for the Azure OpenAI chat completions endpoint.
+
+Point the backend at it to load-test without spending real quota:
+python -m loadtest.fake_azure_openai --port 8090 --latency lognormal:1500:0.4 --tpm 200000 --error-rate 0.02
+AZURE_OPENAI_ENDPOINT=http://localhost:8090/ python server.py
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+CANNED_SOW = {
+    "scope_summary": {
+        "in_scope": ["Sales Cloud lead and opportunity management", "Service Cloud case management",
+                     "ERP integration for accounts and orders"],
+        "out_of_scope": ["CPQ", "Marketing Cloud journeys (future phase)"]
+    },
+    "modules": [
+        {"module_name": "Sales Cloud", "description": "Lead to opportunity lifecycle",
+         "processes": ["- Lead capture: web-to-lead and assignment rules",
+                       "- Opportunity management: stages, products and forecasting"]},
+        {"module_name": "Service Cloud", "description": "Case handling for the support team",
+         "processes": ["- Case management: email-to-case, queues and SLAs"]}
+    ],
+    "business_units": [
+        {"business_unit_name": "Sales", "stakeholders": [
+            {"name": "Jane Doe", "designation": "VP Sales", "email": "jane.doe@example.com"}]},
+        {"business_unit_name": "Service", "stakeholders": [
+            {"name": "John Smith", "designation": "Support Director", "email": "john.smith@example.com"}]}
+    ],
+    "salesforce_licenses": [
+        {"license_type": "Sales Cloud", "count": "50"},
+        {"license_type": "Service Cloud", "count": "25"}
+    ],
+    "assumptions": ["ERP is the system of record for orders"],
+    "validation_summary": {"json_validity": True, "issues_detected": []}
+}
+
+
+class LatencyModel:
+    """
+    Response latency drawn from 'fixed:MS', 'uniform:MIN:MAX' or 'lognormal:MEDIAN:SIGMA'.
+    """
+
+    def __init__(self, spec):
+        kind, *values = spec.split(':')
+        self.kind = kind
+        self.values = [float(value) for value in values]
+        if kind not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+
+    def sample_seconds(self):
+        if self.kind == 'fixed':
+            return self.values[0] / 1000
+        if self.kind == 'uniform':
+            return random.uniform(self.values[0], self.values[1]) / 1000
+        median, sigma = self.values
+        return random.lognormvariate(math.log(median), sigma) / 1000
+
+
+class TokenRateThrottle:
+    """
+    In-memory token bucket that answers 429 with Retry-After, like a deployment's TPM quota.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = float(tokens_per_minute)
+        self.tokens = self.capacity
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+    def take(self, tokens):
+        """Returns 0 when admitted, otherwise the seconds to wait"""
+        if not self.capacity:
+            return 0
+        with self.lock:
+            now = time.time()
+            rate = self.capacity / 60
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+            self.updated_at = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            return math.ceil((tokens - self.tokens) / rate)
+
+
+def estimate_prompt_tokens(messages):
+    return sum(len(message.get('content', '')) for message in messages) // 4
+
+
+def create_app(latency, throttle, error_rate, stream_tokens_per_second, payload=CANNED_SOW):
+    app = Flask(__name__)
+    content = f"```json\n{json.dumps(payload, indent=2)}\n```"
+    completion_tokens = len(content) // 4
+    stats = {'requests': 0, 'throttled': 0, 'injected_429': 0}
+    stats_lock = threading.Lock()
+
+    def count(key):
+        with stats_lock:
+            stats[key] += 1
+
+    def rate_limited(retry_after):
+        response = jsonify({'error': {'code': '429', 'message': 'Rate limit is exceeded. Try again later.'}})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.route('/openai/deployments/<deployment>/chat/completions', methods=['POST'])
+    def chat_completions(deployment):
+        body = request.get_json()
+        count('requests')
+        prompt_tokens = estimate_prompt_tokens(body.get('messages', []))
+
+        if random.random() < error_rate:
+            count('injected_429')
+            return rate_limited(random.randint(1, 3))
+        retry_after = throttle.take(prompt_tokens + body.get('max_tokens', completion_tokens))
+        if retry_after:
+            count('throttled')
+            return rate_limited(retry_after)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+
+        if not body.get('stream'):
+            time.sleep(latency.sample_seconds())
+            return jsonify({
+                'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()),
+                'model': deployment,
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': content}}],
+                'usage': usage
+            })
+
+        def generate():
+            # Time to first token, then the rest paced at stream_tokens_per_second
+            time.sleep(latency.sample_seconds())
+            pieces = [content[index:index + 16] for index in range(0, len(content), 16)]
+            delay = 4 / stream_tokens_per_second if stream_tokens_per_second else 0
+            for piece in pieces:
+                chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'model': deployment,
+                         'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if delay:
+                    time.sleep(delay)
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/stats', methods=['GET'])
+    def get_stats():
+        with stats_lock:
+            return jsonify(dict(stats))
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default='lognormal:1500:0.4',
+                        help="fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA (milliseconds)")
+    parser.add_argument('--tpm', type=int, default=0, help='Tokens per minute before 429s, 0 for unlimited')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with 429')
+    parser.add_argument('--stream-tps', type=float, default=200, help='Streamed tokens per second')
+    args = parser.parse_args()
+
+    app = create_app(LatencyModel(args.latency), TokenRateThrottle(args.tpm), args.error_rate, args.stream_tps)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
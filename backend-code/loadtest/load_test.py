@@ -0,0 +1,180 @@
+"""
+End-to-end load test for upload -> process -> view.
+
+Runs concurrent workspaces against a running backend (ideally pointed at
+loadtest.fake_azure_openai) and reports throughput and p50/p95/p99 latency per stage:
+python -m loadtest.load_test --base-url http://localhost:5000/api --workspaces 40 --concurrency 8
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+SAMPLE_SOW_PATH = os.path.join(os.path.dirname(__file__), '..', 'sample_sow.txt')
+STAGES = ('create_workspace', 'upload', 'process', 'view', 'total')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class LoadTest:
+    def __init__(self, base_url, file_path, mode, poll_interval, job_timeout):
+        self.base_url = base_url.rstrip('/')
+        self.file_path = file_path
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.timings = {stage: [] for stage in STAGES}
+        self.errors = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def run_workspace(self, index):
+        session = self._session()
+        started = time.perf_counter()
+        stage_times = {}
+        try:
+            with self._timed(stage_times, 'create_workspace'):
+                response = session.post(f"{self.base_url}/workspaces", json={
+                    'name': f"Load test {index}", 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+                })
+                response.raise_for_status()
+                workspace_id = response.json()['workspace_id']
+
+            with self._timed(stage_times, 'upload'):
+                with open(self.file_path, 'rb') as file:
+                    response = session.post(
+                        f"{self.base_url}/documents/upload", params={'workspace_id': workspace_id},
+                        files={'file': (os.path.basename(self.file_path), file)}
+                    )
+                response.raise_for_status()
+                document_id = response.json()['document_id']
+
+            with self._timed(stage_times, 'process'):
+                if self.mode == 'stream':
+                    self._process_streamed(session, document_id)
+                else:
+                    self._process_job(session, document_id)
+
+            with self._timed(stage_times, 'view'):
+                response = session.get(f"{self.base_url}/workspaces/{workspace_id}/data")
+                response.raise_for_status()
+                if not response.json().get('sow_data'):
+                    raise RuntimeError('Workspace has no extracted SoW data')
+
+            stage_times['total'] = time.perf_counter() - started
+            with self._lock:
+                for stage, seconds in stage_times.items():
+                    self.timings[stage].append(seconds)
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"workspace {index}: {e}")
+
+    def _process_job(self, session, document_id):
+        response = session.post(f"{self.base_url}/documents/{document_id}/process")
+        response.raise_for_status()
+        job_id = response.json()['job_id']
+        deadline = time.monotonic() + self.job_timeout
+        while time.monotonic() < deadline:
+            job = session.get(f"{self.base_url}/jobs/{job_id}").json()
+            if job['status'] == 'completed':
+                return
+            if job['status'] == 'failed':
+                raise RuntimeError(f"Job failed: {job.get('error')}")
+            time.sleep(self.poll_interval)
+        raise TimeoutError(f"Job {job_id} did not finish in {self.job_timeout}s")
+
+    def _process_streamed(self, session, document_id):
+        response = session.post(f"{self.base_url}/documents/{document_id}/process", params={'mode': 'stream'})
+        response.raise_for_status()
+        stream_id = response.json()['stream_id']
+        with session.get(f"{self.base_url}/llm-streams/{stream_id}/events", stream=True,
+                         timeout=self.job_timeout) as events:
+            events.raise_for_status()
+            for line in events.iter_lines(decode_unicode=True):
+                if line == 'event: done':
+                    return
+        raise RuntimeError('Event stream closed before done')
+
+    @staticmethod
+    @contextmanager
+    def _timed(stage_times, stage):
+        started = time.perf_counter()
+        yield
+        stage_times[stage] = time.perf_counter() - started
+
+    def report(self, elapsed, workspaces):
+        completed = len(self.timings['total'])
+        summary = {
+            'workspaces': workspaces,
+            'completed': completed,
+            'errors': len(self.errors),
+            'elapsed_s': round(elapsed, 2),
+            'throughput_per_min': round(completed / elapsed * 60, 2) if elapsed else 0.0,
+            'stages': {
+                stage: {
+                    'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+                    'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+                    'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+                    'max_ms': round(max(values) * 1000, 1) if values else 0.0
+                }
+                for stage, values in self.timings.items()
+            }
+        }
+        return summary
+
+
+def print_summary(summary, errors):
+    print(f"\n=== Load test: {summary['completed']}/{summary['workspaces']} workspaces in "
+          f"{summary['elapsed_s']}s ({summary['throughput_per_min']}/min, {summary['errors']} errors) ===")
+    print(f"{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, row in summary['stages'].items():
+        print(f"{stage:<18}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+    for error in errors[:10]:
+        print(f"  ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:5000/api')
+    parser.add_argument('--workspaces', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--file', default=SAMPLE_SOW_PATH, help='Document uploaded for every workspace')
+    parser.add_argument('--mode', choices=('job', 'stream'), default='job')
+    parser.add_argument('--poll-interval', type=float, default=0.25)
+    parser.add_argument('--job-timeout', type=float, default=300)
+    parser.add_argument('--json', help='Also write the summary to this file')
+    args = parser.parse_args()
+
+    load_test = LoadTest(args.base_url, args.file, args.mode, args.poll_interval, args.job_timeout)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(load_test.run_workspace, range(args.workspaces)))
+    summary = load_test.report(time.perf_counter() - started, args.workspaces)
+
+    print_summary(summary, load_test.errors)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(summary, file, indent=2)
+    return 1 if load_test.errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,18 +1,29 @@
 from flask import Blueprint, request, jsonify, current_app
+import hashlib
 import uuid
 import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from database.db_manager import DatabaseManager
-from services.llm_service import LLMService
-from services.document_processor import DocumentProcessor
+from database.connection_pool import get_pool
+from services.document_pipeline import DocumentPipeline
+from services.job_queue import JobQueueFullError
+from services.chunked_upload import ChunkedUploadStore, UploadOffsetError
+from services.document_versions import NEXT_VERSION_SQL, find_previous_version, version_history
+from services.text_store import HASH_READ_SIZE
+from services.metrics import STAGE_SECONDS
+from services.search_index import SearchIndex
+from services.sow_store import SowStore
+from services.workspace_consolidation import WorkspaceConsolidator
+from routes.pagination import parse_page_args, build_page
+from routes.workspace_routes import DOCUMENT_COLUMNS, DOCUMENT_KEY_COLUMNS
+from config import DOCUMENT_CONFIG
 
 document_bp = Blueprint('documents', __name__)
 
 
 def get_db():
     db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), '..', 'database', 'ids.db'))
-    return DatabaseManager(db_path)
+    return get_pool(db_path)
 
 
 def allowed_file(filename):
@@ -21,6 +32,35 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def save_upload(file, document_id):
+    filename = secure_filename(file.filename)
+    file_extension = filename.rsplit('.', 1)[1].lower()
+    storage_filename = f"{document_id}.{file_extension}"
+    
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', './uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+    storage_path = os.path.join(upload_folder, storage_filename)
+    
+    # Copy and hash in one pass instead of file.save() followed by a second read
+    digest = hashlib.sha256()
+    try:
+        with STAGE_SECONDS.time(stage='file_save'), open(storage_path, 'wb') as destination:
+            for block in iter(lambda: file.stream.read(HASH_READ_SIZE), b''):
+                destination.write(block)
+                digest.update(block)
+    except Exception:
+        remove_uploads([storage_path])
+        raise
+    return filename, storage_path, digest.hexdigest()
+
+
+def remove_uploads(storage_paths):
+    """Delete stored files that no documents row will point at"""
+    for storage_path in storage_paths:
+        if os.path.exists(storage_path):
+            os.remove(storage_path)
+
+
 @document_bp.route('/documents/upload', methods=['POST'])
 def upload_document():
     try:
@@ -49,24 +89,24 @@ def upload_document():
         if not workspace:
             return jsonify({'error': 'Workspace not found'}), 404
         
-        document_id = str(uuid.uuid4())
-        filename = secure_filename(file.filename)
-        file_extension = filename.rsplit('.', 1)[1].lower()
-        storage_filename = f"{document_id}.{file_extension}"
-        
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', './uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-        storage_path = os.path.join(upload_folder, storage_filename)
+        # A revision of an earlier upload only has its changed sections re-extracted
+        previous_document_id = request.args.get('previous_document_id')
+        if previous_document_id:
+            try:
+                find_previous_version(db, workspace_id, previous_document_id)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
-        file.save(storage_path)
+        document_id = str(uuid.uuid4())
+        filename, storage_path, content_hash = save_upload(file, document_id)
         
         db.execute_query(
-            '''INSERT INTO documents 
+            f'''INSERT INTO documents 
                (document_id, workspace_id, document_type, file_name, 
-                storage_path, status, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-            (document_id, workspace_id, document_type, filename,
-             storage_path, 'uploaded', datetime.utcnow(), datetime.utcnow())
+                storage_path, content_hash, previous_document_id, version, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, {NEXT_VERSION_SQL}, ?, ?, ?)''',
+            (document_id, workspace_id, document_type, filename, storage_path, content_hash,
+             previous_document_id, previous_document_id, 'uploaded', datetime.utcnow(), datetime.utcnow())
         )
         
         document = db.fetch_one(
@@ -79,71 +119,284 @@ def upload_document():
         return jsonify({'error': str(e)}), 500
 
 
-@document_bp.route('/documents/<document_id>/process', methods=['POST'])
-def process_document(document_id):
+@document_bp.route('/documents/upload/batch', methods=['POST'])
+def upload_documents_batch():
+    """
+    Upload several files to one workspace in a single multipart request.
+
+    Files go in repeated 'files' fields. With ?process=true every stored
+    document is queued for extraction straight away. Each file gets its own
+    entry in 'results', so one bad file does not fail the rest.
+    """
     try:
-        db = get_db()
+        files = request.files.getlist('files')
+        workspace_id = request.args.get('workspace_id')
+        document_type = request.form.get('document_type', 'SOW')
+        process = request.args.get('process', 'false').lower() == 'true'
         
-        document = db.fetch_one(
-            'SELECT * FROM documents WHERE document_id = ? AND status != ?',
-            (document_id, 'deleted')
-        )
+        if not workspace_id:
+            return jsonify({'error': 'Workspace ID is required'}), 400
         
-        if not document:
-            return jsonify({'error': 'Document not found'}), 404
+        if not files:
+            return jsonify({'error': 'No files provided'}), 400
         
-        db.execute_query(
-            'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
-            ('processing', datetime.utcnow(), document_id)
+        if len(files) > DOCUMENT_CONFIG['max_batch_files']:
+            return jsonify({'error': f"At most {DOCUMENT_CONFIG['max_batch_files']} files per batch"}), 400
+        
+        db = get_db()
+        workspace = db.fetch_one(
+            'SELECT workspace_id FROM workspaces WHERE workspace_id = ? AND status = ?',
+            (workspace_id, 'active')
         )
         
-        doc_processor = DocumentProcessor()
-        extracted_text = doc_processor.extract_text(document['storage_path'])
+        if not workspace:
+            return jsonify({'error': 'Workspace not found'}), 404
         
-        if not extracted_text:
-            db.execute_query(
-                'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
-                ('failed', datetime.utcnow(), document_id)
+        results = []
+        rows = []
+        now = datetime.utcnow()
+        try:
+            for file in files:
+                result = {'file_name': file.filename, 'document': None, 'job': None, 'error': None}
+                results.append(result)
+                if file.filename == '':
+                    result['error'] = 'No file selected'
+                    continue
+                if not allowed_file(file.filename):
+                    result['error'] = 'Invalid file type'
+                    continue
+                
+                document_id = str(uuid.uuid4())
+                filename, storage_path, content_hash = save_upload(file, document_id)
+                status = 'queued' if process else 'uploaded'
+                row = (document_id, workspace_id, document_type, filename, storage_path, content_hash,
+                       status, now, now)
+                rows.append(row)
+                result['document'] = document_id
+            
+            if rows:
+                db.execute_many(
+                    '''INSERT INTO documents 
+                       (document_id, workspace_id, document_type, file_name, 
+                        storage_path, content_hash, status, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    rows
+                )
+        except Exception:
+            # The insert is all or nothing, so none of the files written so far has a row
+            remove_uploads([row[4] for row in rows])
+            raise
+        
+        if rows:
+            documents = db.fetch_all(
+                f"SELECT * FROM documents WHERE document_id IN ({', '.join('?' * len(rows))})",
+                tuple(row[0] for row in rows)
             )
-            return jsonify({'error': 'Failed to extract text from document'}), 500
+            documents_by_id = {document['document_id']: document for document in documents}
+            for result in results:
+                if result['document']:
+                    result['document'] = documents_by_id[result['document']]
         
-        llm_service = LLMService()
-        start_time = datetime.utcnow()
+        stored = [result for result in results if result['document']]
+        queue_full = False
+        if process and stored:
+            try:
+                jobs = current_app.extensions['job_queue'].enqueue_many(
+                    'process_document',
+                    [{'document_id': result['document']['document_id']} for result in stored]
+                )
+                for result, job in zip(stored, jobs):
+                    result['job'] = job
+            except JobQueueFullError as e:
+                queue_full = True
+                db.execute_many(
+                    'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+                    [('uploaded', datetime.utcnow(), result['document']['document_id']) for result in stored]
+                )
+                for result in stored:
+                    result['document']['status'] = 'uploaded'
+                    result['error'] = str(e)
         
-        response_data = llm_service.extract_sow_insights(extracted_text)
+        failed = sum(1 for result in results if result['error'])
+        if queue_full and len(stored) == len(results):
+            # Every file is stored; only the queueing has to be retried
+            status_code = 503
+        else:
+            status_code = 201 if not failed else (400 if failed == len(results) else 207)
+        return jsonify({'workspace_id': workspace_id, 'results': results}), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def get_upload_store():
+    return ChunkedUploadStore(
+        get_db(),
+        current_app.config.get('UPLOAD_FOLDER', './uploads'),
+        DOCUMENT_CONFIG['max_upload_size'],
+        DOCUMENT_CONFIG['upload_session_ttl_seconds']
+    )
+
+
+@document_bp.route('/documents/uploads', methods=['POST'])
+def create_upload():
+    try:
+        data = request.get_json() or {}
+        workspace_id = data.get('workspace_id')
+        file_name = data.get('file_name', '')
+        total_size = data.get('total_size')
         
-        end_time = datetime.utcnow()
-        latency_ms = int((end_time - start_time).total_seconds() * 1000)
+        if not workspace_id:
+            return jsonify({'error': 'Workspace ID is required'}), 400
         
-        stream_id = str(uuid.uuid4())
+        if not allowed_file(file_name):
+            return jsonify({'error': 'Invalid file type'}), 400
         
-        db.execute_query(
-            '''INSERT INTO llm_streams 
-               (stream_id, document_id, request_payload, response_payload,
-                tokens_used, latency_ms, status, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (stream_id, document_id, extracted_text[:1000], 
-             response_data, 0, latency_ms, 'success',
-             datetime.utcnow(), datetime.utcnow())
-        )
+        if not isinstance(total_size, int) or total_size < 1:
+            return jsonify({'error': 'total_size must be a positive integer'}), 400
         
-        db.execute_query(
-            'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
-            ('completed', datetime.utcnow(), document_id)
+        db = get_db()
+        workspace = db.fetch_one(
+            'SELECT workspace_id FROM workspaces WHERE workspace_id = ? AND status = ?',
+            (workspace_id, 'active')
         )
         
-        stream = db.fetch_one(
-            'SELECT * FROM llm_streams WHERE stream_id = ?',
-            (stream_id,)
-        )
+        if not workspace:
+            return jsonify({'error': 'Workspace not found'}), 404
+        
+        previous_document_id = data.get('previous_document_id')
+        if previous_document_id:
+            try:
+                find_previous_version(db, workspace_id, previous_document_id)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
-        return jsonify(stream), 200
+        try:
+            session = get_upload_store().create(
+                workspace_id, file_name, total_size, data.get('document_type', 'SOW'), previous_document_id
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 413
+        
+        session['chunk_size'] = DOCUMENT_CONFIG['upload_chunk_size']
+        return jsonify(session), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    try:
+        session = get_upload_store().get(upload_id)
+        
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        session['chunk_size'] = DOCUMENT_CONFIG['upload_chunk_size']
+        return jsonify(session), 200
     except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/uploads/<upload_id>', methods=['PUT'])
+def append_upload_chunk(upload_id):
+    """Append the raw request body at ?offset=, which must equal received_bytes"""
+    try:
+        store = get_upload_store()
+        session = store.get(upload_id)
+        
+        if not session or session['status'] != 'open':
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        try:
+            offset = int(request.args.get('offset', ''))
+        except ValueError:
+            return jsonify({'error': 'offset is required'}), 400
+        
+        try:
+            with STAGE_SECONDS.time(stage='file_save_chunk'):
+                session = store.append(session, offset, request.stream)
+        except UploadOffsetError as e:
+            return jsonify({'error': str(e), 'received_bytes': e.expected_offset}), 409
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 413
+        
+        return jsonify(session), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    try:
+        store = get_upload_store()
+        session = store.get(upload_id)
+        
+        if not session or session['status'] != 'open':
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            document = store.finalize(session, data.get('sha256'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        return jsonify(document), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    try:
+        store = get_upload_store()
+        session = store.get(upload_id)
+        
+        if not session or session['status'] != 'open':
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        store.abort(session)
+        return jsonify({'message': 'Upload aborted'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/<document_id>/process', methods=['POST'])
+def process_document(document_id):
+    try:
         db = get_db()
+        
+        document = db.fetch_one(
+            'SELECT * FROM documents WHERE document_id = ? AND status != ?',
+            (document_id, 'deleted')
+        )
+        
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        
+        if request.args.get('mode') == 'stream':
+            stream = DocumentPipeline(db).start_stream(document_id)
+            stream['events_url'] = f"/api/llm-streams/{stream['stream_id']}/events"
+            return jsonify(stream), 202
+        
+        # Mark as queued first so a fast worker's 'processing' update is never overwritten
         db.execute_query(
             'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
-            ('failed', datetime.utcnow(), document_id)
+            ('queued', datetime.utcnow(), document_id)
         )
+        
+        try:
+            job = current_app.extensions['job_queue'].enqueue(
+                'process_document', {'document_id': document_id}
+            )
+        except JobQueueFullError as e:
+            db.execute_query(
+                'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+                (document['status'], datetime.utcnow(), document_id)
+            )
+            return jsonify({'error': str(e)}), 503
+        
+        return jsonify(job), 202
+    except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
@@ -164,18 +417,66 @@ def get_document(document_id):
         return jsonify({'error': str(e)}), 500
 
 
+@document_bp.route('/documents/<document_id>', methods=['DELETE'])
+def delete_document(document_id):
+    try:
+        db = get_db()
+        document = db.fetch_one(
+            'SELECT * FROM documents WHERE document_id = ? AND status != ?',
+            (document_id, 'deleted')
+        )
+        
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        
+        # Everything derived from the document goes with it; the other documents' results are reused as stored
+        with db.transaction():
+            db.execute_query(
+                'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+                ('deleted', datetime.utcnow(), document_id)
+            )
+            SearchIndex(db).remove_document(document_id)
+            SowStore(db).sync_workspace(document['workspace_id'])
+            WorkspaceConsolidator(db).refresh(document['workspace_id'])
+        
+        return jsonify({'message': 'Document deleted successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@document_bp.route('/documents/<document_id>/versions', methods=['GET'])
+def get_document_versions(document_id):
+    try:
+        versions = version_history(get_db(), document_id)
+        
+        if not versions:
+            return jsonify({'error': 'Document not found'}), 404
+        
+        return jsonify(versions), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @document_bp.route('/documents/workspace/<workspace_id>', methods=['GET'])
 def get_documents_by_workspace(workspace_id):
+    try:
+        limit, cursor, columns = parse_page_args(
+            request.args, DOCUMENT_COLUMNS, DOCUMENT_KEY_COLUMNS
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_db()
+        keyset = 'AND (created_at, document_id) < (?, ?)' if cursor else ''
         documents = db.fetch_all(
-            '''SELECT * FROM documents 
-               WHERE workspace_id = ? AND status != ?
-               ORDER BY created_at DESC''',
-            (workspace_id, 'deleted')
+            f'''SELECT {', '.join(columns)} FROM documents 
+               WHERE workspace_id = ? AND status != ? {keyset}
+               ORDER BY created_at DESC, document_id DESC
+               LIMIT ?''',
+            (workspace_id, 'deleted', *(cursor or ()), limit + 1)
         )
         
-        return jsonify(documents), 200
+        return jsonify(build_page(documents, limit, DOCUMENT_KEY_COLUMNS)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
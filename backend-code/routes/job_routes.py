@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify, current_app
+
+job_bp = Blueprint('jobs', __name__)
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = current_app.extensions['job_queue'].get_job(job_id)
+
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,13 +1,15 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, stream_with_context
+import json
 import os
-from database.db_manager import DatabaseManager
+from database.connection_pool import get_pool
+from services.document_pipeline import DocumentPipeline
 
 llm_bp = Blueprint('llm', __name__)
 
 
 def get_db():
     db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), '..', 'database', 'ids.db'))
-    return DatabaseManager(db_path)
+    return get_pool(db_path)
 
 
 @llm_bp.route('/llm-streams/document/<document_id>/latest', methods=['GET'])
@@ -46,3 +48,40 @@ def get_stream(stream_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+
+@llm_bp.route('/llm-streams/<stream_id>/events', methods=['GET'])
+def stream_events(stream_id):
+    try:
+        db = get_db()
+        stream = db.fetch_one(
+            'SELECT * FROM llm_streams WHERE stream_id = ?',
+            (stream_id,)
+        )
+        
+        if not stream:
+            return jsonify({'error': 'Stream not found'}), 404
+        
+        if stream['status'] == 'success':
+            # Late subscribers get the finished result straight away
+            events = iter([{'event': 'done', 'data': stream}])
+        elif stream['status'] == 'pending':
+            pipeline = DocumentPipeline(db)
+            # Another client may have claimed it since the read above
+            if not pipeline.claim_stream(stream_id):
+                return jsonify({'error': 'Stream is already running'}), 409
+            events = pipeline.stream(stream_id)
+        else:
+            return jsonify({'error': f"Stream is {stream['status']}"}), 409
+        
+        def generate():
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,26 @@
+from flask import Blueprint, Response, current_app, jsonify
+from services.llm_router import get_router
+from services.metrics import REGISTRY, JOB_QUEUE_DEPTH
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    job_queue = current_app.extensions.get('job_queue')
+    if job_queue:
+        JOB_QUEUE_DEPTH.set(job_queue.depth())
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@metrics_bp.route('/diagnostics', methods=['GET'])
+def get_diagnostics():
+    """Per-target LLM routing state and queue depth; kept off /api/health, which must not touch SQLite"""
+    try:
+        job_queue = current_app.extensions.get('job_queue')
+        return jsonify({
+            'job_queue_depth': job_queue.depth() if job_queue else None,
+            'llm_targets': get_router().status()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
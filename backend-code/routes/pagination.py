@@ -0,0 +1,75 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_page_args(args, allowed_fields, required_fields):
+    """
+    Read limit, cursor and fields= projection from request args.
+
+    Args:
+        args: request.args
+        allowed_fields (tuple): Columns a client may ask for
+        required_fields (tuple): Keyset columns, always selected because the cursor is built from them
+
+    Returns:
+        tuple: (limit, cursor, columns) where cursor is None or a list of key values
+
+    Raises:
+        ValueError: On a malformed limit, cursor or unknown field
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    if cursor is not None and len(cursor) != len(required_fields):
+        raise ValueError('Invalid cursor')
+
+    requested = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns = list(allowed_fields) if not requested else \
+        list(required_fields) + [field for field in requested if field not in required_fields]
+
+    return limit, cursor, columns
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def build_page(rows, limit, key_columns):
+    """
+    Trim the extra look-ahead row and build the next cursor from the last row.
+
+    Args:
+        rows (list): Up to limit + 1 rows in page order
+        limit (int): Page size
+        key_columns (tuple): Columns that make up the keyset, in ORDER BY order
+
+    Returns:
+        dict: {'items': rows, 'next_cursor': str or None}
+    """
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor([items[-1][column] for column in key_columns])
+    return {'items': items, 'next_cursor': next_cursor}
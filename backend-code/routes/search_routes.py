@@ -0,0 +1,47 @@
+from flask import Blueprint, request, jsonify
+import os
+import time
+from database.connection_pool import get_pool
+from routes.pagination import parse_page_args, encode_cursor
+from services.search_index import SearchIndex, SEARCH_KINDS
+
+search_bp = Blueprint('search', __name__)
+
+# Ranked results page by offset; the cursor just carries it
+SEARCH_KEY_COLUMNS = ('offset',)
+
+
+def get_db():
+    db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), '..', 'database', 'ids.db'))
+    return get_pool(db_path)
+
+
+@search_bp.route('/search', methods=['GET'])
+def search():
+    """
+    Full-text search over extracted documents and SoW sections, best matches first.
+
+    Query args: q, repeatable workspace_id and kind filters, limit and cursor.
+    """
+    kinds = request.args.getlist('kind')
+    unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+    if unknown:
+        return jsonify({'error': f"Unknown kind: {', '.join(unknown)}"}), 400
+
+    try:
+        limit, cursor, _ = parse_page_args(request.args, (), SEARCH_KEY_COLUMNS)
+        offset = int(cursor[0]) if cursor else 0
+        started = time.perf_counter()
+        hits = SearchIndex(get_db()).search(
+            request.args.get('q', ''), request.args.getlist('workspace_id'), kinds, limit + 1, offset
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'items': hits[:limit],
+        'next_cursor': encode_cursor([offset + limit]) if len(hits) > limit else None,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2)
+    }), 200
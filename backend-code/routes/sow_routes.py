@@ -0,0 +1,93 @@
+from flask import Blueprint, request, jsonify
+import os
+from database.connection_pool import get_pool
+from routes.pagination import parse_page_args, build_page
+
+sow_bp = Blueprint('sow', __name__)
+
+SOW_KEY_COLUMNS = ('id',)
+SOURCE_COLUMNS = ('id', 'workspace_id', 'document_id', 'stream_id')
+
+# Query string filter -> indexed column; text filters match case-insensitively
+SOW_RESOURCES = {
+    'licenses': {
+        'table': 'sow_licenses',
+        'columns': ('license_type', 'license_count', 'count_text', 'position'),
+        'filters': {'license_type': 'license_type', 'workspace_id': 'workspace_id'}
+    },
+    'stakeholders': {
+        'table': 'sow_stakeholders',
+        'columns': ('business_unit', 'name', 'designation', 'email', 'position'),
+        'filters': {'business_unit': 'business_unit', 'email': 'email', 'workspace_id': 'workspace_id'}
+    },
+    'business-units': {
+        'table': 'sow_business_units',
+        'columns': ('name', 'position'),
+        'filters': {'name': 'name', 'workspace_id': 'workspace_id'}
+    },
+    'modules': {
+        'table': 'sow_modules',
+        'columns': ('module_name', 'description', 'position'),
+        'filters': {'module_name': 'module_name', 'workspace_id': 'workspace_id'}
+    },
+    'processes': {
+        'table': 'sow_processes',
+        'columns': ('module_name', 'process', 'position'),
+        'filters': {'module_name': 'module_name', 'workspace_id': 'workspace_id'}
+    },
+    'scope-items': {
+        'table': 'sow_scope_items',
+        'columns': ('scope', 'item', 'position'),
+        'filters': {'scope': 'scope', 'workspace_id': 'workspace_id'}
+    }
+}
+
+
+def get_db():
+    db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), '..', 'database', 'ids.db'))
+    return get_pool(db_path)
+
+
+@sow_bp.route('/sow/<resource>', methods=['GET'])
+def get_sow_rows(resource):
+    """
+    Page through one normalized SoW table across all active workspaces,
+    e.g. /sow/licenses?license_type=Field Service or /sow/stakeholders?business_unit=Sales
+    """
+    spec = SOW_RESOURCES.get(resource)
+    if not spec:
+        return jsonify({'error': f"Unknown SoW resource: {resource}"}), 404
+
+    try:
+        limit, cursor, columns = parse_page_args(
+            request.args, SOURCE_COLUMNS + spec['columns'], SOW_KEY_COLUMNS
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        db = get_db()
+        conditions = []
+        params = ['active']
+        for arg, column in spec['filters'].items():
+            if request.args.get(arg):
+                conditions.append(f't.{column} = ?')
+                params.append(request.args[arg])
+        if cursor:
+            conditions.append('t.id > ?')
+            params.extend(cursor)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = db.fetch_all(
+            f'''SELECT {', '.join(f't.{column}' for column in columns)}, w.name AS workspace_name
+               FROM {spec['table']} t
+               JOIN workspaces w ON w.workspace_id = t.workspace_id AND w.status = ?
+               {where}
+               ORDER BY t.id
+               LIMIT ?''',
+            (*params, limit + 1)
+        )
+
+        return jsonify(build_page(rows, limit, SOW_KEY_COLUMNS)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
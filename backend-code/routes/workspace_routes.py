@@ -1,32 +1,76 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+import hashlib
 import uuid
 import json
 from datetime import datetime
-from database.db_manager import DatabaseManager
+from database.connection_pool import get_pool
+from routes.pagination import parse_page_args, build_page
+from services.search_index import SearchIndex
+from services.workspace_consolidation import WorkspaceConsolidator
 import os
 
 workspace_bp = Blueprint('workspaces', __name__)
 
+WORKSPACE_COLUMNS = ('workspace_id', 'name', 'project_type', 'status', 'licenses',
+                     'created_by', 'created_at', 'updated_by', 'updated_at')
+DOCUMENT_COLUMNS = ('document_id', 'workspace_id', 'document_type', 'file_name', 'storage_path',
+                    'content_hash', 'previous_document_id', 'version', 'status',
+                    'created_by', 'created_at', 'updated_by', 'updated_at')
+WORKSPACE_KEY_COLUMNS = ('created_at', 'workspace_id')
+DOCUMENT_KEY_COLUMNS = ('created_at', 'document_id')
+STREAM_COLUMNS = ('stream_id', 'document_id', 'request_payload', 'response_payload', 'tokens_used',
+                  'latency_ms', 'status', 'created_by', 'created_at', 'updated_by', 'updated_at')
+
+WORKSPACE_DATA_QUERY = f"""
+    SELECT {', '.join(f'w.{column}' for column in WORKSPACE_COLUMNS)},
+           {', '.join(f'd.{column} AS document__{column}' for column in DOCUMENT_COLUMNS)},
+           {', '.join(f's.{column} AS stream__{column}' for column in STREAM_COLUMNS)}
+    FROM workspaces w
+    LEFT JOIN documents d ON d.document_id = (
+        SELECT document_id FROM documents
+        WHERE workspace_id = w.workspace_id AND status = ?3
+        ORDER BY created_at DESC LIMIT 1
+    )
+    LEFT JOIN llm_streams s ON s.stream_id = (
+        SELECT stream_id FROM llm_streams
+        WHERE document_id = d.document_id AND status = ?4
+        ORDER BY created_at DESC LIMIT 1
+    )
+    WHERE w.workspace_id = ?1 AND w.status = ?2
+"""
+
 
 def get_db():
     db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), '..', 'database', 'ids.db'))
-    return DatabaseManager(db_path)
+    return get_pool(db_path)
 
 
 @workspace_bp.route('/workspaces', methods=['GET'])
 def get_workspaces():
+    try:
+        limit, cursor, columns = parse_page_args(
+            request.args, WORKSPACE_COLUMNS, WORKSPACE_KEY_COLUMNS
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_db()
+        keyset = 'AND (created_at, workspace_id) < (?, ?)' if cursor else ''
         workspaces = db.fetch_all(
-            'SELECT * FROM workspaces WHERE status = ? ORDER BY created_at DESC',
-            ('active',)
+            f'''SELECT {', '.join(columns)} FROM workspaces
+               WHERE status = ? {keyset}
+               ORDER BY created_at DESC, workspace_id DESC
+               LIMIT ?''',
+            ('active', *(cursor or ()), limit + 1)
         )
         
-        for workspace in workspaces:
+        page = build_page(workspaces, limit, WORKSPACE_KEY_COLUMNS)
+        for workspace in page['items']:
             if workspace.get('licenses'):
                 workspace['licenses'] = json.loads(workspace['licenses'])
         
-        return jsonify(workspaces), 200
+        return jsonify(page), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -56,59 +100,87 @@ def get_workspace_data(workspace_id):
     try:
         db = get_db()
         
-        # Get workspace info
+        # Workspace, its latest completed document and that document's latest
+        # successful stream in one indexed lookup
+        row = db.fetch_one(WORKSPACE_DATA_QUERY, (workspace_id, 'active', 'completed', 'success'))
+        
+        if not row:
+            return jsonify({'error': 'Workspace not found'}), 404
+        
+        workspace, document, stream = _split_workspace_data_row(row)
+        
+        etag = hashlib.sha1(':'.join(str(value) for value in (
+            workspace['workspace_id'], workspace['updated_at'],
+            document and document['document_id'], document and document['updated_at'],
+            stream and stream['stream_id'], stream and stream['updated_at']
+        )).encode('utf-8')).hexdigest()
+        
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        if workspace.get('licenses'):
+            workspace['licenses'] = json.loads(workspace['licenses'])
+        
+        # The stored payload is already JSON, so splice it in rather than parse and re-encode it
+        sow_data = stream['response_payload'] if stream and stream.get('response_payload') else 'null'
+        body = json.dumps({'workspace': workspace, 'document': document, 'stream': stream})
+        response = Response(f'{body[:-1]}, "sow_data": {sow_data}}}', mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@workspace_bp.route('/workspaces/<workspace_id>/consolidated', methods=['GET'])
+def get_workspace_consolidated(workspace_id):
+    try:
+        db = get_db()
         workspace = db.fetch_one(
-            'SELECT * FROM workspaces WHERE workspace_id = ? AND status = ?',
+            'SELECT workspace_id FROM workspaces WHERE workspace_id = ? AND status = ?',
             (workspace_id, 'active')
         )
         
         if not workspace:
             return jsonify({'error': 'Workspace not found'}), 404
         
-        if workspace.get('licenses'):
-            workspace['licenses'] = json.loads(workspace['licenses'])
+        consolidated = WorkspaceConsolidator(db).refresh(workspace_id)
         
-        # Get documents for this workspace
-        documents = db.fetch_all(
-            '''SELECT * FROM documents 
-               WHERE workspace_id = ? AND status != ?
-               ORDER BY created_at DESC''',
-            (workspace_id, 'deleted')
-        )
+        # The merged result is a function of its source streams, so they make the ETag
+        etag = hashlib.sha1(json.dumps(consolidated['sources']).encode('utf-8')).hexdigest()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
         
-        # Get the most recent completed document and its stream
-        completed_docs = [doc for doc in documents if doc['status'] == 'completed']
-        if completed_docs:
-            # Sort by created_at to get the most recent
-            most_recent_doc = sorted(completed_docs, 
-                                   key=lambda x: x['created_at'], reverse=True)[0]
-            
-            # Get the latest stream for this document
-            stream = db.fetch_one(
-                '''SELECT * FROM llm_streams 
-                   WHERE document_id = ? AND status = ?
-                   ORDER BY created_at DESC LIMIT 1''',
-                (most_recent_doc['document_id'], 'success')
-            )
-            
-            return jsonify({
-                'workspace': workspace,
-                'document': most_recent_doc,
-                'stream': stream,
-                'sow_data': json.loads(stream['response_payload']) if stream and stream.get('response_payload') else None
-            }), 200
-        else:
-            return jsonify({
-                'workspace': workspace,
-                'document': None,
-                'stream': None,
-                'sow_data': None
-            }), 200
-            
+        response = jsonify({
+            'workspace_id': workspace_id,
+            'sources': [{'document_id': document_id, 'stream_id': stream_id}
+                        for document_id, stream_id in consolidated['sources']],
+            'updated_at': consolidated['updated_at'],
+            'sow_data': consolidated['result_payload']
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _split_workspace_data_row(row):
+    workspace = {column: row[column] for column in WORKSPACE_COLUMNS}
+    document = {column: row[f"document__{column}"] for column in DOCUMENT_COLUMNS}
+    stream = {column: row[f"stream__{column}"] for column in STREAM_COLUMNS}
+    return (
+        workspace,
+        document if document['document_id'] else None,
+        stream if stream['stream_id'] else None
+    )
+
+
 @workspace_bp.route('/workspaces', methods=['POST'])
 def create_workspace():
     try:
@@ -194,10 +266,12 @@ def delete_workspace(workspace_id):
         if not workspace:
             return jsonify({'error': 'Workspace not found'}), 404
         
-        db.execute_query(
-            'UPDATE workspaces SET status = ?, updated_at = ? WHERE workspace_id = ?',
-            ('deleted', datetime.utcnow(), workspace_id)
-        )
+        with db.transaction():
+            db.execute_query(
+                'UPDATE workspaces SET status = ?, updated_at = ? WHERE workspace_id = ?',
+                ('deleted', datetime.utcnow(), workspace_id)
+            )
+            SearchIndex(db).remove_workspace(workspace_id)
         
         return jsonify({'message': 'Workspace deleted successfully'}), 200
     except Exception as e:
@@ -1,11 +1,26 @@
+import atexit
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from database.db_manager import DatabaseManager
+from database.connection_pool import get_pool, close_all_pools
+from database.migrations import apply_migrations
 from routes.workspace_routes import workspace_bp
 from routes.document_routes import document_bp
 from routes.llm_routes import llm_bp
+from routes.job_routes import job_bp
+from routes.metrics_routes import metrics_bp
+from routes.sow_routes import sow_bp
+from routes.search_routes import search_bp
+from services.job_queue import JobQueue
+from services.document_pipeline import DocumentPipeline, fail_abandoned_document_job, run_process_document_job
+from services.document_processor import close_pdf_pool
+from services.http_client import close_http_clients
+from services.llm_service import LLMService
+from services.metrics import REGISTRY
+from services.result_cache import ResultCache
+from config import JOB_CONFIG, METRICS_CONFIG
 
 load_dotenv()
 
@@ -14,21 +29,63 @@ CORS(app)
 
 app.config['DATABASE_PATH'] = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), 'database', 'ids.db'))
 app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', './uploads')
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
+# Per-request cap; files larger than this go through the chunked /documents/uploads endpoints
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_REQUEST_SIZE', 10 * 1024 * 1024))
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+if METRICS_CONFIG['shared']:
+    REGISTRY.share(METRICS_CONFIG['state_path'], METRICS_CONFIG['flush_seconds'])
+
 db_manager = DatabaseManager(app.config['DATABASE_PATH'])
 db_manager.initialize_database()
 
+db_pool = get_pool(app.config['DATABASE_PATH'])
+apply_migrations(db_pool)
+
+ResultCache(db_pool).purge_stale(LLMService().get_model_fingerprint())
+# Streams reserved with mode=stream that no client ever attached to, or that died with their worker
+DocumentPipeline(db_pool).expire_stale_streams(JOB_CONFIG['pending_stream_seconds'],
+                                               JOB_CONFIG['stale_after_seconds'])
+
+job_queue = JobQueue(
+    app.config['DATABASE_PATH'],
+    worker_count=JOB_CONFIG['worker_count'],
+    max_queue_size=JOB_CONFIG['max_queue_size'],
+    stale_after_seconds=JOB_CONFIG['stale_after_seconds'],
+    max_attempts=JOB_CONFIG['max_attempts']
+)
+job_queue.register_handler('process_document', run_process_document_job, fail_abandoned_document_job)
+job_queue.start()
+app.extensions['job_queue'] = job_queue
+
+
+def shutdown():
+    job_queue.shutdown(wait=False)
+    close_all_pools()
+    close_http_clients()
+    close_pdf_pool()
+
+
+# gunicorn.conf.py also calls shutdown() from the worker_exit hook
+atexit.register(shutdown)
+
 app.register_blueprint(workspace_bp, url_prefix='/api')
 app.register_blueprint(document_bp, url_prefix='/api')
 app.register_blueprint(llm_bp, url_prefix='/api')
+app.register_blueprint(job_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
+app.register_blueprint(sow_bp, url_prefix='/api')
+app.register_blueprint(search_bp, url_prefix='/api')
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'message': 'API is running'}), 200
+    return jsonify({
+        'status': 'healthy',
+        'message': 'API is running',
+        'database_pool': db_pool.stats()
+    }), 200
 
 
 @app.errorhandler(404)
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import traceback
+from services.job_queue import JobQueue
+
+
+class AsyncJobQueue(JobQueue):
+    """
+    JobQueue whose handlers are coroutines, run as tasks on the event loop.
+
+    Jobs are stored, claimed and recovered exactly like JobQueue's, so the
+    two can share a jobs table. worker_count caps how many run at once, and
+    a job waiting on Azure holds no thread.
+    """
+
+    def __init__(self, adb, worker_count=200, max_queue_size=100, stale_after_seconds=900, max_attempts=3):
+        super().__init__(adb.pool.db_path, worker_count, max_queue_size, stale_after_seconds, max_attempts)
+        self.adb = adb
+        self._loop = None
+        self._ready = None
+        self._tasks = []
+
+    def register_handler(self, job_type, handler, on_abandoned=None):
+        """
+        Register the coroutine function that runs jobs of a given type.
+
+        Args:
+            job_type (str): Job type name stored on the job row
+            handler (callable): Awaited as handler(adb, payload) with the
+                AsyncConnectionPool; its result must be JSON serializable
+            on_abandoned (callable): Plain function, called on a database
+                thread as on_abandoned(db, payload) like JobQueue's
+        """
+        super().register_handler(job_type, handler, on_abandoned)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Semaphore(0)
+        await self.adb.run(self._recover_jobs)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def shutdown(self):
+        # Jobs cut off here stay 'running' and are recovered once they go stale
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _dispatch(self, job_id):
+        self._pending.put(job_id)
+        # enqueue() and recovery run on database threads
+        self._loop.call_soon_threadsafe(self._ready.release)
+
+    async def _worker(self):
+        while True:
+            await self._ready.acquire()
+            job_id = self._pending.get_nowait()
+            try:
+                await self._arun_job(job_id)
+            except Exception as e:
+                print(f"Error running job {job_id}: {str(e)}")
+                traceback.print_exc()
+
+    async def _arun_job(self, job_id):
+        job = await self.adb.run(self._claim, self.adb.pool, job_id)
+        if not job:
+            return
+
+        try:
+            handler = self._handlers[job['job_type']]
+            result = await handler(self.adb, json.loads(job['payload'] or '{}'))
+            await self.adb.run(self._complete_job, self.adb.pool, job_id, result)
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            await self.adb.run(self._fail_job, self.adb.pool, job_id, e)
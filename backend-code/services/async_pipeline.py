@@ -0,0 +1,151 @@
+import asyncio
+import uuid
+from datetime import datetime
+from services.document_pipeline import DocumentPipeline, ExtractionFailedError
+from services.llm_service import LLMService
+
+
+class AsyncDocumentPipeline:
+    """
+    DocumentPipeline for the asyncio server.
+
+    Azure calls are awaited on the event loop. Statements run on the
+    AsyncConnectionPool's threads and text extraction on the default
+    executor, so an extraction waiting on the model holds no thread. Rows
+    are written by DocumentPipeline's own methods, so both servers produce
+    the same llm_streams, documents and derived rows.
+    """
+
+    def __init__(self, adb):
+        self.adb = adb
+        self.pipeline = DocumentPipeline(adb.pool)
+
+    async def process(self, document_id):
+        """
+        Async DocumentPipeline.process.
+
+        Returns:
+            dict: The llm_streams row written for this run
+        """
+        document = await self.adb.run(self.pipeline.get_document, document_id)
+        await self.adb.run(self.pipeline.set_status, document_id, 'processing')
+
+        try:
+            raw_text, extracted_text = await asyncio.to_thread(self.pipeline.prepare_text, document)
+            start_time = datetime.utcnow()
+
+            response_data, tokens_used = await self._run_extraction(document, extracted_text)
+
+            stream_id = str(uuid.uuid4())
+            await self.adb.run(self.pipeline.save_result, document, stream_id, raw_text, extracted_text,
+                               response_data, tokens_used, start_time, new_stream=True)
+        except ExtractionFailedError:
+            raise
+        except Exception:
+            await self.adb.run(self.pipeline.fail, document_id)
+            raise
+
+        return await self.adb.run(self.pipeline.get_stream, stream_id)
+
+    async def stream(self, stream_id):
+        """
+        Async DocumentPipeline.stream, as an async generator of the same events.
+
+        The stream must already be claimed with DocumentPipeline.claim_stream().
+        """
+        stream = await self.adb.run(self.pipeline.get_stream, stream_id)
+        document_id = stream['document_id']
+        await self.adb.run(self.pipeline.set_status, document_id, 'processing')
+        completed = False
+
+        try:
+            document = await self.adb.run(self.pipeline.get_document, document_id)
+            raw_text, extracted_text = await asyncio.to_thread(self.pipeline.prepare_text, document)
+            start_time = datetime.utcnow()
+            response_data = None
+            tokens_used = 0
+
+            async for event in self._stream_extraction(document, extracted_text):
+                if event['event'] == 'result':
+                    response_data = event['data']
+                    tokens_used = event['tokens_used']
+                else:
+                    yield event
+
+            await self.adb.run(self.pipeline.save_result, document, stream_id, raw_text, extracted_text,
+                               response_data, tokens_used, start_time, new_stream=False)
+            completed = True
+
+            yield {"event": "done", "data": await self.adb.run(self.pipeline.get_stream, stream_id)}
+        except ExtractionFailedError as e:
+            # save_result has already marked the stream and the document failed
+            completed = True
+            yield {"event": "error", "data": {"error": str(e), "stream": await self.adb.run(self.pipeline.get_stream, stream_id)}}
+        except Exception as e:
+            await self.adb.run(self.pipeline.fail, document_id, stream_id)
+            completed = True
+            yield {"event": "error", "data": {"error": str(e), "stream": await self.adb.run(self.pipeline.get_stream, stream_id)}}
+        finally:
+            # Also reached when the client disconnects and the handler is cancelled
+            if not completed:
+                await self.adb.run(self.pipeline.fail, document_id, stream_id)
+
+    async def _stream_extraction(self, document, extracted_text):
+        llm_service = LLMService()
+        extractor, plan = await self.adb.run(self.pipeline.plan_units, document, extracted_text, llm_service)
+        if plan and extractor.reuses_units(plan):
+            response_data = await self._extract_units(extractor, document, plan, llm_service)
+            for event in self.pipeline.result_events(response_data, llm_service.tokens_used):
+                yield event
+            return
+
+        cache, model_fingerprint = self.pipeline.open_cache(llm_service)
+
+        cached = await self.adb.run(self.pipeline.cache_lookup, cache, extracted_text, model_fingerprint)
+        if cached:
+            await self.adb.run(self.pipeline.save_units, extractor, document, plan, cached['response_payload'])
+            for event in self.pipeline.result_events(cached['response_payload'], 0):
+                yield event
+            return
+
+        async for event in llm_service.astream_sow_insights(extracted_text):
+            if event['event'] == 'result':
+                await self.adb.run(self.pipeline.cache_put, cache, extracted_text, model_fingerprint,
+                                   event['data'], llm_service)
+                await self.adb.run(self.pipeline.save_units, extractor, document, plan, event['data'])
+                event = dict(event, tokens_used=llm_service.tokens_used)
+            yield event
+
+    async def _run_extraction(self, document, extracted_text):
+        """
+        Returns:
+            tuple: (response JSON string, tokens spent; 0 on a cache hit)
+        """
+        llm_service = LLMService()
+        extractor, plan = await self.adb.run(self.pipeline.plan_units, document, extracted_text, llm_service)
+        if plan and extractor.reuses_units(plan):
+            response_data = await self._extract_units(extractor, document, plan, llm_service)
+            return response_data, llm_service.tokens_used
+
+        cache, model_fingerprint = self.pipeline.open_cache(llm_service)
+
+        cached = await self.adb.run(self.pipeline.cache_lookup, cache, extracted_text, model_fingerprint)
+        if cached:
+            await self.adb.run(self.pipeline.save_units, extractor, document, plan, cached['response_payload'])
+            return cached['response_payload'], 0
+
+        response_data = await llm_service.aextract_sow_insights(extracted_text)
+        await self.adb.run(self.pipeline.cache_put, cache, extracted_text, model_fingerprint,
+                           response_data, llm_service)
+        await self.adb.run(self.pipeline.save_units, extractor, document, plan, response_data)
+        return response_data, llm_service.tokens_used
+
+    async def _extract_units(self, extractor, document, plan, llm_service):
+        response_data, results = await llm_service.aextract_sow_units(plan['units'], plan['known_results'])
+        await self.adb.run(extractor.save, document, plan, results)
+        return response_data
+
+
+async def run_process_document_job_async(adb, payload):
+    stream = await AsyncDocumentPipeline(adb).process(payload['document_id'])
+    return {'stream_id': stream['stream_id'], 'document_id': stream['document_id']}
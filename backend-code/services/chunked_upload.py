@@ -0,0 +1,249 @@
+import hashlib
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from werkzeug.utils import secure_filename
+
+from services.text_store import HASH_READ_SIZE
+from services.document_versions import NEXT_VERSION_SQL
+
+# Running SHA-256 per open upload, keyed by upload_id and only valid at its offset
+_hashers = {}
+_hashers_lock = threading.Lock()
+# Serialises chunks for the same upload so two retries never write the file at once
+_upload_locks = {}
+
+
+class UploadOffsetError(Exception):
+    def __init__(self, expected_offset):
+        super().__init__(f"Chunk must start at offset {expected_offset}")
+        self.expected_offset = expected_offset
+
+
+class ChunkedUploadStore:
+    """
+    Resumable uploads written to disk one chunk at a time.
+
+    Each chunk is streamed from the request straight into the partial file
+    while the running SHA-256 is updated in the same pass, so memory stays
+    flat whatever the file size. received_bytes in upload_sessions is the
+    resume point; a chunk that dies half-way is truncated away on retry.
+    Sessions that receive nothing for session_ttl_seconds are expired by
+    the next create().
+    """
+
+    def __init__(self, db, upload_folder, max_upload_size, session_ttl_seconds):
+        self.db = db
+        self.upload_folder = upload_folder
+        self.partial_folder = os.path.join(upload_folder, 'partial')
+        self.max_upload_size = max_upload_size
+        self.session_ttl_seconds = session_ttl_seconds
+
+    def create(self, workspace_id, file_name, total_size, document_type='SOW', previous_document_id=None):
+        if total_size > self.max_upload_size:
+            raise ValueError(f"File exceeds the {self.max_upload_size} byte upload limit")
+
+        self.expire_stale()
+
+        upload_id = str(uuid.uuid4())
+        os.makedirs(self.partial_folder, exist_ok=True)
+        temp_path = os.path.join(self.partial_folder, f"{upload_id}.part")
+        open(temp_path, 'wb').close()
+
+        self.db.execute_query(
+            '''INSERT INTO upload_sessions
+               (upload_id, workspace_id, document_type, file_name, temp_path, total_size,
+                received_bytes, status, previous_document_id, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (upload_id, workspace_id, document_type, secure_filename(file_name), temp_path,
+             total_size, 0, 'open', previous_document_id, datetime.utcnow(), datetime.utcnow())
+        )
+        return self.get(upload_id)
+
+    def get(self, upload_id):
+        return self.db.fetch_one(
+            'SELECT * FROM upload_sessions WHERE upload_id = ?',
+            (upload_id,)
+        )
+
+    def append(self, session, offset, stream):
+        """
+        Write one chunk at offset from a file-like stream.
+
+        Raises:
+            UploadOffsetError: If offset is not the session's received_bytes
+            ValueError: If the chunk would run past total_size
+        """
+        if offset != session['received_bytes']:
+            raise UploadOffsetError(session['received_bytes'])
+
+        upload_id = session['upload_id']
+        with _hashers_lock:
+            upload_lock = _upload_locks.setdefault(upload_id, threading.Lock())
+        if not upload_lock.acquire(blocking=False):
+            raise UploadOffsetError(session['received_bytes'])
+        try:
+            return self._write_chunk(session, offset, stream)
+        finally:
+            upload_lock.release()
+
+    def _write_chunk(self, session, offset, stream):
+        upload_id = session['upload_id']
+        hasher = self._hasher_at(session)
+        written = 0
+        with open(session['temp_path'], 'r+b') as file:
+            file.seek(offset)
+            file.truncate()
+            for block in iter(lambda: stream.read(HASH_READ_SIZE), b''):
+                written += len(block)
+                if offset + written > session['total_size']:
+                    raise ValueError('Chunk runs past the declared file size')
+                file.write(block)
+                hasher.update(block)
+
+        received_bytes = offset + written
+        updated = self.db.execute_query(
+            '''UPDATE upload_sessions SET received_bytes = ?, updated_at = ?
+               WHERE upload_id = ? AND received_bytes = ? AND status = ?''',
+            (received_bytes, datetime.utcnow(), upload_id, offset, 'open')
+        )
+        if not updated:
+            # Another request moved the session on while this chunk was being written
+            raise UploadOffsetError(self.get(upload_id)['received_bytes'])
+
+        with _hashers_lock:
+            _hashers[upload_id] = (received_bytes, hasher)
+        return self.get(upload_id)
+
+    def finalize(self, session, expected_sha256=None):
+        """
+        Turn a fully received upload into a document row.
+
+        Raises:
+            ValueError: If bytes are missing or the hash does not match
+        """
+        if session['received_bytes'] != session['total_size']:
+            raise ValueError(
+                f"Upload incomplete: {session['received_bytes']} of {session['total_size']} bytes received"
+            )
+
+        content_hash = self._hasher_at(session).hexdigest()
+        if expected_sha256 and expected_sha256.lower() != content_hash:
+            raise ValueError('Content hash does not match the uploaded bytes')
+
+        document_id = str(uuid.uuid4())
+        file_extension = session['file_name'].rsplit('.', 1)[1].lower()
+        storage_path = os.path.join(self.upload_folder, f"{document_id}.{file_extension}")
+
+        try:
+            with self.db.transaction():
+                self.db.execute_query(
+                    f'''INSERT INTO documents
+                        (document_id, workspace_id, document_type, file_name,
+                         storage_path, content_hash, previous_document_id, version, status, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, {NEXT_VERSION_SQL}, ?, ?, ?)''',
+                    (document_id, session['workspace_id'], session['document_type'], session['file_name'],
+                     storage_path, content_hash, session['previous_document_id'], session['previous_document_id'],
+                     'uploaded', datetime.utcnow(), datetime.utcnow())
+                )
+                self.db.execute_query(
+                    '''UPDATE upload_sessions SET status = ?, document_id = ?, updated_at = ?
+                       WHERE upload_id = ?''',
+                    ('completed', document_id, datetime.utcnow(), session['upload_id'])
+                )
+                # Moved last, so a failed insert leaves the part file where a retried complete expects it
+                os.replace(session['temp_path'], storage_path)
+        except Exception:
+            # The commit itself failed after the move: the session is still open, so put the file back
+            if os.path.exists(storage_path):
+                os.replace(storage_path, session['temp_path'])
+            raise
+
+        self._forget(session['upload_id'])
+        return self.db.fetch_one(
+            'SELECT * FROM documents WHERE document_id = ?',
+            (document_id,)
+        )
+
+    def abort(self, session):
+        self.db.execute_query(
+            'UPDATE upload_sessions SET status = ?, updated_at = ? WHERE upload_id = ?',
+            ('aborted', datetime.utcnow(), session['upload_id'])
+        )
+        self._forget(session['upload_id'])
+        if os.path.exists(session['temp_path']):
+            os.remove(session['temp_path'])
+
+    def expire_stale(self):
+        """
+        Expire open uploads that received nothing for session_ttl_seconds.
+
+        Their partial files are deleted and this process's running hashes
+        and chunk locks for them, or for sessions another worker finished
+        or expired, are dropped.
+
+        Returns:
+            int: Number of sessions expired
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.session_ttl_seconds)
+        stale = self.db.fetch_all(
+            'SELECT upload_id, temp_path FROM upload_sessions WHERE status = ? AND updated_at < ?',
+            ('open', cutoff)
+        )
+        expired = 0
+        for session in stale:
+            # Conditional, so a chunk that landed since the read keeps its session
+            if not self.db.execute_query(
+                '''UPDATE upload_sessions SET status = ?, updated_at = ?
+                   WHERE upload_id = ? AND status = ? AND updated_at < ?''',
+                ('expired', datetime.utcnow(), session['upload_id'], 'open', cutoff)
+            ):
+                continue
+            expired += 1
+            self._forget(session['upload_id'])
+            if os.path.exists(session['temp_path']):
+                os.remove(session['temp_path'])
+
+        self._forget_closed()
+        if expired:
+            print(f"Expired {expired} abandoned upload(s)")
+        return expired
+
+    def _forget_closed(self):
+        with _hashers_lock:
+            upload_ids = list(set(_hashers) | set(_upload_locks))
+        if not upload_ids:
+            return
+        rows = self.db.fetch_all(
+            f'''SELECT upload_id FROM upload_sessions
+                WHERE upload_id IN ({', '.join('?' for _ in upload_ids)}) AND status = ?''',
+            upload_ids + ['open']
+        )
+        open_ids = {row['upload_id'] for row in rows}
+        for upload_id in upload_ids:
+            if upload_id not in open_ids:
+                self._forget(upload_id)
+
+    def _hasher_at(self, session):
+        with _hashers_lock:
+            cached = _hashers.get(session['upload_id'])
+        if cached and cached[0] == session['received_bytes']:
+            return cached[1].copy()
+
+        # Restarted process or another worker took the earlier chunks: rehash what is on disk
+        hasher = hashlib.sha256()
+        remaining = session['received_bytes']
+        with open(session['temp_path'], 'rb') as file:
+            while remaining:
+                block = file.read(min(HASH_READ_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    def _forget(self, upload_id):
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+            _upload_locks.pop(upload_id, None)
@@ -0,0 +1,431 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from services.llm_service import LLMService
+from services.document_processor import DocumentProcessor, EXTRACTOR_VERSION
+from services.result_cache import ResultCache
+from services.text_store import ExtractedTextStore
+from services.text_compactor import compact_text
+from services.sow_store import SowStore
+from services.search_index import SearchIndex
+from services.incremental_extraction import IncrementalExtractor
+from services.workspace_consolidation import WorkspaceConsolidator
+from services.metrics import DOCUMENTS_PROCESSED, RESULT_CACHE_LOOKUPS, STAGE_SECONDS
+from config import CACHE_CONFIG, COMPACTION_CONFIG, VERSIONING_CONFIG
+
+
+class ExtractionFailedError(Exception):
+    """The LLM gave no usable result; the stream and document have been marked failed"""
+    pass
+
+
+class DocumentPipeline:
+    def __init__(self, db):
+        self.db = db
+
+    def process(self, document_id):
+        """
+        Extract text from a stored document and run the SoW extraction on it.
+
+        Args:
+            document_id (str): ID of the document to process
+
+        Returns:
+            dict: The llm_streams row written for this run
+        """
+        document = self.get_document(document_id)
+        self.set_status(document_id, 'processing')
+
+        try:
+            raw_text, extracted_text = self.prepare_text(document)
+
+            start_time = datetime.utcnow()
+
+            response_data, tokens_used = self._run_extraction(document, extracted_text)
+
+            stream_id = str(uuid.uuid4())
+            self.save_result(document, stream_id, raw_text, extracted_text, response_data, tokens_used,
+                             start_time, new_stream=True)
+        except ExtractionFailedError:
+            # save_result has already marked the stream and the document failed
+            raise
+        except Exception:
+            self.fail(document_id)
+            raise
+
+        return self.get_stream(stream_id)
+
+    def start_stream(self, document_id):
+        """
+        Reserve an llm_streams row for a streamed extraction.
+
+        The extraction itself runs when a client attaches to stream().
+
+        Args:
+            document_id (str): ID of the document to process
+
+        Returns:
+            dict: The pending llm_streams row
+        """
+        self.get_document(document_id)
+
+        stream_id = str(uuid.uuid4())
+        self.db.execute_query(
+            '''INSERT INTO llm_streams
+               (stream_id, document_id, tokens_used, latency_ms, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (stream_id, document_id, 0, 0, 'pending', datetime.utcnow(), datetime.utcnow())
+        )
+        self.set_status(document_id, 'queued')
+
+        return self.get_stream(stream_id)
+
+    def claim_stream(self, stream_id):
+        """
+        Move a pending stream to 'streaming' for the one client allowed to run it.
+
+        Returns:
+            bool: False if another client claimed it first or it is no longer pending
+        """
+        claimed = self.db.execute_query(
+            'UPDATE llm_streams SET status = ?, updated_at = ? WHERE stream_id = ? AND status = ?',
+            ('streaming', datetime.utcnow(), stream_id, 'pending')
+        )
+        return claimed == 1
+
+    def expire_stale_streams(self, pending_seconds, stale_after_seconds):
+        """
+        Fail streams no client attached to, or whose process died mid-stream.
+
+        Documents they left 'queued' or 'processing' are failed too, unless a
+        live stream or a job still holds them, so they can be processed again.
+
+        Args:
+            pending_seconds (int): Age after which an unclaimed reservation is abandoned
+            stale_after_seconds (int): Age after which a 'streaming' row is abandoned
+
+        Returns:
+            int: Number of streams expired
+        """
+        now = datetime.utcnow()
+        abandoned = '(status = ? AND created_at < ?) OR (status = ? AND updated_at < ?)'
+        params = ('pending', now - timedelta(seconds=pending_seconds),
+                  'streaming', now - timedelta(seconds=stale_after_seconds))
+        with self.db.transaction():
+            self.db.execute_query(
+                f'''UPDATE documents SET status = ?, updated_at = ?
+                    WHERE status IN (?, ?)
+                      AND document_id IN (SELECT document_id FROM llm_streams WHERE {abandoned})
+                      AND document_id NOT IN (
+                          SELECT document_id FROM llm_streams WHERE status IN (?, ?) AND NOT ({abandoned})
+                      )
+                      AND document_id NOT IN (
+                          SELECT json_extract(payload, '$.document_id') FROM jobs WHERE status IN (?, ?)
+                      )''',
+                ('failed', now, 'queued', 'processing') + params + ('pending', 'streaming') + params
+                + ('queued', 'running')
+            )
+            count = self.db.execute_query(
+                f'UPDATE llm_streams SET status = ?, updated_at = ? WHERE {abandoned}',
+                ('failed', now) + params
+            )
+        if count:
+            print(f"Expired {count} abandoned stream(s)")
+        return count
+
+    def stream(self, stream_id):
+        """
+        Run a claimed streamed extraction, yielding progress as it happens.
+
+        Args:
+            stream_id (str): ID of an llm_streams row won with claim_stream()
+
+        Yields:
+            dict: 'token' and 'section' events, then a 'done' event with the
+                completed llm_streams row, or an 'error' event with the
+                reason and the failed row when the extraction failed
+        """
+        stream = self.get_stream(stream_id)
+        document_id = stream['document_id']
+        self.set_status(document_id, 'processing')
+        completed = False
+
+        try:
+            document = self.get_document(document_id)
+            raw_text, extracted_text = self.prepare_text(document)
+            start_time = datetime.utcnow()
+            response_data = None
+            tokens_used = 0
+
+            for event in self._stream_extraction(document, extracted_text):
+                if event['event'] == 'result':
+                    response_data = event['data']
+                    tokens_used = event['tokens_used']
+                else:
+                    yield event
+
+            self.save_result(document, stream_id, raw_text, extracted_text, response_data, tokens_used,
+                             start_time, new_stream=False)
+            completed = True
+
+            yield {"event": "done", "data": self.get_stream(stream_id)}
+        except ExtractionFailedError as e:
+            # save_result has already marked the stream and the document failed
+            completed = True
+            yield {"event": "error", "data": {"error": str(e), "stream": self.get_stream(stream_id)}}
+        except Exception as e:
+            # An unreadable file or a database error; the client still gets a final event
+            self.fail(document_id, stream_id)
+            completed = True
+            yield {"event": "error", "data": {"error": str(e), "stream": self.get_stream(stream_id)}}
+        finally:
+            # Also reached when the client disconnects and the generator is closed
+            if not completed:
+                self.fail(document_id, stream_id)
+
+    def _stream_extraction(self, document, extracted_text):
+        llm_service = LLMService()
+        extractor, plan = self.plan_units(document, extracted_text, llm_service)
+        if plan and extractor.reuses_units(plan):
+            # Only the changed units are extracted, so there is no single completion to stream
+            response_data = extractor.extract(document, plan, llm_service)
+            yield from self.result_events(response_data, llm_service.tokens_used)
+            return
+
+        cache, model_fingerprint = self.open_cache(llm_service)
+
+        cached = self.cache_lookup(cache, extracted_text, model_fingerprint)
+        if cached:
+            self.save_units(extractor, document, plan, cached['response_payload'])
+            yield from self.result_events(cached['response_payload'], 0)
+            return
+
+        for event in llm_service.stream_sow_insights(extracted_text):
+            if event['event'] == 'result':
+                self.cache_put(cache, extracted_text, model_fingerprint, event['data'], llm_service)
+                self.save_units(extractor, document, plan, event['data'])
+                event = dict(event, tokens_used=llm_service.tokens_used)
+            yield event
+
+    def _run_extraction(self, document, extracted_text):
+        """
+        Returns:
+            tuple: (response JSON string, tokens spent; 0 on a cache hit)
+        """
+        llm_service = LLMService()
+        extractor, plan = self.plan_units(document, extracted_text, llm_service)
+        if plan and extractor.reuses_units(plan):
+            response_data = extractor.extract(document, plan, llm_service)
+            return response_data, llm_service.tokens_used
+
+        cache, model_fingerprint = self.open_cache(llm_service)
+
+        cached = self.cache_lookup(cache, extracted_text, model_fingerprint)
+        if cached:
+            self.save_units(extractor, document, plan, cached['response_payload'])
+            return cached['response_payload'], 0
+
+        response_data = llm_service.extract_sow_insights(extracted_text)
+        self.cache_put(cache, extracted_text, model_fingerprint, response_data, llm_service)
+        self.save_units(extractor, document, plan, response_data)
+        return response_data, llm_service.tokens_used
+
+    # The steps below are shared with AsyncDocumentPipeline, which runs them on its database threads
+
+    def plan_units(self, document, extracted_text, llm_service):
+        """
+        Plan the section units of any version against its predecessor's stored results.
+
+        Returns:
+            tuple: (IncrementalExtractor, its plan); (None, None) when versioning is off
+        """
+        if not VERSIONING_CONFIG['enabled']:
+            return None, None
+        extractor = IncrementalExtractor(self.db)
+        return extractor, extractor.plan(document, extracted_text, llm_service)
+
+    def save_units(self, extractor, document, plan, response_data):
+        """Store a whole-document result against the planned units; no LLM calls are made"""
+        if plan:
+            extractor.save_whole(document, plan, response_data)
+
+    @staticmethod
+    def result_events(response_data, tokens_used):
+        """Stream events for a result that was not streamed: one 'section' per key, then the 'result'"""
+        for key, value in json.loads(response_data).items():
+            yield {"event": "section", "data": {"key": key, "value": value}}
+        yield {"event": "result", "data": response_data, "tokens_used": tokens_used}
+
+    def open_cache(self, llm_service):
+        """
+        Returns:
+            tuple: (ResultCache, or None when caching is off; the model
+                fingerprint results are cached under)
+        """
+        cache = ResultCache(self.db) if CACHE_CONFIG['enabled'] else None
+        return cache, llm_service.get_model_fingerprint()
+
+    def cache_lookup(self, cache, extracted_text, model_fingerprint):
+        if not cache:
+            return None
+        cached = cache.get(extracted_text, model_fingerprint)
+        RESULT_CACHE_LOOKUPS.inc(result='hit' if cached else 'miss')
+        if cached:
+            print(f"LLM result cache hit for text hash {cached['text_hash'][:12]}")
+        return cached
+
+    def cache_put(self, cache, extracted_text, model_fingerprint, response_data, llm_service):
+        # Never cache the fallback payload, otherwise a transient failure sticks forever
+        if cache and not llm_service.is_default_response(response_data):
+            cache.put(extracted_text, model_fingerprint, response_data, llm_service.tokens_used)
+
+    def get_document(self, document_id):
+        document = self.db.fetch_one(
+            'SELECT * FROM documents WHERE document_id = ? AND status != ?',
+            (document_id, 'deleted')
+        )
+
+        if not document:
+            raise ValueError(f"Document not found: {document_id}")
+
+        return document
+
+    def _extract_text(self, document):
+        text_store = ExtractedTextStore(self.db)
+        # Chunked uploads hash the file as it arrives; older rows are hashed here
+        content_hash = document.get('content_hash')
+        if not content_hash:
+            with STAGE_SECONDS.time(stage='file_hash'):
+                content_hash = text_store.hash_file(document['storage_path'])
+        extracted_text = text_store.get(content_hash, EXTRACTOR_VERSION)
+        if extracted_text:
+            return extracted_text
+
+        doc_processor = DocumentProcessor()
+        with STAGE_SECONDS.time(stage='text_extraction'):
+            extracted_text = doc_processor.extract_text(document['storage_path'])
+
+        if not extracted_text:
+            raise ValueError('Failed to extract text from document')
+
+        text_store.put(content_hash, EXTRACTOR_VERSION, extracted_text)
+        return extracted_text
+
+    def prepare_text(self, document):
+        """
+        Returns:
+            tuple: (raw extracted text, the text sent to the LLM)
+        """
+        raw_text = self._extract_text(document)
+        return raw_text, self._compact(raw_text)
+
+    def save_result(self, document, stream_id, raw_text, extracted_text, response_data, tokens_used,
+                    start_time, new_stream):
+        """
+        Store a finished extraction and everything derived from it, in one transaction.
+
+        The fallback payload LLMService returns when extraction gave up is
+        kept on a failed stream for diagnosis, but the document is marked
+        failed and nothing is derived from it.
+
+        Args:
+            new_stream (bool): Insert the llm_streams row rather than update
+                the reserved one
+
+        Raises:
+            ExtractionFailedError: If response_data is the fallback payload
+        """
+        latency_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        failed = LLMService.is_default_response(response_data)
+        status = 'failed' if failed else 'success'
+        with self.db.transaction():
+            if new_stream:
+                self.db.execute_query(
+                    '''INSERT INTO llm_streams
+                       (stream_id, document_id, request_payload, response_payload,
+                        tokens_used, latency_ms, status, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (stream_id, document['document_id'], extracted_text[:1000],
+                     response_data, tokens_used, latency_ms, status,
+                     datetime.utcnow(), datetime.utcnow())
+                )
+            else:
+                self.db.execute_query(
+                    '''UPDATE llm_streams
+                       SET request_payload = ?, response_payload = ?, tokens_used = ?,
+                           latency_ms = ?, status = ?, updated_at = ?
+                       WHERE stream_id = ?''',
+                    (extracted_text[:1000], response_data, tokens_used, latency_ms, status,
+                     datetime.utcnow(), stream_id)
+                )
+            if failed:
+                self.set_status(document['document_id'], 'failed')
+            else:
+                self._complete(document, raw_text, stream_id, response_data)
+
+        if failed:
+            DOCUMENTS_PROCESSED.inc(status='failed')
+            raise ExtractionFailedError(self._failure_reason(response_data))
+        DOCUMENTS_PROCESSED.inc(status='completed')
+
+    @staticmethod
+    def _failure_reason(response_data):
+        try:
+            return json.loads(response_data)['assumptions'][0]
+        except (TypeError, ValueError, KeyError, IndexError):
+            return 'Extraction returned no usable result'
+
+    def fail(self, document_id, stream_id=None):
+        """Mark a run that did not finish, and the stream it was writing to, as failed"""
+        if stream_id:
+            self.set_stream_status(stream_id, 'failed')
+        self.set_status(document_id, 'failed')
+        DOCUMENTS_PROCESSED.inc(status='failed')
+
+    def _compact(self, extracted_text):
+        # The text store keeps the raw text, so turning compaction off needs no re-extraction
+        if not COMPACTION_CONFIG['enabled']:
+            return extracted_text
+
+        with STAGE_SECONDS.time(stage='compaction'):
+            compacted, stats = compact_text(extracted_text)
+        saved = stats['tokens_before'] - stats['tokens_after']
+        print(f"Compacted input - Tokens: {stats['tokens_before']} -> {stats['tokens_after']} "
+              f"(~{saved} saved)")
+        return compacted
+
+    def _complete(self, document, raw_text, stream_id, response_data):
+        self.set_status(document['document_id'], 'completed')
+        # Same transaction as the stream write, so the normalized rows, search index and consolidated view never lag it
+        SowStore(self.db).sync_workspace(document['workspace_id'])
+        with STAGE_SECONDS.time(stage='search_index'):
+            SearchIndex(self.db).index_document(document, raw_text, stream_id, response_data)
+        with STAGE_SECONDS.time(stage='consolidation'):
+            WorkspaceConsolidator(self.db).refresh(document['workspace_id'])
+
+    def get_stream(self, stream_id):
+        return self.db.fetch_one(
+            'SELECT * FROM llm_streams WHERE stream_id = ?',
+            (stream_id,)
+        )
+
+    def set_stream_status(self, stream_id, status):
+        self.db.execute_query(
+            'UPDATE llm_streams SET status = ?, updated_at = ? WHERE stream_id = ?',
+            (status, datetime.utcnow(), stream_id)
+        )
+
+    def set_status(self, document_id, status):
+        self.db.execute_query(
+            'UPDATE documents SET status = ?, updated_at = ? WHERE document_id = ?',
+            (status, datetime.utcnow(), document_id)
+        )
+
+
+def run_process_document_job(db, payload):
+    stream = DocumentPipeline(db).process(payload['document_id'])
+    return {'stream_id': stream['stream_id'], 'document_id': stream['document_id']}
+
+
+def fail_abandoned_document_job(db, payload):
+    DocumentPipeline(db).fail(payload['document_id'])
@@ -1,9 +1,57 @@
 import os
-import PyPDF2
-import docx
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import DOCUMENT_CONFIG
+
+# PyPDF2 and docx are imported where they are used, so importing this module stays cheap for
+# processes that never parse a file; see preload_parsers()
+
+# Bump whenever a change alters the extracted text, so cached texts are re-extracted
+EXTRACTOR_VERSION = "2"
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def preload_parsers():
+    """Import the PDF and DOCX parsers now, e.g. in the gunicorn master so forked workers share them"""
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn, not fork: the server forks from threads (job workers, request handlers)
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=DOCUMENT_CONFIG['pdf_workers'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pdf_pool
+
+
+def close_pdf_pool():
+    """Stop the PDF worker processes; queued page ranges are cancelled rather than waited on"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool = None
+
+
+def _extract_pdf_page_range(file_path, start, end):
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[index].extract_text() for index in range(start, end)]
 
 
 class DocumentProcessor:
+    def __init__(self, parallel=None):
+        self.parallel = DOCUMENT_CONFIG['pdf_parallel'] if parallel is None else parallel
+
     def extract_text(self, file_path):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -20,26 +68,41 @@ class DocumentProcessor:
             raise ValueError(f"Unsupported file type: {file_extension}")
 
     def _extract_from_pdf(self, file_path):
+        import PyPDF2
         try:
-            text = ""
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    extracted = page.extract_text()
-                    if extracted:
-                        text += extracted + "\n"
-            return text.strip()
+                page_count = len(PyPDF2.PdfReader(file).pages)
+            
+            if self.parallel and page_count >= DOCUMENT_CONFIG['pdf_parallel_min_pages']:
+                pages = self._extract_pdf_pages_parallel(file_path, page_count)
+            else:
+                pages = _extract_pdf_page_range(file_path, 0, page_count)
+            
+            # Form feeds keep page boundaries for the chunker and the compactor
+            return "\f".join(page for page in pages if page).strip()
         except Exception as e:
             print(f"Error extracting from PDF: {str(e)}")
             raise
 
+    def _extract_pdf_pages_parallel(self, file_path, page_count):
+        # Several ranges per worker so one slow (e.g. OCR-heavy) range doesn't stall the rest
+        range_count = DOCUMENT_CONFIG['pdf_workers'] * 4
+        range_size = max(1, -(-page_count // range_count))
+        futures = [
+            _get_pdf_pool().submit(_extract_pdf_page_range, file_path, start,
+                                   min(start + range_size, page_count))
+            for start in range(0, page_count, range_size)
+        ]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
     def _extract_from_docx(self, file_path):
+        import docx
         try:
             doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             print(f"Error extracting from DOCX: {str(e)}")
             raise
@@ -51,4 +114,3 @@ class DocumentProcessor:
         except Exception as e:
             print(f"Error extracting from TXT: {str(e)}")
             raise
-
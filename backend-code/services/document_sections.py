@@ -0,0 +1,82 @@
+import hashlib
+import re
+from services.text_chunker import BLOCK_SEPARATOR, split_into_chunks
+
+# Only top-level headings ("3. Scope", "PRICING", "Appendix A") start a section; "3.2" stays inside it
+TOP_LEVEL_HEADING = re.compile(r'^\s*(\d+[.)]?\s+\S|[A-Z][A-Z0-9 &/,-]{3,}$|(?i:section|appendix)\b)')
+SECTION_NUMBER = re.compile(r'(?m)^\s*\d+(\.\d+)*[.)]?\s+')
+WHITESPACE = re.compile(r'\s+')
+
+
+def split_sections(text):
+    """
+    Split document text into top-level sections.
+
+    Args:
+        text (str): Extracted (and usually compacted) document text
+
+    Returns:
+        list: Section strings in document order; text before the first
+            heading is its own section
+    """
+    sections = []
+    current = []
+    for block in BLOCK_SEPARATOR.split(text):
+        block = block.strip()
+        if not block:
+            continue
+        if current and TOP_LEVEL_HEADING.match(block.split('\n', 1)[0]):
+            sections.append('\n\n'.join(current))
+            current = []
+        current.append(block)
+    if current:
+        sections.append('\n\n'.join(current))
+    return sections
+
+
+def build_units(sections, min_chars, max_chars):
+    """
+    Group sections into extraction units, one LLM call each.
+
+    A unit closes as soon as it reaches min_chars, so an edit only moves
+    the boundaries of the run of small sections it falls in; later units
+    come out identical to the previous version's. Sections longer than
+    max_chars are split on their own.
+
+    Returns:
+        list: Unit strings in document order
+    """
+    units = []
+    current = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            units.append('\n\n'.join(current))
+        current, size = [], 0
+
+    for section in sections:
+        if len(section) > max_chars:
+            flush()
+            units.extend(split_into_chunks(section, max_chars))
+            continue
+        if current and size + len(section) > max_chars:
+            flush()
+        current.append(section)
+        size += len(section) + 2
+        if size >= min_chars:
+            flush()
+    flush()
+    return units
+
+
+def unit_key(unit):
+    """
+    Identity of a unit across versions.
+
+    Section numbers and whitespace are ignored, so inserting a section
+    earlier in the document does not invalidate everything after it.
+    """
+    normalized = WHITESPACE.sub(' ', SECTION_NUMBER.sub('', unit)).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
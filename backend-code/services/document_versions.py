@@ -0,0 +1,40 @@
+# Version number for a new document row, bound to its previous_document_id
+NEXT_VERSION_SQL = 'COALESCE((SELECT version + 1 FROM documents WHERE document_id = ?), 1)'
+
+
+def find_previous_version(db, workspace_id, previous_document_id):
+    """
+    Check that a new upload can be linked to previous_document_id.
+
+    Raises:
+        ValueError: If the document is not a live document of the same workspace
+    """
+    previous = db.fetch_one(
+        'SELECT document_id, version FROM documents WHERE document_id = ? AND workspace_id = ? AND status != ?',
+        (previous_document_id, workspace_id, 'deleted')
+    )
+    if not previous:
+        raise ValueError('Previous document not found in this workspace')
+    return previous
+
+
+def version_history(db, document_id):
+    """
+    Follow previous_document_id links back from a document.
+
+    Returns:
+        list: Document rows, newest version first
+    """
+    return db.fetch_all(
+        '''WITH RECURSIVE chain (document_id, depth) AS (
+               SELECT document_id, 0 FROM documents WHERE document_id = ?
+               UNION ALL
+               SELECT d.previous_document_id, chain.depth + 1
+               FROM documents d JOIN chain ON d.document_id = chain.document_id
+               WHERE d.previous_document_id IS NOT NULL AND chain.depth < 1000
+           )
+           SELECT d.* FROM chain JOIN documents d ON d.document_id = chain.document_id
+           WHERE d.status != ?
+           ORDER BY chain.depth''',
+        (document_id, 'deleted')
+    )
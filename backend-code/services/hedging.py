@@ -0,0 +1,183 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from config import HTTP_CONFIG
+from services.metrics import LLM_HEDGES
+
+# Recent first-byte latencies kept for each kind of call
+LATENCY_WINDOW = 500
+# Hedge budget that can be saved up, so a short burst of slow calls can all be hedged
+MAX_HEDGE_CREDIT = 5.0
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_hedge_policy():
+    """Return the process-wide HedgePolicy, sized from HTTP_CONFIG"""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = HedgePolicy(
+                HTTP_CONFIG['hedge_percentile'],
+                HTTP_CONFIG['hedge_budget'],
+                HTTP_CONFIG['hedge_min_samples']
+            )
+        return _policy
+
+
+class HedgePolicy:
+    """
+    Decides when a slow Azure call gets a duplicate request.
+
+    First-byte latencies are kept per kind of call, e.g. blocking or
+    streamed; a blocking completion's first byte arrives with its whole
+    answer. A call still waiting at the configured percentile of its kind is
+    hedged, but every call only earns `budget` of a hedge, so hedges stay
+    that fraction of all calls even when Azure is slow across the board.
+    """
+
+    def __init__(self, percentile, budget, min_samples):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = {}
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def admit(self, kind):
+        """
+        Count a call and say how long it may wait for its first byte.
+
+        Returns:
+            float or None: Seconds before a hedge fires; None when the call
+                cannot be hedged, for lack of samples or budget
+        """
+        with self._lock:
+            self._credit = min(MAX_HEDGE_CREDIT, self._credit + self.budget)
+            latencies = self._latencies.get(kind, ())
+            if self._credit < 1 or len(latencies) < self.min_samples:
+                return None
+            ranked = sorted(latencies)
+        return ranked[max(0, math.ceil(len(ranked) * self.percentile / 100) - 1)]
+
+    def try_hedge(self):
+        """Spend one hedge from the budget; False when it is used up"""
+        with self._lock:
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+            return True
+
+    def observe(self, kind, seconds):
+        with self._lock:
+            self._latencies.setdefault(kind, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def call_hedged(send, kind, admit_hedge=None):
+    """
+    Make a request, plus a duplicate if its first byte is late; the first answer wins.
+
+    Args:
+        send (callable): send(hedge) makes one request and returns once its
+            first byte is in; hedge is True for the duplicate
+        kind: Latency class of the request
+        admit_hedge (callable): Optional check, e.g. for free quota, that
+            must pass before the duplicate is sent
+
+    Returns:
+        The first successful response. An error is raised only once every
+        request sent has failed.
+    """
+    policy = get_hedge_policy() if HTTP_CONFIG['hedge_enabled'] else None
+    delay = policy.admit(kind) if policy else None
+    if delay is None:
+        return _timed(policy, kind, send, False)
+
+    # Both requests run on their own thread, so the caller can return while the loser still waits on Azure
+    attempts = [_in_thread(_timed, policy, kind, send, False)]
+    if not wait(attempts, timeout=delay).done and policy.try_hedge() and (admit_hedge is None or admit_hedge()):
+        LLM_HEDGES.inc(outcome='sent')
+        attempts.append(_in_thread(_timed, policy, kind, send, True))
+
+    pending = set(attempts)
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is not attempts[0]:
+                    LLM_HEDGES.inc(outcome='won')
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+
+async def acall_hedged(send, kind, admit_hedge=None):
+    """call_hedged for the event loop; send(hedge) and admit_hedge() are coroutine functions"""
+    policy = get_hedge_policy() if HTTP_CONFIG['hedge_enabled'] else None
+    delay = policy.admit(kind) if policy else None
+    if delay is None:
+        return await _atimed(policy, kind, send, False)
+
+    attempts = [asyncio.ensure_future(_atimed(policy, kind, send, False))]
+    pending = set(attempts)
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done and policy.try_hedge() and (admit_hedge is None or await admit_hedge()):
+            LLM_HEDGES.inc(outcome='sent')
+            attempts.append(asyncio.ensure_future(_atimed(policy, kind, send, True)))
+            pending.add(attempts[-1])
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not attempts[0]:
+                        LLM_HEDGES.inc(outcome='won')
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        # The loser's connection is dropped instead of left generating an unused answer
+        for task in pending:
+            task.cancel()
+
+
+def _timed(policy, kind, send, hedge):
+    start = time.monotonic()
+    response = send(hedge)
+    if policy:
+        policy.observe(kind, time.monotonic() - start)
+    return response
+
+
+async def _atimed(policy, kind, send, hedge):
+    start = time.monotonic()
+    try:
+        response = await send(hedge)
+    except asyncio.CancelledError:
+        # A lower bound, but leaving hedged losers out would pull the percentile down
+        if policy:
+            policy.observe(kind, time.monotonic() - start)
+        raise
+    if policy:
+        policy.observe(kind, time.monotonic() - start)
+    return response
+
+
+def _in_thread(fn, *args):
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name='llm-hedge', daemon=True).start()
+    return future
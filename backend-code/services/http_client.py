@@ -0,0 +1,73 @@
+import threading
+from config import HTTP_CONFIG
+
+_requests_session = None
+_requests_session_lock = threading.Lock()
+_aiohttp_session = None
+
+
+def get_requests_session():
+    """
+    Return the process-wide keep-alive session for blocking Azure calls.
+
+    openai 0.28 otherwise opens a session per thread and replaces it every
+    three minutes, so busy workers keep paying for new TLS handshakes. This
+    one pools up to HTTP_CONFIG['pool_size'] connections per host for every
+    thread, and lives until close_http_clients().
+    """
+    global _requests_session
+    with _requests_session_lock:
+        if _requests_session is None:
+            import requests
+
+            session = requests.Session()
+            # Same connection-level retries as openai's own session
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=HTTP_CONFIG['pool_size'], max_retries=2)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            # openai closes the session it is given whenever it recycles it
+            session.close = lambda: None
+            _requests_session = session
+        return _requests_session
+
+
+def create_aiohttp_session(limit):
+    """
+    Build the keep-alive aiohttp session for an event loop's Azure calls.
+
+    Args:
+        limit (int): Most connections open at once, across hosts
+    """
+    import aiohttp
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+def use_aiohttp_session(session):
+    """Share one aiohttp session across async Azure calls; None goes back to openai's default"""
+    global _aiohttp_session
+    _aiohttp_session = session
+
+
+def get_aiohttp_session():
+    return _aiohttp_session
+
+
+def request_timeout(asynchronous=False):
+    """
+    openai's request_timeout for one Azure call.
+
+    Returns:
+        tuple: (connect, read) seconds for requests, or (connect, total)
+            seconds for aiohttp, which openai maps a tuple onto
+    """
+    if asynchronous:
+        return HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['total_timeout']
+    return HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['read_timeout']
+
+
+def close_http_clients():
+    global _requests_session
+    with _requests_session_lock:
+        if _requests_session is not None:
+            type(_requests_session).close(_requests_session)
+            _requests_session = None
@@ -0,0 +1,116 @@
+import json
+from datetime import datetime
+from services.document_sections import split_sections, build_units, unit_key
+from services.llm_service import LLMService
+from config import VERSIONING_CONFIG
+
+
+class IncrementalExtractor:
+    """
+    Section-level extraction, so revisions only re-extract what changed.
+
+    The text is split into top-level section units and each unit's result
+    is stored in extraction_units. A revision reuses every result from its
+    predecessor whose unit text is unchanged, so only edited sections go to
+    the LLM. The merged result replaces the previous one as a whole, so
+    deleted sections drop out.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def extract(self, document, plan, llm_service):
+        """
+        Extract a planned document, reusing its predecessor's unchanged units.
+
+        Args:
+            document (dict): documents row; previous_document_id may be None
+            plan (dict): Result of plan()
+            llm_service (LLMService): Service whose tokens_used records the spend
+
+        Returns:
+            str: JSON string with the merged extraction
+        """
+        response_data, results = llm_service.extract_sow_units(plan['units'], plan['known_results'])
+        self.save(document, plan, results)
+        return response_data
+
+    @staticmethod
+    def reuses_units(plan):
+        """
+        Whether extracting unit by unit saves anything.
+
+        Only a revision whose predecessor left a result for at least one
+        unchanged unit does; anything else is sent whole, so it streams and
+        uses the result cache, and save_whole() stores what it can.
+        """
+        return any(result is not None for result in plan['known_results'])
+
+    def plan(self, document, text, llm_service):
+        """
+        Split text into units and look up the predecessor's results for them.
+
+        Returns:
+            dict: units, their keys, the model fingerprint, the predecessor's
+                rows by key and the known result (or None) per unit
+        """
+        units = build_units(split_sections(text), VERSIONING_CONFIG['unit_min_chars'],
+                            VERSIONING_CONFIG['unit_max_chars'])
+        keys = [unit_key(unit) for unit in units]
+        fingerprint = llm_service.get_model_fingerprint()
+        previous = self._units_by_key(document.get('previous_document_id'), fingerprint)
+
+        known_results = [json.loads(previous[key]['result_payload']) if key in previous else None for key in keys]
+        reused = sum(result is not None for result in known_results)
+        print(f"Incremental extraction - reusing {reused} of {len(units)} section units "
+              f"from {document.get('previous_document_id') or 'no previous version'}")
+        return {'units': units, 'keys': keys, 'fingerprint': fingerprint, 'previous': previous,
+                'known_results': known_results}
+
+    def save(self, document, plan, results):
+        """Store the per-unit results of a planned extraction"""
+        self._save_units(document['document_id'], plan['fingerprint'], plan['units'], plan['keys'], results,
+                         plan['previous'])
+
+    def save_whole(self, document, plan, response_data):
+        """
+        Store a result extracted from the whole document against the plan's units.
+
+        A single unit is the whole document, so it keeps the result. One
+        result cannot be divided between several units, so those are left
+        without one and the next revision is extracted whole as well.
+        """
+        results = [None] * len(plan['units'])
+        if len(results) == 1 and not LLMService.is_default_response(response_data):
+            results = [json.loads(response_data)]
+        self.save(document, plan, results)
+
+    def _units_by_key(self, document_id, fingerprint):
+        if not document_id:
+            return {}
+        rows = self.db.fetch_all(
+            '''SELECT document_id, unit_key, result_payload, reused_from FROM extraction_units
+               WHERE document_id = ? AND model_fingerprint = ?''',
+            (document_id, fingerprint)
+        )
+        return {row['unit_key']: row for row in rows}
+
+    def _save_units(self, document_id, fingerprint, units, keys, results, previous):
+        now = datetime.utcnow()
+        # Failed units are left out so the next version extracts them again
+        rows = [
+            (document_id, position, key, fingerprint, json.dumps(result), len(unit),
+             (previous[key]['reused_from'] or previous[key]['document_id']) if key in previous else None, now)
+            for position, (unit, key, result) in enumerate(zip(units, keys, results))
+            if result is not None
+        ]
+        with self.db.transaction():
+            self.db.execute_query('DELETE FROM extraction_units WHERE document_id = ?', (document_id,))
+            if rows:
+                self.db.execute_many(
+                    '''INSERT INTO extraction_units
+                       (document_id, position, unit_key, model_fingerprint, result_payload,
+                        char_count, reused_from, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                    rows
+                )
@@ -0,0 +1,264 @@
+import json
+import queue
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from database.connection_pool import get_pool
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Bounded worker pool backed by a persistent jobs table.
+
+    Jobs are written to SQLite before they are handed to a worker, so anything
+    still queued when the process stops is picked up again on the next start().
+    """
+
+    def __init__(self, db_path, worker_count=2, max_queue_size=100, stale_after_seconds=900, max_attempts=3):
+        self.db_path = db_path
+        self.worker_count = worker_count
+        self.max_queue_size = max_queue_size
+        self.stale_after_seconds = stale_after_seconds
+        self.max_attempts = max_attempts
+        self.worker_token = str(uuid.uuid4())
+        self._handlers = {}
+        self._abandoned_handlers = {}
+        self._pending = queue.Queue()
+        self._workers = []
+        self._stopping = threading.Event()
+
+    def register_handler(self, job_type, handler, on_abandoned=None):
+        """
+        Register the callable that runs jobs of a given type.
+
+        Args:
+            job_type (str): Job type name stored on the job row
+            handler (callable): Called as handler(db, payload); its return value
+                must be JSON serializable and is stored as the job result
+            on_abandoned (callable): Called as on_abandoned(db, payload) when a
+                job that kept dying with its worker is failed by recovery
+        """
+        self._handlers[job_type] = handler
+        if on_abandoned:
+            self._abandoned_handlers[job_type] = on_abandoned
+
+    def start(self):
+        self._recover_jobs()
+        for index in range(self.worker_count):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"job-worker-{index}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def shutdown(self, wait=True):
+        self._stopping.set()
+        for _ in self._workers:
+            self._pending.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+
+    def enqueue(self, job_type, payload):
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+
+        job_id = str(uuid.uuid4())
+        db = get_pool(self.db_path)
+        with db.transaction():
+            self._check_room(db, 1)
+            db.execute_query(
+                '''INSERT INTO jobs
+                   (job_id, job_type, payload, status, attempts, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (job_id, job_type, json.dumps(payload), 'queued', 0,
+                 datetime.utcnow(), datetime.utcnow())
+            )
+        self._dispatch(job_id)
+        return self.get_job(job_id)
+
+    def enqueue_many(self, job_type, payloads):
+        """
+        Queue several jobs of one type with a single multi-row insert.
+
+        Either every job is queued or, if they would not all fit, none are.
+
+        Returns:
+            list: The job rows, in the same order as payloads
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+
+        job_ids = [str(uuid.uuid4()) for _ in payloads]
+        db = get_pool(self.db_path)
+        now = datetime.utcnow()
+        with db.transaction():
+            self._check_room(db, len(payloads))
+            db.execute_many(
+                '''INSERT INTO jobs
+                   (job_id, job_type, payload, status, attempts, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                [(job_id, job_type, json.dumps(payload), 'queued', 0, now, now)
+                 for job_id, payload in zip(job_ids, payloads)]
+            )
+        rows = db.fetch_all(
+            f"SELECT * FROM jobs WHERE job_id IN ({', '.join('?' * len(job_ids))})",
+            tuple(job_ids)
+        )
+        jobs_by_id = {row['job_id']: row for row in rows}
+        # The batch went in as one insert, so its rows sit next to each other in the queue
+        first_position = self._queue_position(db, jobs_by_id[job_ids[0]])
+        jobs = []
+        for index, job_id in enumerate(job_ids):
+            self._dispatch(job_id)
+            job = jobs_by_id[job_id]
+            job['payload'] = json.loads(job['payload'])
+            job['queue_position'] = first_position + index
+            jobs.append(job)
+        return jobs
+
+    def depth(self):
+        """Jobs queued and not yet started, by every process sharing the jobs table"""
+        return self._count_queued(get_pool(self.db_path))
+
+    def _check_room(self, db, count):
+        # Called in the insert's transaction, so concurrent enqueues in any process see each other
+        if self._count_queued(db) + count > self.max_queue_size:
+            raise JobQueueFullError('Job queue is full, try again later')
+
+    @staticmethod
+    def _count_queued(db):
+        return db.fetch_one('SELECT COUNT(*) AS count FROM jobs WHERE status = ?', ('queued',))['count']
+
+    def get_job(self, job_id):
+        db = get_pool(self.db_path)
+        job = db.fetch_one('SELECT * FROM jobs WHERE job_id = ?', (job_id,))
+        if not job:
+            return None
+        for field in ('payload', 'result'):
+            if job.get(field):
+                job[field] = json.loads(job[field])
+        job['queue_position'] = self._queue_position(db, job) if job['status'] == 'queued' else None
+        return job
+
+    def _queue_position(self, db, job):
+        """1-based place of a queued job among every process's queued jobs, oldest first"""
+        ahead = db.fetch_one(
+            '''SELECT COUNT(*) AS count FROM jobs
+               WHERE status = ? AND (created_at < ? OR (created_at = ? AND rowid < (
+                   SELECT rowid FROM jobs WHERE job_id = ?
+               )))''',
+            ('queued', job['created_at'], job['created_at'], job['job_id'])
+        )
+        return ahead['count'] + 1
+
+    def _recover_jobs(self):
+        db = get_pool(self.db_path)
+        # A job left 'running' past the stale window belonged to a worker that died mid-run
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after_seconds)
+        # A job that has taken its worker down max_attempts times would only do it again
+        abandoned = db.fetch_all(
+            'SELECT * FROM jobs WHERE status = ? AND updated_at < ? AND attempts >= ?',
+            ('running', stale_before, self.max_attempts)
+        )
+        for job in abandoned:
+            self._abandon_job(db, job)
+        db.execute_query(
+            '''UPDATE jobs SET status = ?, claimed_by = NULL, updated_at = ?
+               WHERE status = ? AND updated_at < ?''',
+            ('queued', datetime.utcnow(), 'running', stale_before)
+        )
+        jobs = db.fetch_all(
+            'SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at',
+            ('queued',)
+        )
+        for job in jobs:
+            self._dispatch(job['job_id'])
+        if jobs:
+            print(f"Recovered {len(jobs)} queued job(s)")
+
+    def _abandon_job(self, db, job):
+        # Conditional, in case another process recovered it first
+        failed = db.execute_query(
+            '''UPDATE jobs SET status = ?, error = ?, claimed_by = NULL, completed_at = ?, updated_at = ?
+               WHERE job_id = ? AND status = ?''',
+            ('failed', f"Abandoned after {job['attempts']} attempts", datetime.utcnow(), datetime.utcnow(),
+             job['job_id'], 'running')
+        )
+        if not failed:
+            return
+        print(f"Job {job['job_id']} abandoned after {job['attempts']} attempts")
+        on_abandoned = self._abandoned_handlers.get(job['job_type'])
+        if on_abandoned:
+            try:
+                on_abandoned(db, json.loads(job['payload'] or '{}'))
+            except Exception as e:
+                print(f"Error cleaning up abandoned job {job['job_id']}: {str(e)}")
+                traceback.print_exc()
+
+    def _dispatch(self, job_id):
+        # Every process recovers every queued row; the conditional claim runs each job once
+        self._pending.put(job_id)
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            job_id = self._pending.get()
+            if job_id is None:
+                break
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                print(f"Error running job {job_id}: {str(e)}")
+                traceback.print_exc()
+
+    def _claim(self, db, job_id):
+        # Several processes may recover the same queued rows; only one claim wins
+        db.execute_query(
+            '''UPDATE jobs
+               SET status = ?, claimed_by = ?, attempts = attempts + 1,
+                   started_at = ?, updated_at = ?
+               WHERE job_id = ? AND status = ?''',
+            ('running', self.worker_token, datetime.utcnow(), datetime.utcnow(),
+             job_id, 'queued')
+        )
+        job = db.fetch_one(
+            'SELECT * FROM jobs WHERE job_id = ? AND claimed_by = ? AND status = ?',
+            (job_id, self.worker_token, 'running')
+        )
+        return job
+
+    def _run_job(self, job_id):
+        db = get_pool(self.db_path)
+        job = self._claim(db, job_id)
+        if not job:
+            return
+
+        try:
+            handler = self._handlers[job['job_type']]
+            result = handler(db, json.loads(job['payload'] or '{}'))
+            self._complete_job(db, job_id, result)
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            self._fail_job(db, job_id, e)
+
+    def _complete_job(self, db, job_id, result):
+        db.execute_query(
+            '''UPDATE jobs SET status = ?, result = ?, error = NULL,
+                   completed_at = ?, updated_at = ?
+               WHERE job_id = ?''',
+            ('completed', json.dumps(result), datetime.utcnow(), datetime.utcnow(), job_id)
+        )
+
+    def _fail_job(self, db, job_id, error):
+        db.execute_query(
+            '''UPDATE jobs SET status = ?, error = ?, completed_at = ?, updated_at = ?
+               WHERE job_id = ?''',
+            ('failed', str(error), datetime.utcnow(), datetime.utcnow(), job_id)
+        )
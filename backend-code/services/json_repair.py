@@ -0,0 +1,110 @@
+import json
+
+CLOSERS = {'{': '}', '[': ']'}
+
+
+def repair_json(content):
+    """
+    Parse the JSON object in an LLM answer, fixing the mistakes models commonly make.
+
+    Code fences and prose around the object are dropped and trailing commas
+    removed. An answer that stops mid-way (e.g. at max_tokens) is cut back
+    to its last complete value and its open objects and arrays are closed.
+
+    Args:
+        content (str): Raw completion text
+
+    Returns:
+        tuple: (parsed value, True if the text ended before the object closed)
+
+    Raises:
+        json.JSONDecodeError: If no JSON object can be recovered
+    """
+    text = _strip_fences(content)
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as error:
+        parse_error = error
+
+    repaired, truncated = _close_structures(content)
+    try:
+        # Models also emit raw newlines inside strings, which strict parsing rejects
+        return json.loads(repaired, strict=False), truncated
+    except json.JSONDecodeError:
+        raise parse_error
+
+
+def _strip_fences(content):
+    if '```json' in content:
+        start = content.find('```json') + 7
+        end = content.find('```', start)
+        if end != -1:
+            return content[start:end].strip()
+    elif '```' in content:
+        start = content.find('```') + 3
+        end = content.find('```', start)
+        if end != -1:
+            return content[start:end].strip()
+    return content.strip()
+
+
+def _close_structures(content):
+    """
+    Rewrite content from its first '{' into a string json.loads can take.
+
+    Returns:
+        tuple: (JSON text, True if it had to be cut back and closed)
+    """
+    start = content.find('{')
+    if start == -1:
+        raise json.JSONDecodeError('No JSON object found', content, 0)
+
+    out = []
+    stack = []
+    # Length of out and the open containers at the last point where closing them gives valid JSON
+    safe_point = None
+    in_string = escape = False
+
+    for char in content[start:]:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+            out.append(char)
+            safe_point = (len(out), list(stack))
+        elif char in '}]':
+            _drop_trailing_comma(out)
+            # The closer the structure needs, whichever one the model wrote
+            out.append(stack.pop())
+            if not stack:
+                # Anything after the object (closing fence, prose) is ignored
+                return ''.join(out), False
+            safe_point = (len(out), list(stack))
+        elif char == ',':
+            _drop_trailing_comma(out)
+            safe_point = (len(out), list(stack))
+            out.append(char)
+        else:
+            out.append(char)
+
+    length, open_containers = safe_point
+    return ''.join(out[:length]) + ''.join(reversed(open_containers)), True
+
+
+def _drop_trailing_comma(out):
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ',':
+        del out[index]
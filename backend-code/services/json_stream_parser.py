@@ -0,0 +1,108 @@
+import json
+
+
+class SectionStreamParser:
+    """
+    Incrementally scans a streamed JSON object and reports each top-level
+    key as soon as its value closes.
+
+    Anything before the first '{' (such as a ```json fence) is ignored, so
+    raw completion deltas can be fed in as they arrive.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'
+        self._key_start = None
+        self._current_key = None
+        self._value_start = None
+
+    def feed(self, text):
+        """
+        Consume the next piece of streamed text.
+
+        Args:
+            text (str): Newly received completion text
+
+        Returns:
+            list: (key, value) tuples for top-level sections that closed
+        """
+        self._text += text
+        sections = []
+        while self._pos < len(self._text):
+            self._consume(self._text[self._pos], sections)
+            self._pos += 1
+        return sections
+
+    def _consume(self, char, sections):
+        if not self._started:
+            if char == '{':
+                self._started = True
+                self._depth = 1
+            return
+
+        if self._in_string:
+            self._consume_string_char(char, sections)
+            return
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect == 'key':
+                self._key_start = self._pos
+            elif self._depth == 1 and self._expect == 'value' and self._value_start is None:
+                self._value_start = self._pos
+        elif char in '{[':
+            if self._depth == 1 and self._expect == 'value' and self._value_start is None:
+                self._value_start = self._pos
+            self._depth += 1
+        elif char in '}]':
+            self._close_container(sections)
+        elif self._depth == 1:
+            self._consume_top_level_char(char, sections)
+
+    def _consume_string_char(self, char, sections):
+        if self._escape:
+            self._escape = False
+        elif char == '\\':
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._depth != 1:
+                return
+            if self._expect == 'key':
+                self._current_key = self._text[self._key_start + 1:self._pos]
+                self._expect = 'colon'
+            elif self._expect == 'value':
+                self._emit(self._pos + 1, sections)
+
+    def _close_container(self, sections):
+        self._depth -= 1
+        if self._depth == 1 and self._expect == 'value':
+            self._emit(self._pos + 1, sections)
+        elif self._depth == 0 and self._expect == 'value' and self._value_start is not None:
+            self._emit(self._pos, sections)
+
+    def _consume_top_level_char(self, char, sections):
+        if self._expect == 'colon' and char == ':':
+            self._expect = 'value'
+            self._value_start = None
+        elif char == ',':
+            if self._expect == 'value' and self._value_start is not None:
+                self._emit(self._pos, sections)
+            self._expect = 'key'
+        elif self._expect == 'value' and self._value_start is None and not char.isspace():
+            self._value_start = self._pos
+
+    def _emit(self, end, sections):
+        raw_value = self._text[self._value_start:end].strip()
+        self._expect = 'after_value'
+        self._value_start = None
+        try:
+            sections.append((self._current_key, json.loads(raw_value)))
+        except json.JSONDecodeError:
+            print(f"Skipping unparseable streamed section: {self._current_key}")
@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+from config import OPENAI_CONFIG, RATE_LIMIT_CONFIG, ROUTING_CONFIG
+from services.metrics import LLM_TARGET_EJECTIONS, LLM_TARGET_REQUESTS
+from services.rate_limiter import available_quota, get_rate_limiter
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the process-wide DeploymentRouter over ROUTING_CONFIG['targets']"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = DeploymentRouter(
+                load_targets(ROUTING_CONFIG['targets']),
+                eject_after_failures=ROUTING_CONFIG['eject_after_failures'],
+                eject_seconds=ROUTING_CONFIG['eject_seconds'],
+                eject_max_seconds=ROUTING_CONFIG['eject_max_seconds'],
+                latency_smoothing=ROUTING_CONFIG['latency_smoothing']
+            )
+        return _router
+
+
+def load_targets(configs):
+    """
+    Build Targets from AZURE_OPENAI_TARGETS entries.
+
+    Missing fields fall back to the single-deployment settings. A lone
+    target is named after its deployment, so it keeps the quota state the
+    limiter already has for that name.
+
+    Raises:
+        ValueError: If the list is empty or two targets share a name
+    """
+    if not configs:
+        raise ValueError('AZURE_OPENAI_TARGETS must list at least one deployment')
+
+    targets = []
+    for config in configs:
+        endpoint = config.get('endpoint', OPENAI_CONFIG['azure_endpoint'])
+        deployment = config.get('deployment', OPENAI_CONFIG['deployment'])
+        name = config.get('name') or (
+            deployment if len(configs) == 1 else f"{urlparse(endpoint).hostname}/{deployment}"
+        )
+        if any(target.name == name for target in targets):
+            raise ValueError(f"Duplicate Azure OpenAI target name: {name}")
+        targets.append(Target(
+            name,
+            endpoint,
+            deployment,
+            api_key=config.get('api_key', OPENAI_CONFIG['api_key']),
+            api_version=config.get('api_version', OPENAI_CONFIG['api_version']),
+            weight=float(config.get('weight', 1.0)),
+            tokens_per_minute=config.get('tokens_per_minute'),
+            requests_per_minute=config.get('requests_per_minute')
+        ))
+    return targets
+
+
+class Target:
+    """One Azure OpenAI deployment, and its health as seen by this process"""
+
+    def __init__(self, name, endpoint, deployment, api_key, api_version, weight=1.0,
+                 tokens_per_minute=None, requests_per_minute=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.deployment = deployment
+        self.api_key = api_key
+        self.api_version = api_version
+        self.weight = weight
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        # Moving average of seconds to the first byte, for blocking (False) and streamed (True) calls
+        self.latency = {}
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def limiter(self):
+        """This target's shared quota limiter, or None when rate limiting is off"""
+        if not RATE_LIMIT_CONFIG['enabled']:
+            return None
+        return get_rate_limiter(self.name, self.tokens_per_minute, self.requests_per_minute)
+
+
+class DeploymentRouter:
+    """
+    Spreads Azure calls over the configured deployments.
+
+    Each call goes to a target drawn at random, weighted by its configured
+    weight, the share of its quota that is free and the inverse of its
+    recent latency. Load therefore follows provisioned capacity and drifts
+    away from slow or throttled deployments. A target that fails
+    eject_after_failures times in a row gets no calls for eject_seconds,
+    doubling while it keeps failing. Health is tracked per process; quota
+    is shared with every process through the rate limiter.
+    """
+
+    def __init__(self, targets, eject_after_failures=3, eject_seconds=30, eject_max_seconds=600,
+                 latency_smoothing=0.2, clock=time.monotonic):
+        self.targets = targets
+        self.eject_after_failures = eject_after_failures
+        self.eject_seconds = eject_seconds
+        self.eject_max_seconds = eject_max_seconds
+        self.latency_smoothing = latency_smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def pick(self, stream=False, exclude=()):
+        """
+        Choose the target for one request.
+
+        Args:
+            stream (bool): Whether the request streams; latencies are only
+                compared between requests of the same kind
+            exclude: Names of targets this call has already failed on
+
+        Returns:
+            Target: A healthy target that is not excluded when there is one,
+                otherwise the one whose ejection ends soonest
+        """
+        if len(self.targets) == 1:
+            return self.targets[0]
+
+        now = self._clock()
+        candidates = [target for target in self.targets if target.name not in exclude] or self.targets
+        healthy = [target for target in candidates if target.ejected_until <= now]
+        if not healthy:
+            return min(candidates, key=lambda target: target.ejected_until)
+        if len(healthy) == 1:
+            return healthy[0]
+        return random.choices(healthy, weights=self._scores(healthy, stream))[0]
+
+    def _scores(self, targets, stream):
+        with self._lock:
+            latencies = [target.latency.get(stream) for target in targets]
+        known = [latency for latency in latencies if latency]
+        # A target without samples yet is taken to be average, so it gets its fair share straight away
+        default = sum(known) / len(known) if known else 1.0
+
+        # One read of the shared bucket state per pick, whatever the number of targets
+        quotas = available_quota([target.limiter() for target in targets])
+        if not any(quotas):
+            # Everyone is out of quota or blocked; spread the wait by capacity alone
+            quotas = [1.0] * len(targets)
+
+        return [target.weight * quota / (latency or default)
+                for target, quota, latency in zip(targets, quotas, latencies)]
+
+    def record_success(self, target, stream, seconds):
+        with self._lock:
+            previous = target.latency.get(stream)
+            target.latency[stream] = seconds if previous is None else (
+                previous + self.latency_smoothing * (seconds - previous)
+            )
+            target.failures = 0
+            target.ejections = 0
+        LLM_TARGET_REQUESTS.inc(target=target.name, outcome='success')
+
+    def record_rate_limited(self, target):
+        # Not a health problem; the limiter's free quota already steers calls elsewhere
+        LLM_TARGET_REQUESTS.inc(target=target.name, outcome='rate_limited')
+
+    def record_failure(self, target):
+        """Count a target-side error, ejecting the target once it has failed too often in a row"""
+        LLM_TARGET_REQUESTS.inc(target=target.name, outcome='error')
+        with self._lock:
+            target.failures += 1
+            now = self._clock()
+            # Calls that were already in flight when it was ejected do not extend the ejection
+            if target.failures < self.eject_after_failures or target.ejected_until > now:
+                return
+            seconds = min(self.eject_max_seconds, self.eject_seconds * 2 ** target.ejections)
+            target.ejected_until = now + seconds
+            target.ejections += 1
+
+        LLM_TARGET_EJECTIONS.inc(target=target.name)
+        print(f"Ejected Azure OpenAI target {target.name} for {seconds:.0f}s "
+              f"after {target.failures} consecutive failures")
+
+    def status(self):
+        """
+        Returns:
+            list: Per target health, latency and free quota, for the health check
+        """
+        now = self._clock()
+        limiters = [target.limiter() for target in self.targets]
+        quotas = available_quota(limiters)
+        status = []
+        for target, limiter, quota in zip(self.targets, limiters, quotas):
+            status.append({
+                'name': target.name,
+                'deployment': target.deployment,
+                'weight': target.weight,
+                'healthy': target.ejected_until <= now,
+                'ejected_for_seconds': round(max(0.0, target.ejected_until - now), 1),
+                'consecutive_failures': target.failures,
+                'latency_ms': {'stream' if stream else 'blocking': int(seconds * 1000)
+                               for stream, seconds in target.latency.items()},
+                'quota_available': round(quota, 3) if limiter else None
+            })
+        return status
@@ -1,14 +1,79 @@
-import openai
+import asyncio
+import hashlib
 import json
+import random
+import threading
 import time
 import traceback
-from config import OPENAI_CONFIG
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import OPENAI_CONFIG, RATE_LIMIT_CONFIG
+from services.hedging import acall_hedged, call_hedged
+from services.http_client import get_aiohttp_session, get_requests_session, request_timeout
+from services.json_repair import repair_json
+from services.llm_router import get_router
+from services.json_stream_parser import SectionStreamParser
+from services.metrics import LLM_REQUESTS, LLM_RESPONSE_REPAIRS, LLM_TOKENS, STAGE_SECONDS
+from services.sow_merge import merge_sow_results
+from services.sow_schema import SOW_SECTIONS, clean_section, validate_sow
+from services.text_chunker import split_into_chunks
+from services.text_compactor import estimate_tokens
+
+EXTRACTION_FAILED_ISSUE = "Failed to extract data from document"
+# The model's own verdict is not worth another request
+RETRYABLE_SECTIONS = tuple(key for key in SOW_SECTIONS if key != 'validation_summary')
+SECTIONS_PROMPT = ("Return only the {sections} section(s) of the output format, "
+                   "as one JSON object with exactly those keys.")
+
+_openai_configured = False
+
+
+def get_openai():
+    """
+    Import the openai client and point it at Azure, on first use.
+
+    openai pulls in requests and aiohttp, so processes and requests that
+    never call Azure do not pay for loading it.
+    """
+    global _openai_configured
+    import openai
+    if not _openai_configured:
+        openai.api_type = "azure"
+        openai.api_base = OPENAI_CONFIG['azure_endpoint']
+        openai.api_version = OPENAI_CONFIG['api_version']
+        openai.api_key = OPENAI_CONFIG['api_key']
+        openai.requestssession = get_requests_session()
+        _openai_configured = True
+    return openai
+
+
+def _target_errors(openai):
+    # Errors that point at the target rather than the request, so another target may well succeed
+    return (openai.error.APIError, openai.error.Timeout, openai.error.APIConnectionError,
+            openai.error.ServiceUnavailableError, openai.error.TryAgain,
+            openai.error.AuthenticationError, openai.error.PermissionError)
+
+
+class _StreamState:
+    """Accumulates a streamed completion and turns its deltas into token and section events"""
 
-# Configure OpenAI for Azure
-openai.api_type = "azure"
-openai.api_base = OPENAI_CONFIG['azure_endpoint']
-openai.api_version = OPENAI_CONFIG['api_version']
-openai.api_key = OPENAI_CONFIG['api_key']
+    def __init__(self):
+        self.start_time = time.time()
+        self.parser = SectionStreamParser()
+        self.content_parts = []
+        self.finish_reason = None
+
+    def feed(self, chunk):
+        # Azure sends a leading chunk with only content filter results
+        if not chunk.get('choices'):
+            return []
+        self.finish_reason = chunk['choices'][0].get('finish_reason') or self.finish_reason
+        delta = chunk['choices'][0].get('delta', {}).get('content')
+        if not delta:
+            return []
+        self.content_parts.append(delta)
+        return [{"event": "token", "data": delta}] + [
+            {"event": "section", "data": {"key": key, "value": value}} for key, value in self.parser.feed(delta)
+        ]
 
 
 class LLMService:
@@ -19,88 +84,646 @@ class LLMService:
         self.max_tokens = OPENAI_CONFIG['max_tokens']
         self.temperature = OPENAI_CONFIG['temperature']
         self.top_p = OPENAI_CONFIG['top_p']
+        self.chunk_max_chars = OPENAI_CONFIG['chunk_max_chars']
+        self.chunk_concurrency = OPENAI_CONFIG['chunk_concurrency']
+        self.router = get_router()
+        # Total tokens spent by this instance, across chunks and retries
+        self.tokens_used = 0
+        self._usage_lock = threading.Lock()
 
     def extract_sow_insights(self, document_text):
         """
         Extract SoW insights from document using Azure OpenAI.
         
+        Documents longer than the configured chunk size are split on section
+        boundaries, extracted in parallel and merged back into one result.
+        
         Args:
             document_text (str): Extracted text from document
             
         Returns:
             str: JSON string with extracted data
         """
-        prompt = self._build_sow_extraction_prompt()
+        chunks = split_into_chunks(document_text, self.chunk_max_chars)
         
-        try:
-            start_time = time.time()
-            
-            # Prepare messages for API call
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": document_text}
-            ]
-            
-            # Create request content for logging
-            request_data = {
-                "messages": messages,
-                "deployment": self.deployment,
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature,
-                "top_p": self.top_p
-            }
-            
-            # Call Azure OpenAI API
-            response = openai.ChatCompletion.create(
-                engine=self.deployment,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p
-            )
+        if len(chunks) > 1:
+            return self._extract_or_default(lambda: self._extract_chunked(chunks))
+        return self._extract_or_default(lambda: self._request_extraction(document_text))
+
+    async def aextract_sow_insights(self, document_text):
+        """extract_sow_insights for the asyncio server; waits on Azure without holding a thread"""
+        chunks = split_into_chunks(document_text, self.chunk_max_chars)
+        
+        if len(chunks) > 1:
+            return await self._aextract_or_default(self._aextract_chunked(chunks))
+        return await self._aextract_or_default(self._arequest_extraction(document_text))
+
+    def extract_sow_units(self, units, known_results):
+        """
+        Extract a document unit by unit, reusing results that are already known.
+        
+        Only units without a known result are sent to Azure OpenAI; every
+        result is then merged in document order.
+        
+        Args:
+            units (list): Unit texts in document order
+            known_results (list): Parsed result for each unit, or None to extract it
             
-            # Calculate latency
-            latency_ms = int((time.time() - start_time) * 1000)
+        Returns:
+            tuple: (JSON string with the merged data, list of per-unit results
+                with None where extraction failed)
+        """
+        results = list(known_results)
+        
+        def extract():
+            pending = [index for index, result in enumerate(results) if result is None]
+            failures = []
+            if pending:
+                extracted, failures = self.extract_parts([units[index] for index in pending], 'Section unit')
+                for index, result in zip(pending, extracted):
+                    results[index] = result
+            return self._merge_parts(results, failures, 'Document has no text to extract')
+        
+        return self._extract_or_default(extract), results
+
+    async def aextract_sow_units(self, units, known_results):
+        """extract_sow_units for the asyncio server"""
+        results = list(known_results)
+        
+        async def extract():
+            pending = [index for index, result in enumerate(results) if result is None]
+            failures = []
+            if pending:
+                extracted, failures = await self.aextract_parts([units[index] for index in pending], 'Section unit')
+                for index, result in zip(pending, extracted):
+                    results[index] = result
+            return self._merge_parts(results, failures, 'Document has no text to extract')
+        
+        return await self._aextract_or_default(extract()), results
+
+    def _extract_or_default(self, extract):
+        try:
+            return json.dumps(extract(), indent=2)
+        except Exception as e:
+            return self._default_for(e)
+
+    async def _aextract_or_default(self, extraction):
+        try:
+            return json.dumps(await extraction, indent=2)
+        except Exception as e:
+            return self._default_for(e)
+
+    def _default_for(self, error):
+        openai = get_openai()
+        traceback.print_exception(error)
+        
+        if isinstance(error, openai.error.InvalidRequestError):
+            print(f"Invalid request to Azure OpenAI: {str(error)}")
+            return json.dumps(self._get_default_response(f"Invalid request: {str(error)}"))
+        
+        if isinstance(error, openai.error.AuthenticationError):
+            print(f"Authentication error with Azure OpenAI: {str(error)}")
+            return json.dumps(self._get_default_response(f"Authentication error: {str(error)}"))
+        
+        if isinstance(error, json.JSONDecodeError):
+            print(f"Error parsing JSON from LLM response: {str(error)}")
+            return json.dumps(self._get_default_response(f"JSON parsing error: {str(error)}"))
+        
+        print(f"Error in LLM extraction: {str(error)}")
+        return json.dumps(self._get_default_response(str(error)))
+
+    def stream_sow_insights(self, document_text):
+        """
+        Stream SoW extraction from Azure OpenAI as it is generated.
+        
+        Documents that need chunking are extracted in one go and their
+        sections are emitted once the merged result is ready.
+        
+        Args:
+            document_text (str): Extracted text from document
             
-            # Extract the response content
-            content = response.choices[0].message.content
+        Yields:
+            dict: 'token' events with raw deltas, 'section' events with each
+                top-level key once its value closes, then one 'result' event
+                carrying the final JSON string
+        """
+        if len(split_into_chunks(document_text, self.chunk_max_chars)) > 1:
+            response_data = self.extract_sow_insights(document_text)
+            yield from self._section_events(json.loads(response_data))
+            yield {"event": "result", "data": response_data}
+            return
+        
+        stream = _StreamState()
+        
+        try:
+            messages = self._extraction_messages(document_text)
+            response = self._create_completion(messages, stream=True)
             
-            # Get token usage
-            tokens_used = response.get('usage', {}).get('total_tokens', 0)
+            for chunk in response:
+                yield from stream.feed(chunk)
             
-            print(f"Azure OpenAI call successful - Tokens: {tokens_used}, Latency: {latency_ms}ms")
+            result, cut_off = self._finish_stream(stream, messages)
+            requested = self._sections_to_request(result, cut_off)
+            recovered = self._request_sections(document_text, requested) if requested else {}
+            result = self._fit_to_schema(result, requested, recovered)
+            # Sections that came back from the follow-up request never streamed
+            yield from self._section_events({key: result[key] for key in recovered})
+            response_data = json.dumps(result, indent=2)
+        
+        except Exception as e:
+            print(f"Error in streamed LLM extraction: {str(e)}")
+            traceback.print_exc()
+            response_data = json.dumps(self._get_default_response(str(e)))
+        
+        yield {"event": "result", "data": response_data}
+
+    async def astream_sow_insights(self, document_text):
+        """stream_sow_insights for the asyncio server, as an async generator"""
+        if len(split_into_chunks(document_text, self.chunk_max_chars)) > 1:
+            response_data = await self.aextract_sow_insights(document_text)
+            for event in self._section_events(json.loads(response_data)):
+                yield event
+            yield {"event": "result", "data": response_data}
+            return
+        
+        stream = _StreamState()
+        
+        try:
+            messages = self._extraction_messages(document_text)
+            response = await self._acreate_completion(messages, stream=True)
             
-            # Extract and parse JSON from response
-            json_str = self._extract_json_from_response(content)
-            parsed_data = json.loads(json_str)
+            async for chunk in response:
+                for event in stream.feed(chunk):
+                    yield event
             
-            return json.dumps(parsed_data, indent=2)
+            result, cut_off = self._finish_stream(stream, messages)
+            requested = self._sections_to_request(result, cut_off)
+            recovered = await self._arequest_sections(document_text, requested) if requested else {}
+            result = self._fit_to_schema(result, requested, recovered)
+            for event in self._section_events({key: result[key] for key in recovered}):
+                yield event
+            response_data = json.dumps(result, indent=2)
         
-        except openai.error.InvalidRequestError as e:
-            print(f"Invalid request to Azure OpenAI: {str(e)}")
+        except Exception as e:
+            print(f"Error in streamed LLM extraction: {str(e)}")
             traceback.print_exc()
-            return json.dumps(self._get_default_response(
-                f"Invalid request: {str(e)}"
-            ))
+            response_data = json.dumps(self._get_default_response(str(e)))
         
-        except openai.error.AuthenticationError as e:
-            print(f"Authentication error with Azure OpenAI: {str(e)}")
-            traceback.print_exc()
-            return json.dumps(self._get_default_response(
-                f"Authentication error: {str(e)}"
-            ))
+        yield {"event": "result", "data": response_data}
+
+    @staticmethod
+    def _section_events(sections):
+        for key, value in sections.items():
+            yield {"event": "section", "data": {"key": key, "value": value}}
+
+    def _finish_stream(self, stream, messages):
+        elapsed = time.time() - stream.start_time
+        STAGE_SECONDS.observe(elapsed, stage='llm_stream')
+        content = ''.join(stream.content_parts)
+        # Streamed responses carry no usage block, so both sides are estimated locally
+        self._record_usage(sum(estimate_tokens(message['content']) for message in messages),
+                           estimate_tokens(content))
+        print(f"Azure OpenAI stream complete - Tokens: ~{self.tokens_used}, Latency: {int(elapsed * 1000)}ms")
+        
+        with STAGE_SECONDS.time(stage='json_parse'):
+            result, truncated = repair_json(content)
+        return result, truncated or stream.finish_reason == 'length'
+
+    def _request_extraction(self, document_text):
+        start_time = time.time()
+        response = self._create_completion(self._extraction_messages(document_text))
+        result, cut_off = self._parse_completion(response, start_time)
+        
+        requested = self._sections_to_request(result, cut_off)
+        recovered = self._request_sections(document_text, requested) if requested else {}
+        return self._fit_to_schema(result, requested, recovered)
+
+    async def _arequest_extraction(self, document_text):
+        start_time = time.time()
+        response = await self._acreate_completion(self._extraction_messages(document_text))
+        result, cut_off = self._parse_completion(response, start_time)
+        
+        requested = self._sections_to_request(result, cut_off)
+        recovered = await self._arequest_sections(document_text, requested) if requested else {}
+        return self._fit_to_schema(result, requested, recovered)
+
+    def _extraction_messages(self, document_text):
+        return [
+            {"role": "system", "content": self._build_sow_extraction_prompt()},
+            {"role": "user", "content": document_text}
+        ]
+
+    def _parse_completion(self, response, start_time):
+        """
+        Returns:
+            tuple: (parsed answer, True if it was cut off before it closed)
+        """
+        latency_ms = int((time.time() - start_time) * 1000)
+        content = response.choices[0].message.content
+        finish_reason = response.choices[0].get('finish_reason')
+        
+        usage = response.get('usage', {})
+        self._record_usage(usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0))
+        print(f"Azure OpenAI call successful - Tokens: {usage.get('total_tokens', 0)}, Latency: {latency_ms}ms")
+        
+        # Parse the JSON, repairing it locally rather than paying for the call again
+        with STAGE_SECONDS.time(stage='json_parse'):
+            result, truncated = repair_json(content)
+        return result, truncated or finish_reason == 'length'
+
+    def _sections_to_request(self, result, cut_off):
+        """
+        Sections a cut-off answer never reached, plus the one it stopped in.
+
+        Returns:
+            list: Section keys to request again; empty if the answer was complete
+        """
+        if not isinstance(result, dict):
+            raise ValueError('LLM response is not a JSON object')
+        if not cut_off:
+            return []
         
+        LLM_RESPONSE_REPAIRS.inc(kind='truncated')
+        started = [key for key in result if key in SOW_SECTIONS]
+        partial = started[-1] if started else None
+        return [key for key in RETRYABLE_SECTIONS if key not in result or key == partial]
+
+    def _fit_to_schema(self, result, requested, recovered):
+        """
+        Merge the recovered sections in and make the answer fit the output schema.
+
+        Sections still missing or malformed are trimmed to their valid items,
+        or emptied, and reported in validation_summary.
+        """
+        result.update(recovered)
+        issues = [f"Section {key} is incomplete: the response was cut off"
+                  for key in requested if key not in recovered]
+        for key, errors in validate_sow(result).items():
+            value = result.get(key)
+            result[key], dropped = clean_section(key, value)
+            if value is None:
+                continue
+            LLM_RESPONSE_REPAIRS.inc(kind='malformed_section')
+            print(f"Malformed {key} section: {'; '.join(errors[:3])}")
+            if dropped:
+                issues.append(f"Dropped {dropped} malformed item(s) from {key}")
+            elif key != 'validation_summary':
+                issues.append(f"Section {key} did not match the output format")
+        result['validation_summary']['issues_detected'].extend(issues)
+        return result
+
+    def _request_sections(self, document_text, sections):
+        """
+        Ask for only some sections of the output format.
+
+        Returns:
+            dict: The requested sections that came back complete and valid
+        """
+        try:
+            response = self._create_completion(self._sections_messages(document_text, sections))
+        except Exception as e:
+            # What the first answer held is still worth keeping
+            print(f"Error requesting missing sections: {str(e)}")
+            return {}
+        return self._recovered_sections(response, sections)
+
+    async def _arequest_sections(self, document_text, sections):
+        try:
+            response = await self._acreate_completion(self._sections_messages(document_text, sections))
+        except Exception as e:
+            print(f"Error requesting missing sections: {str(e)}")
+            return {}
+        return self._recovered_sections(response, sections)
+
+    def _sections_messages(self, document_text, sections):
+        print(f"Response was cut off - requesting {', '.join(sections)} again")
+        LLM_RESPONSE_REPAIRS.inc(kind='sections_requested')
+        return self._extraction_messages(document_text) + [
+            {"role": "user", "content": SECTIONS_PROMPT.format(sections=', '.join(sections))}
+        ]
+
+    def _recovered_sections(self, response, sections):
+        usage = response.get('usage', {})
+        self._record_usage(usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0))
+        try:
+            with STAGE_SECONDS.time(stage='json_parse'):
+                followup, truncated = repair_json(response.choices[0].message.content)
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON from LLM response: {str(e)}")
-            traceback.print_exc()
-            return json.dumps(self._get_default_response(
-                f"JSON parsing error: {str(e)}"
-            ))
+            print(f"Error parsing missing sections: {str(e)}")
+            return {}
+        
+        if not isinstance(followup, dict):
+            return {}
+        complete = [key for key in sections if key in followup]
+        if complete and (truncated or response.choices[0].get('finish_reason') == 'length'):
+            complete.pop()
+        problems = validate_sow(followup)
+        return {key: followup[key] for key in complete if key not in problems}
+
+    def _create_completion(self, messages, stream=False):
+        """
+        Call ChatCompletion.create on the router's pick, behind that target's quota limiter.
+
+        A target-side error is reported to the router and the call fails over
+        to a target it has not tried yet. 429s are retried with jittered
+        exponential backoff, never sooner than the response's Retry-After,
+        and the wait is shared with every other process through the limiter;
+        meanwhile the router sends calls to targets that still have quota.
+        """
+        openai = get_openai()
+        estimated_tokens = sum(estimate_tokens(message['content']) for message in messages) + self.max_tokens
+        max_retries = RATE_LIMIT_CONFIG['max_retries']
+        rate_limited = 0
+        failed = set()
+        
+        while True:
+            target = self.router.pick(stream, exclude=failed)
+            limiter = target.limiter()
+            if limiter:
+                with STAGE_SECONDS.time(stage='rate_limit_wait'):
+                    limiter.acquire(estimated_tokens)
+            hedge = {}
+            try:
+                # For streams this covers the time to the first byte; the body is timed as llm_stream
+                with STAGE_SECONDS.time(stage='llm_request'):
+                    _, response = call_hedged(
+                        lambda hedged: self._send(hedge['target'] if hedged else target, messages, stream),
+                        stream,
+                        admit_hedge=lambda: self._admit_hedge(target, stream, estimated_tokens, hedge)
+                    )
+                LLM_REQUESTS.inc(outcome='success')
+                break
+            except openai.error.RateLimitError as e:
+                delay = self._rate_limited(e, rate_limited, max_retries)
+                rate_limited += 1
+                if limiter:
+                    # acquire() on the next attempt waits this out, together with every other process
+                    limiter.block_for(delay)
+                else:
+                    time.sleep(delay)
+            except Exception as e:
+                LLM_REQUESTS.inc(outcome='error')
+                failed.add(target.name)
+                if not self._fails_over(openai, e, failed):
+                    raise
+        
+        for reserved in self._reserved(limiter, hedge, stream, response):
+            reserved.refund(estimated_tokens - response['usage']['total_tokens'])
+        return response
+
+    async def _acreate_completion(self, messages, stream=False):
+        """_create_completion on the event loop: quota and backoff waits are awaited, not slept"""
+        openai = get_openai()
+        estimated_tokens = sum(estimate_tokens(message['content']) for message in messages) + self.max_tokens
+        max_retries = RATE_LIMIT_CONFIG['max_retries']
+        rate_limited = 0
+        failed = set()
+        if get_aiohttp_session() is not None:
+            # openai 0.28 opens a new aiohttp session per request unless one is set for the task
+            openai.aiosession.set(get_aiohttp_session())
         
+        while True:
+            # Scoring reads each target's quota from SQLite
+            target = await asyncio.to_thread(self.router.pick, stream, failed)
+            limiter = target.limiter()
+            if limiter:
+                with STAGE_SECONDS.time(stage='rate_limit_wait'):
+                    await limiter.acquire_async(estimated_tokens)
+            hedge = {}
+            try:
+                with STAGE_SECONDS.time(stage='llm_request'):
+                    _, response = await acall_hedged(
+                        lambda hedged: self._asend(hedge['target'] if hedged else target, messages, stream),
+                        stream,
+                        admit_hedge=lambda: asyncio.to_thread(
+                            self._admit_hedge, target, stream, estimated_tokens, hedge
+                        )
+                    )
+                LLM_REQUESTS.inc(outcome='success')
+                break
+            except openai.error.RateLimitError as e:
+                delay = self._rate_limited(e, rate_limited, max_retries)
+                rate_limited += 1
+                if limiter:
+                    await asyncio.to_thread(limiter.block_for, delay)
+                else:
+                    await asyncio.sleep(delay)
+            except Exception as e:
+                LLM_REQUESTS.inc(outcome='error')
+                failed.add(target.name)
+                if not self._fails_over(openai, e, failed):
+                    raise
+        
+        for reserved in self._reserved(limiter, hedge, stream, response):
+            await asyncio.to_thread(reserved.refund, estimated_tokens - response['usage']['total_tokens'])
+        return response
+
+    def _send(self, target, messages, stream):
+        """
+        Returns:
+            tuple: (target, response), so the caller knows which request of a hedge answered
+        """
+        start_time = time.monotonic()
+        try:
+            response = get_openai().ChatCompletion.create(**self._completion_args(target, messages, stream))
         except Exception as e:
-            print(f"Error in LLM extraction: {str(e)}")
-            traceback.print_exc()
-            return json.dumps(self._get_default_response(str(e)))
+            self._record_error(target, e)
+            raise
+        self.router.record_success(target, stream, time.monotonic() - start_time)
+        return target, response
+
+    async def _asend(self, target, messages, stream):
+        start_time = time.monotonic()
+        try:
+            response = await get_openai().ChatCompletion.acreate(
+                **self._completion_args(target, messages, stream, asynchronous=True)
+            )
+        except Exception as e:
+            self._record_error(target, e)
+            raise
+        self.router.record_success(target, stream, time.monotonic() - start_time)
+        return target, response
+
+    def _admit_hedge(self, target, stream, estimated_tokens, hedge):
+        # The duplicate goes to another target when there is one, and only if it does not have to queue for quota
+        hedge['target'] = self.router.pick(stream, exclude={target.name})
+        limiter = hedge['target'].limiter()
+        if limiter is None:
+            return True
+        if not limiter.try_acquire(estimated_tokens):
+            return False
+        hedge['limiter'] = limiter
+        return True
+
+    @staticmethod
+    def _reserved(limiter, hedge, stream, response):
+        """
+        Limiters holding an estimate for a finished call that the real usage settles.
+
+        A hedged call reserved on both targets. Both requests carried the
+        same prompt, so the loser is settled at the winner's usage too.
+        Streams report no usage and keep their estimate.
+        """
+        if stream or not response.get('usage', {}).get('total_tokens'):
+            return []
+        return [reserved for reserved in (limiter, hedge.get('limiter')) if reserved]
+
+    def _record_error(self, target, error):
+        openai = get_openai()
+        if isinstance(error, openai.error.RateLimitError):
+            self.router.record_rate_limited(target)
+        elif isinstance(error, _target_errors(openai)):
+            self.router.record_failure(target)
+
+    def _fails_over(self, openai, error, failed):
+        """Whether a failed call moves on: only for target-side errors, while there are targets left to try"""
+        if not isinstance(error, _target_errors(openai)) or len(failed) >= len(self.router.targets):
+            return False
+        print(f"Azure OpenAI target failed, failing over ({len(failed)}/{len(self.router.targets)}): {str(error)}")
+        return True
+
+    def _completion_args(self, target, messages, stream, asynchronous=False):
+        return {
+            'engine': target.deployment,
+            'api_base': target.endpoint,
+            'api_key': target.api_key,
+            'api_version': target.api_version,
+            'api_type': 'azure',
+            'messages': messages,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'top_p': self.top_p,
+            'stream': stream,
+            'request_timeout': request_timeout(asynchronous)
+        }
+
+    def _rate_limited(self, error, attempt, max_retries):
+        """Count a 429 and return how long to back off, re-raising once retries run out"""
+        LLM_REQUESTS.inc(outcome='rate_limited')
+        if attempt == max_retries:
+            print(f"Azure OpenAI rate limited, giving up after {attempt + 1} attempts")
+            raise error
+        delay = self._retry_delay(error, attempt)
+        print(f"Azure OpenAI rate limited - retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        return delay
+
+    def _record_usage(self, prompt_tokens, completion_tokens):
+        LLM_TOKENS.inc(prompt_tokens, type='prompt')
+        LLM_TOKENS.inc(completion_tokens, type='completion')
+        with self._usage_lock:
+            self.tokens_used += prompt_tokens + completion_tokens
+
+    @staticmethod
+    def _retry_delay(error, attempt):
+        headers = getattr(error, 'headers', None) or {}
+        retry_after = 0.0
+        try:
+            if headers.get('retry-after-ms'):
+                retry_after = float(headers['retry-after-ms']) / 1000
+            elif headers.get('retry-after'):
+                retry_after = float(headers['retry-after'])
+        except (TypeError, ValueError):
+            pass
+        
+        backoff = min(RATE_LIMIT_CONFIG['backoff_max_seconds'],
+                      RATE_LIMIT_CONFIG['backoff_base_seconds'] * 2 ** attempt)
+        if retry_after:
+            # Spread the herd a little past the server's Retry-After rather than before it
+            return retry_after * random.uniform(1.0, 1.1)
+        return random.uniform(backoff / 2, backoff)
+
+    def _extract_chunked(self, chunks):
+        print(f"Extracting {len(chunks)} chunks with concurrency {self.chunk_concurrency}")
+        results, failures = self.extract_parts(chunks)
+        return self._merge_parts(results, failures, 'All chunks failed')
+
+    async def _aextract_chunked(self, chunks):
+        print(f"Extracting {len(chunks)} chunks with concurrency {self.chunk_concurrency}")
+        results, failures = await self.aextract_parts(chunks)
+        return self._merge_parts(results, failures, 'All chunks failed')
+
+    @staticmethod
+    def _merge_parts(results, failures, empty_message):
+        partial_results = [result for result in results if result is not None]
+        if not partial_results:
+            raise RuntimeError(failures[0] if failures else empty_message)
+        
+        merged = merge_sow_results(partial_results)
+        merged['validation_summary']['issues_detected'].extend(failures)
+        return merged
+
+    def extract_parts(self, parts, label='Chunk'):
+        """
+        Extract each part with its own request, chunk_concurrency at a time.
+        
+        Returns:
+            tuple: (parsed result per part, None where it failed; failure messages)
+        """
+        results = [None] * len(parts)
+        failures = []
+        
+        with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, len(parts))) as executor:
+            futures = {
+                executor.submit(self._request_extraction, part): index
+                for index, part in enumerate(parts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"Error extracting {label.lower()} {index + 1}/{len(parts)}: {str(e)}")
+                    traceback.print_exc()
+                    failures.append(f"{label} {index + 1} of {len(parts)} failed: {str(e)}")
+        
+        return results, failures
+
+    async def aextract_parts(self, parts, label='Chunk'):
+        """extract_parts as concurrent tasks, chunk_concurrency in flight at a time"""
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
+        async def extract(part):
+            async with semaphore:
+                return await self._arequest_extraction(part)
+        
+        outcomes = await asyncio.gather(*(extract(part) for part in parts), return_exceptions=True)
+        results = []
+        failures = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error extracting {label.lower()} {index + 1}/{len(parts)}: {str(outcome)}")
+                traceback.print_exception(outcome)
+                failures.append(f"{label} {index + 1} of {len(parts)} failed: {str(outcome)}")
+                outcome = None
+            results.append(outcome)
+        
+        return results, failures
+
+    def get_model_fingerprint(self):
+        """
+        Hash of everything besides the document that shapes the extraction output.
+
+        Returns:
+            str: SHA-256 of the prompt, deployment and sampling parameters
+        """
+        fingerprint_source = json.dumps({
+            "prompt": self._build_sow_extraction_prompt(),
+            "deployment": self.deployment,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "chunk_max_chars": self.chunk_max_chars
+        }, sort_keys=True)
+        return hashlib.sha256(fingerprint_source.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_default_response(response_data):
+        try:
+            parsed = json.loads(response_data)
+        except (TypeError, ValueError):
+            return True
+        issues = parsed.get('validation_summary', {}).get('issues_detected', [])
+        return EXTRACTION_FAILED_ISSUE in issues
 
     def _build_sow_extraction_prompt(self):
         return """## **Prompt Instruction: Salesforce Implementation Scope Extractor**
@@ -242,20 +865,6 @@ Produce the output **as a single JSON object inside Markdown code fences**:
 
 **IMPORTANT**: Only return the JSON object. Do not include any additional text, explanation, or markdown formatting outside the JSON code fence."""
 
-    def _extract_json_from_response(self, content):
-        if '```json' in content:
-            start = content.find('```json') + 7
-            end = content.find('```', start)
-            if end != -1:
-                return content[start:end].strip()
-        elif '```' in content:
-            start = content.find('```') + 3
-            end = content.find('```', start)
-            if end != -1:
-                return content[start:end].strip()
-        
-        return content.strip()
-
     def _get_default_response(self, error_msg):
         return {
             "scope_summary": {
@@ -271,7 +880,7 @@ Produce the output **as a single JSON object inside Markdown code fences**:
             "validation_summary": {
                 "json_validity": False,
                 "issues_detected": [
-                    "Failed to extract data from document"
+                    EXTRACTION_FAILED_ISSUE
                 ]
             }
         }
@@ -0,0 +1,346 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; spans fast DB writes through slow multi-chunk LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metric:
+    kind = None
+    # False for a value that already covers every process, so it is rendered as this process last set it
+    shared = True
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self, values=None):
+        """
+        Args:
+            values: Merged state from every process, as returned by _merge();
+                this process's own state when None
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples(values))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _rows(self):
+        with self._lock:
+            return [(json.dumps(key), value) for key, value in self._values.items()]
+
+    def _merge(self, rows):
+        values = {}
+        for sample, value in rows:
+            key = tuple(json.loads(sample))
+            values[key] = values.get(key, 0) + value
+        return values
+
+    def _samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}"
+                for key, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, label_names=(), shared=True):
+        super().__init__(name, documentation, label_names)
+        self.shared = shared
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _rows(self):
+        rows = []
+        with self._lock:
+            for key, series in self._series.items():
+                rows.extend((json.dumps([key, index]), count) for index, count in enumerate(series['buckets']))
+                rows.append((json.dumps([key, 'sum']), series['sum']))
+                rows.append((json.dumps([key, 'count']), series['count']))
+        return rows
+
+    def _merge(self, rows):
+        merged = {}
+        for sample, value in rows:
+            key, field = json.loads(sample)
+            series = merged.setdefault(tuple(key), {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            if field in ('sum', 'count'):
+                series[field] += value
+            elif field < len(self.buckets):
+                series['buckets'][field] += value
+        return merged
+
+    def _samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = {key: dict(series, buckets=list(series['buckets'])) for key, series in self._series.items()}
+        lines = []
+        for key, series in sorted(values.items()):
+            bounds = [*self.buckets, '+Inf']
+            counts = [*series['buckets'], series['count']]
+            for bound, count in zip(bounds, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names + ('le',), key + (bound,))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._shared = None
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def share(self, state_path, flush_seconds=5):
+        """
+        Pool samples with every process that shares state_path.
+
+        Each process writes its own samples to the file every flush_seconds,
+        at exit and whenever it renders, so any worker behind the port
+        renders the whole server's metrics. Counters and histograms of
+        processes that have exited keep counting; their gauges are dropped.
+        """
+        self._shared = SharedMetricsStore(state_path)
+        # A previous process with this pid left without being folded in
+        self._shared.retire(os.getpid(), self._gauge_names())
+        atexit.register(self.flush)
+        if flush_seconds > 0:
+            threading.Thread(target=self._flush_loop, args=(flush_seconds,), name='metrics-flush',
+                             daemon=True).start()
+
+    def flush(self):
+        if self._shared:
+            self._shared.write(os.getpid(), {metric.name: metric._rows() for metric in self._metrics
+                                             if metric.shared})
+
+    def render(self):
+        merged = None
+        if self._shared:
+            self.flush()
+            merged = self._shared.read(self._gauge_names())
+        lines = []
+        for metric in self._metrics:
+            values = metric._merge(merged.get(metric.name, [])) if merged is not None and metric.shared else None
+            lines.extend(metric.render(values))
+        return '\n'.join(lines) + '\n'
+
+    def _gauge_names(self):
+        return {metric.name for metric in self._metrics if metric.kind == 'gauge'}
+
+    def _flush_loop(self, flush_seconds):
+        while True:
+            time.sleep(flush_seconds)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error flushing metrics: {str(e)}")
+
+
+class SharedMetricsStore:
+    """
+    Per-process metric samples in a small SQLite file.
+
+    Plain sqlite3 rather than the connection pool, which is itself
+    instrumented here. Each process replaces its own rows with its current
+    totals, so a write is idempotent. Rows of a process that no longer
+    exists are folded into pid 0.
+    """
+
+    def __init__(self, state_path):
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        self.state_path = state_path
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                '''CREATE TABLE IF NOT EXISTS metric_samples (
+                       pid INTEGER NOT NULL,
+                       metric TEXT NOT NULL,
+                       sample TEXT NOT NULL,
+                       value NUMERIC NOT NULL,
+                       PRIMARY KEY (pid, metric, sample)
+                   )'''
+            )
+
+    def write(self, pid, rows_by_metric):
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM metric_samples WHERE pid = ?', (pid,))
+            connection.executemany(
+                'INSERT INTO metric_samples (pid, metric, sample, value) VALUES (?, ?, ?, ?)',
+                [(pid, metric, sample, value) for metric, rows in rows_by_metric.items() for sample, value in rows]
+            )
+            connection.execute('COMMIT')
+
+    def read(self, gauge_names):
+        """
+        Returns:
+            dict: (sample, value) rows per metric name, for every process
+        """
+        with self._connect() as connection:
+            pids = [row[0] for row in connection.execute('SELECT DISTINCT pid FROM metric_samples WHERE pid != 0')]
+        for pid in pids:
+            if not _process_alive(pid):
+                self.retire(pid, gauge_names)
+
+        merged = {}
+        with self._connect() as connection:
+            for metric, sample, value in connection.execute('SELECT metric, sample, value FROM metric_samples'):
+                merged.setdefault(metric, []).append((sample, value))
+        return merged
+
+    def retire(self, pid, gauge_names):
+        """Fold an exited process's counters and histograms into pid 0 and drop its gauges"""
+        gauges = tuple(gauge_names)
+        placeholders = ', '.join('?' * len(gauges))
+        with self._connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                f'''INSERT INTO metric_samples (pid, metric, sample, value)
+                    SELECT 0, metric, sample, value FROM metric_samples
+                    WHERE pid = ? AND metric NOT IN ({placeholders})
+                    ON CONFLICT (pid, metric, sample) DO UPDATE SET value = metric_samples.value + excluded.value''',
+                (pid,) + gauges
+            )
+            connection.execute('DELETE FROM metric_samples WHERE pid = ?', (pid,))
+            connection.execute('COMMIT')
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM metric_samples')
+
+    def _connect(self):
+        # Autocommit mode, so the explicit BEGIN IMMEDIATE above owns the transaction
+        return _closing(sqlite3.connect(self.state_path, timeout=5, isolation_level=None))
+
+
+@contextmanager
+def _closing(connection):
+    try:
+        yield connection
+    except Exception:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        raise
+    finally:
+        connection.close()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reset_shared_metrics(state_path):
+    """Start a new server's metrics from zero; called by the gunicorn master before it forks workers"""
+    SharedMetricsStore(state_path).clear()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'ids_stage_duration_seconds', 'Time spent in each document processing stage', ('stage',)
+))
+DB_WRITE_SECONDS = REGISTRY.register(Histogram(
+    'ids_db_write_duration_seconds', 'SQLite write time including the write-lock wait', ('operation', 'table')
+))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    'ids_llm_requests_total', 'Azure OpenAI chat completion attempts by outcome', ('outcome',)
+))
+LLM_TARGET_REQUESTS = REGISTRY.register(Counter(
+    'ids_llm_target_requests_total', 'Azure OpenAI requests per routing target by outcome', ('target', 'outcome')
+))
+LLM_TARGET_EJECTIONS = REGISTRY.register(Counter(
+    'ids_llm_target_ejections_total', 'Times a failing Azure OpenAI target was taken out of rotation', ('target',)
+))
+LLM_HEDGES = REGISTRY.register(Counter(
+    'ids_llm_hedges_total', 'Duplicate Azure OpenAI requests sent for a late first byte, and how many won', ('outcome',)
+))
+LLM_RESPONSE_REPAIRS = REGISTRY.register(Counter(
+    'ids_llm_response_repairs_total', 'LLM answers fixed up locally instead of re-run, by kind', ('kind',)
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    'ids_llm_tokens_total', 'Tokens reported (or estimated for streams) by Azure OpenAI', ('type',)
+))
+RESULT_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'ids_result_cache_lookups_total', 'LLM result cache lookups', ('result',)
+))
+DOCUMENTS_PROCESSED = REGISTRY.register(Counter(
+    'ids_documents_processed_total', 'Documents that finished processing, by final status', ('status',)
+))
+# Set from the jobs table when /api/metrics is scraped, so it already counts every process's jobs
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'ids_job_queue_depth', 'Jobs waiting for a worker', shared=False
+))
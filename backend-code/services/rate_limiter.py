@@ -0,0 +1,215 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from database.connection_pool import get_pool
+from config import RATE_LIMIT_CONFIG
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimitTimeoutError(Exception):
+    pass
+
+
+def get_rate_limiter(deployment, tokens_per_minute=None, requests_per_minute=None):
+    """
+    Return the shared limiter for a deployment, sized from RATE_LIMIT_CONFIG.
+
+    Args:
+        deployment (str): Azure OpenAI deployment name; each has its own quota
+        tokens_per_minute (int): Quota override for this deployment
+        requests_per_minute (int): Quota override for this deployment
+
+    Returns:
+        TokenBucketLimiter: Limiter whose state is shared by every process
+            using the same state file
+    """
+    with _limiters_lock:
+        if deployment not in _limiters:
+            _limiters[deployment] = TokenBucketLimiter(
+                RATE_LIMIT_CONFIG['state_path'],
+                deployment,
+                tokens_per_minute or RATE_LIMIT_CONFIG['tokens_per_minute'],
+                requests_per_minute or RATE_LIMIT_CONFIG['requests_per_minute'],
+                RATE_LIMIT_CONFIG['max_wait_seconds']
+            )
+        return _limiters[deployment]
+
+
+def available_quota(limiters):
+    """
+    available() for several limiters, with one read per state file instead of one each.
+
+    Args:
+        limiters (list): TokenBucketLimiters, or None where calls are not limited
+
+    Returns:
+        list: Free share of each quota, 1.0 where the limiter is None
+    """
+    quotas = [1.0] * len(limiters)
+    by_pool = {}
+    for index, limiter in enumerate(limiters):
+        if limiter:
+            by_pool.setdefault(limiter.db, []).append(index)
+
+    for db, indexes in by_pool.items():
+        names = [limiters[index].name for index in indexes]
+        rows = db.fetch_all(
+            f"SELECT * FROM rate_limit_buckets WHERE name IN ({', '.join('?' * len(names))})",
+            tuple(names)
+        )
+        rows_by_name = {row['name']: row for row in rows}
+        for index in indexes:
+            quotas[index] = limiters[index]._available(rows_by_name.get(limiters[index].name))
+    return quotas
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket admission control for one deployment's TPM and RPM quota.
+
+    Both buckets live in a small SQLite file and are refilled and debited
+    inside BEGIN IMMEDIATE transactions, so every worker process draws from
+    the same quota. A 429 blocks the whole bucket until its Retry-After has
+    passed, which keeps the other processes from piling onto the same limit.
+    """
+
+    def __init__(self, state_path, name, tokens_per_minute, requests_per_minute, max_wait_seconds=120,
+                 clock=time.time, sleep=time.sleep):
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        self.db = get_pool(state_path)
+        self.name = name
+        self.token_capacity = float(tokens_per_minute)
+        self.request_capacity = float(requests_per_minute)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self.db.execute_query(
+            '''CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                   name TEXT PRIMARY KEY,
+                   tokens REAL NOT NULL,
+                   requests REAL NOT NULL,
+                   blocked_until REAL DEFAULT 0,
+                   updated_at REAL NOT NULL
+               )''',
+            ()
+        )
+
+    def acquire(self, token_cost):
+        """
+        Block until both buckets can cover one request of token_cost tokens.
+
+        Args:
+            token_cost (int): Estimated prompt plus completion tokens
+
+        Returns:
+            float: Seconds spent waiting for capacity
+
+        Raises:
+            RateLimitTimeoutError: If capacity does not free up within max_wait_seconds
+        """
+        # A request bigger than the whole bucket could never be admitted otherwise
+        token_cost = min(float(token_cost), self.token_capacity)
+        waited = 0.0
+
+        while True:
+            wait = self._next_wait(self._try_acquire(token_cost), waited)
+            if wait <= 0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, token_cost):
+        """acquire() for the event loop: the bucket is checked on a thread and the wait is awaited"""
+        token_cost = min(float(token_cost), self.token_capacity)
+        waited = 0.0
+
+        while True:
+            wait = self._next_wait(await asyncio.to_thread(self._try_acquire, token_cost), waited)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, token_cost):
+        """Take capacity for one request only if it is free right now, e.g. for an optional hedge"""
+        return self._try_acquire(min(float(token_cost), self.token_capacity)) <= 0
+
+    def available(self):
+        """Share of the quota free right now, 0 while blocked; reads the bucket without taking from it"""
+        return self._available(self._bucket())
+
+    def _available(self, row):
+        tokens, requests, blocked_until, now = self._refill(row)
+        if blocked_until > now:
+            return 0.0
+        return max(0.0, min(tokens / self.token_capacity, requests / self.request_capacity))
+
+    def _next_wait(self, wait, waited):
+        if wait <= 0:
+            return 0.0
+        if waited + wait > self.max_wait_seconds:
+            raise RateLimitTimeoutError(
+                f"No capacity on {self.name} within {self.max_wait_seconds}s"
+            )
+        # Small jitter so processes woken together do not all retry in the same instant
+        return min(wait, 1.0) * random.uniform(1.0, 1.2)
+
+    def refund(self, token_count):
+        """Return over-estimated tokens once the real usage is known"""
+        if token_count <= 0:
+            return
+        with self.db.transaction():
+            tokens, requests, blocked_until, now = self._refilled_state()
+            self._save(min(self.token_capacity, tokens + token_count), requests, blocked_until, now)
+
+    def block_for(self, seconds):
+        """Hold every process off this deployment, e.g. for a 429's Retry-After"""
+        with self.db.transaction():
+            tokens, requests, blocked_until, now = self._refilled_state()
+            self._save(tokens, requests, max(blocked_until, now + seconds), now)
+
+    def _try_acquire(self, token_cost):
+        with self.db.transaction():
+            tokens, requests, blocked_until, now = self._refilled_state()
+            if blocked_until > now:
+                wait = blocked_until - now
+            elif tokens >= token_cost and requests >= 1:
+                self._save(tokens - token_cost, requests - 1, blocked_until, now)
+                return 0.0
+            else:
+                wait = max((token_cost - tokens) / self._token_rate(), (1 - requests) / self._request_rate())
+            self._save(tokens, requests, blocked_until, now)
+        return wait
+
+    def _refilled_state(self):
+        return self._refill(self._bucket())
+
+    def _bucket(self):
+        return self.db.fetch_one('SELECT * FROM rate_limit_buckets WHERE name = ?', (self.name,))
+
+    def _refill(self, row):
+        now = self._clock()
+        if not row:
+            return self.token_capacity, self.request_capacity, 0.0, now
+        elapsed = max(0.0, now - row['updated_at'])
+        tokens = min(self.token_capacity, row['tokens'] + elapsed * self._token_rate())
+        requests = min(self.request_capacity, row['requests'] + elapsed * self._request_rate())
+        return tokens, requests, row['blocked_until'] or 0.0, now
+
+    def _save(self, tokens, requests, blocked_until, now):
+        self.db.execute_query(
+            '''INSERT OR REPLACE INTO rate_limit_buckets
+               (name, tokens, requests, blocked_until, updated_at)
+               VALUES (?, ?, ?, ?, ?)''',
+            (self.name, tokens, requests, blocked_until, now)
+        )
+
+    def _token_rate(self):
+        return self.token_capacity / 60.0
+
+    def _request_rate(self):
+        return self.request_capacity / 60.0
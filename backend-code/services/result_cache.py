@@ -0,0 +1,55 @@
+import hashlib
+from datetime import datetime
+
+
+class ResultCache:
+    """
+    Caches LLM extraction results keyed on the document text and the exact
+    prompt/model settings that produced them.
+
+    The model fingerprint is part of every key, so editing the prompt or
+    switching deployment simply stops old rows from matching; purge_stale()
+    then drops them.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def build_key(text_hash, model_fingerprint):
+        return hashlib.sha256(f"{text_hash}:{model_fingerprint}".encode('utf-8')).hexdigest()
+
+    def get(self, text, model_fingerprint):
+        cache_key = self.build_key(self.hash_text(text), model_fingerprint)
+        entry = self.db.fetch_one(
+            'SELECT * FROM llm_result_cache WHERE cache_key = ?',
+            (cache_key,)
+        )
+        if entry:
+            self.db.execute_query(
+                '''UPDATE llm_result_cache SET hit_count = hit_count + 1, last_hit_at = ?
+                   WHERE cache_key = ?''',
+                (datetime.utcnow(), cache_key)
+            )
+        return entry
+
+    def put(self, text, model_fingerprint, response_payload, tokens_used=0):
+        text_hash = self.hash_text(text)
+        self.db.execute_query(
+            '''INSERT OR REPLACE INTO llm_result_cache
+               (cache_key, text_hash, model_fingerprint, response_payload,
+                tokens_used, hit_count, created_at, last_hit_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (self.build_key(text_hash, model_fingerprint), text_hash, model_fingerprint,
+             response_payload, tokens_used, 0, datetime.utcnow(), None)
+        )
+
+    def purge_stale(self, model_fingerprint):
+        self.db.execute_query(
+            'DELETE FROM llm_result_cache WHERE model_fingerprint != ?',
+            (model_fingerprint,)
+        )
@@ -0,0 +1,238 @@
+import html
+import json
+import re
+from datetime import datetime
+from services.document_processor import EXTRACTOR_VERSION
+from services.llm_service import LLMService
+from services.text_store import ExtractedTextStore
+
+SEARCH_KINDS = ('text', 'scope', 'modules', 'business_units', 'licenses', 'assumptions')
+
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+WORD = re.compile(r'\w+')
+FILTER_CHARACTERS = re.compile(r'[^\W_]+')
+# Stripped from indexed text, so they can mark hits safely until the snippet is HTML-escaped
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 16
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word must match; "quoted words" must match as a phrase and a
+    trailing * matches a prefix. FTS5 operators in the input are treated
+    as plain words, so no user input can produce a syntax error.
+
+    Raises:
+        ValueError: If the query has no searchable words
+    """
+    terms = []
+    for phrase, token in QUERY_TOKEN.findall(query or ''):
+        words = WORD.findall(phrase or token)
+        if not words:
+            continue
+        term = f'''"{' '.join(words)}"'''
+        if token.endswith('*') and len(words) == 1:
+            term += '*'
+        terms.append(term)
+    if not terms:
+        raise ValueError('q must contain at least one word')
+    return f"{{title body}} : ({' '.join(terms)})"
+
+
+def filter_token(value):
+    # Ids are indexed as one alphanumeric token so a filter matches exactly one value
+    return ''.join(FILTER_CHARACTERS.findall(value))
+
+
+def _any_of(column, values):
+    phrases = ' OR '.join(f'"{filter_token(value)}"' for value in values)
+    return f"{column} : ({phrases})"
+
+
+def sow_sections(sow):
+    """Flatten an extraction into (kind, text) pairs, one per searchable section"""
+    scope = sow.get('scope_summary') or {}
+    sections = {
+        'scope': [f"In scope: {item}" for item in scope.get('in_scope') or []] +
+                 [f"Out of scope: {item}" for item in scope.get('out_of_scope') or []],
+        'modules': [],
+        'business_units': [],
+        'licenses': [],
+        'assumptions': [str(item) for item in sow.get('assumptions') or []]
+    }
+    for module in _objects(sow.get('modules')):
+        sections['modules'].append(' - '.join(str(value) for value in (
+            module.get('module_name'), module.get('description')) if value))
+        sections['modules'].extend(str(process) for process in module.get('processes') or [])
+    for unit in _objects(sow.get('business_units')):
+        sections['business_units'].append(str(unit.get('business_unit_name') or ''))
+        sections['business_units'].extend(
+            ', '.join(str(person[key]) for key in ('name', 'designation', 'email') if person.get(key))
+            for person in _objects(unit.get('stakeholders'))
+        )
+    for license in _objects(sow.get('salesforce_licenses')):
+        sections['licenses'].append(' '.join(str(value) for value in (
+            license.get('license_type'), license.get('count')) if value))
+
+    return [(kind, '\n'.join(line for line in lines if line)) for kind, lines in sections.items()
+            if any(lines)]
+
+
+class SearchIndex:
+    """
+    FTS5 index over each document's extracted text and its latest SoW extraction.
+
+    Every document has one 'text' entry plus one entry per SoW section, so a
+    hit can say where it matched. Entries are replaced whenever the document
+    is processed again.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def index_document(self, document, text, stream_id=None, response_data=None):
+        """
+        Replace a document's entries.
+
+        Args:
+            document (dict): documents row
+            text (str): Full extracted text, or None to index only the SoW
+            stream_id (str): Stream the SoW came from
+            response_data (str): SoW JSON; fallback payloads are not indexed
+        """
+        entries = [('text', text)] if text else []
+        if response_data and not LLMService.is_default_response(response_data):
+            entries.extend(sow_sections(json.loads(response_data)))
+        entries = [(kind, body.replace(MARK_START, '').replace(MARK_END, '')) for kind, body in entries]
+
+        with self.db.transaction():
+            self.db.execute_query(
+                '''DELETE FROM search_index WHERE rowid IN
+                   (SELECT id FROM search_entries WHERE document_id = ?)''',
+                (document['document_id'],)
+            )
+            self.db.execute_query('DELETE FROM search_entries WHERE document_id = ?', (document['document_id'],))
+            if not entries:
+                return
+
+            # Ids are handed out under the write lock, so they can be shared by both inserts
+            first_id = self.db.fetch_one('SELECT COALESCE(MAX(id), 0) + 1 AS id FROM search_entries')['id']
+            now = datetime.utcnow()
+            self.db.execute_many(
+                '''INSERT INTO search_entries (id, workspace_id, document_id, kind, stream_id, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                [(first_id + offset, document['workspace_id'], document['document_id'], kind,
+                  None if kind == 'text' else stream_id, now)
+                 for offset, (kind, _) in enumerate(entries)]
+            )
+            self.db.execute_many(
+                'INSERT INTO search_index (rowid, title, body, workspace_id, kind) VALUES (?, ?, ?, ?, ?)',
+                [(first_id + offset, document['file_name'], body, filter_token(document['workspace_id']),
+                  filter_token(kind))
+                 for offset, (kind, body) in enumerate(entries)]
+            )
+
+    def remove_document(self, document_id):
+        """Drop a deleted document's entries"""
+        with self.db.transaction():
+            self.db.execute_query(
+                '''DELETE FROM search_index WHERE rowid IN
+                   (SELECT id FROM search_entries WHERE document_id = ?)''',
+                (document_id,)
+            )
+            self.db.execute_query('DELETE FROM search_entries WHERE document_id = ?', (document_id,))
+
+    def remove_workspace(self, workspace_id):
+        """Drop a deleted workspace's entries so they stop taking up ranked result slots"""
+        with self.db.transaction():
+            self.db.execute_query(
+                '''DELETE FROM search_index WHERE rowid IN
+                   (SELECT id FROM search_entries WHERE workspace_id = ?)''',
+                (workspace_id,)
+            )
+            self.db.execute_query('DELETE FROM search_entries WHERE workspace_id = ?', (workspace_id,))
+
+    def backfill(self):
+        """
+        Index completed documents that have no entries yet, e.g. after the index was added.
+
+        Returns:
+            int: Number of documents indexed
+        """
+        documents = self.db.fetch_all(
+            '''SELECT * FROM documents d
+               WHERE d.status = ?
+               AND NOT EXISTS (SELECT 1 FROM search_entries e WHERE e.document_id = d.document_id)''',
+            ('completed',)
+        )
+        text_store = ExtractedTextStore(self.db)
+        for document in documents:
+            stream = self.db.fetch_one(
+                '''SELECT stream_id, response_payload FROM llm_streams
+                   WHERE document_id = ? AND status = ?
+                   ORDER BY created_at DESC LIMIT 1''',
+                (document['document_id'], 'success')
+            ) or {}
+            # Rows uploaded before content hashes were stored only get their SoW indexed
+            text = text_store.get(document['content_hash'], EXTRACTOR_VERSION) if document['content_hash'] else None
+            self.index_document(document, text, stream.get('stream_id'), stream.get('response_payload'))
+        return len(documents)
+
+    def search(self, query, workspace_ids=(), kinds=(), limit=20, offset=0):
+        """
+        Rank entries matching query with BM25, file names weighted above body text.
+
+        Args:
+            query (str): Free text, see build_match_query
+            workspace_ids (list): Only search these workspaces; empty for all
+            kinds (list): Only search these entry kinds; empty for all
+            limit (int): Maximum hits
+            offset (int): Hits to skip
+
+        Returns:
+            list: Hits with workspace, document, kind, score and HTML-escaped
+                title and snippet, matches wrapped in <mark>
+        """
+        match = build_match_query(query)
+        # Filters go into the MATCH so FTS5 ranks and limits only the rows that qualify
+        if workspace_ids:
+            workspace_ids = [workspace_id for workspace_id in workspace_ids if filter_token(workspace_id)]
+            if not workspace_ids:
+                return []
+            match += f" AND {_any_of('workspace_id', workspace_ids)}"
+        if kinds:
+            match += f" AND {_any_of('kind', kinds)}"
+
+        # Ranking and snippets run inside the subquery, so only the returned page is highlighted
+        hits = self.db.fetch_all(
+            '''SELECT e.workspace_id, w.name AS workspace_name, e.document_id, e.kind, e.stream_id,
+                      hit.title, hit.snippet, hit.score
+               FROM (
+                   SELECT rowid, rank AS score,
+                          highlight(search_index, 0, ?1, ?2) AS title,
+                          snippet(search_index, 1, ?1, ?2, ?3, ?4) AS snippet
+                   FROM search_index
+                   WHERE search_index MATCH ?5
+                   ORDER BY rank
+                   LIMIT ?6 OFFSET ?7
+               ) hit
+               JOIN search_entries e ON e.id = hit.rowid
+               JOIN workspaces w ON w.workspace_id = e.workspace_id AND w.status = ?8
+               JOIN documents d ON d.document_id = e.document_id AND d.status != ?9
+               ORDER BY hit.score''',
+            (MARK_START, MARK_END, '…', SNIPPET_TOKENS, match, limit, offset, 'active', 'deleted')
+        )
+        for hit in hits:
+            hit['title'] = _mark(hit['title'])
+            hit['snippet'] = _mark(hit['snippet'])
+        return hits
+
+
+def _mark(text):
+    return html.escape(text or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _objects(values):
+    return [value for value in values or [] if isinstance(value, dict)]
@@ -0,0 +1,100 @@
+def merge_sow_results(results):
+    """
+    Merge partial SoW extraction results into one result.
+
+    Modules, business units and licenses are matched case-insensitively by
+    name; their processes and stakeholders are combined and deduplicated.
+
+    Args:
+        results (list): Parsed extraction dicts in document order
+
+    Returns:
+        dict: Single extraction result in the documented output schema
+    """
+    merged = {
+        "scope_summary": {"in_scope": [], "out_of_scope": []},
+        "modules": [],
+        "business_units": [],
+        "salesforce_licenses": [],
+        "assumptions": [],
+        "validation_summary": {"json_validity": True, "issues_detected": []}
+    }
+    modules = {}
+    business_units = {}
+    licenses = {}
+
+    for result in results:
+        scope = result.get('scope_summary') or {}
+        _extend_unique(merged['scope_summary']['in_scope'], scope.get('in_scope'))
+        _extend_unique(merged['scope_summary']['out_of_scope'], scope.get('out_of_scope'))
+        _extend_unique(merged['assumptions'], result.get('assumptions'))
+
+        for module in result.get('modules') or []:
+            _merge_module(merged['modules'], modules, module)
+        for business_unit in result.get('business_units') or []:
+            _merge_business_unit(merged['business_units'], business_units, business_unit)
+        for license_item in result.get('salesforce_licenses') or []:
+            _merge_license(merged['salesforce_licenses'], licenses, license_item)
+
+        validation = result.get('validation_summary') or {}
+        if str(validation.get('json_validity', True)).lower() == 'false':
+            merged['validation_summary']['json_validity'] = False
+        _extend_unique(merged['validation_summary']['issues_detected'], validation.get('issues_detected'))
+
+    return merged
+
+
+def _key(value):
+    return ' '.join(str(value or '').lower().split())
+
+
+def _extend_unique(target, items):
+    seen = {_key(item) for item in target}
+    for item in items or []:
+        if _key(item) not in seen:
+            seen.add(_key(item))
+            target.append(item)
+
+
+def _merge_module(target, index, module):
+    key = _key(module.get('module_name'))
+    existing = index.get(key)
+    if existing is None:
+        existing = dict(module, processes=[])
+        index[key] = existing
+        target.append(existing)
+    elif not existing.get('description') and module.get('description'):
+        existing['description'] = module['description']
+    _extend_unique(existing['processes'], module.get('processes'))
+
+
+def _merge_business_unit(target, index, business_unit):
+    key = _key(business_unit.get('business_unit_name'))
+    existing = index.get(key)
+    if existing is None:
+        existing = dict(business_unit, stakeholders=[])
+        index[key] = existing
+        target.append(existing)
+
+    seen = {_stakeholder_key(stakeholder) for stakeholder in existing['stakeholders']}
+    for stakeholder in business_unit.get('stakeholders') or []:
+        if _stakeholder_key(stakeholder) not in seen:
+            seen.add(_stakeholder_key(stakeholder))
+            existing['stakeholders'].append(stakeholder)
+
+
+def _stakeholder_key(stakeholder):
+    email = _key(stakeholder.get('email'))
+    if email and email != 'unknown@example.com':
+        return email
+    return _key(stakeholder.get('name')), _key(stakeholder.get('designation'))
+
+
+def _merge_license(target, index, license_item):
+    key = _key(license_item.get('license_type'))
+    existing = index.get(key)
+    if existing is None:
+        index[key] = dict(license_item)
+        target.append(index[key])
+    elif _key(existing.get('count')) in ('', 'unknown', 'not specified'):
+        existing['count'] = license_item.get('count', existing.get('count'))
@@ -0,0 +1,115 @@
+import copy
+
+# The output format from the extraction prompt. A key ending in '?' may be left out;
+# a list holds items of its one element's shape; a tuple lists the accepted types.
+SOW_SCHEMA = {
+    'scope_summary': {'in_scope': [str], 'out_of_scope': [str]},
+    'modules': [{'module_name': str, 'description?': str, 'processes?': [str]}],
+    'business_units': [{
+        'business_unit_name': str,
+        'stakeholders?': [{'name': str, 'designation?': str, 'email?': str}]
+    }],
+    'salesforce_licenses': [{'license_type': str, 'count?': (str, int, float)}],
+    'assumptions': [str],
+    'validation_summary': {'json_validity': (bool, str), 'issues_detected': [str]}
+}
+
+SOW_SECTIONS = tuple(SOW_SCHEMA)
+
+EMPTY_SECTIONS = {
+    'scope_summary': {'in_scope': [], 'out_of_scope': []},
+    'modules': [],
+    'business_units': [],
+    'salesforce_licenses': [],
+    'assumptions': [],
+    'validation_summary': {'json_validity': True, 'issues_detected': []}
+}
+
+TYPE_NAMES = {str: 'string', int: 'number', float: 'number', bool: 'boolean'}
+
+
+def _compile(spec):
+    """Turn a schema fragment into a check(value, path, errors) function, once"""
+    if isinstance(spec, dict):
+        fields = [(key.rstrip('?'), key.endswith('?'), _compile(value)) for key, value in spec.items()]
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected object")
+                return
+            for key, optional, check in fields:
+                if key in value:
+                    if not (optional and value[key] is None):
+                        check(value[key], f"{path}.{key}", errors)
+                elif not optional:
+                    errors.append(f"{path}.{key}: missing")
+        return check_object
+
+    if isinstance(spec, list):
+        check_item = _compile(spec[0])
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected array")
+                return
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        return check_array
+
+    types = spec if isinstance(spec, tuple) else (spec,)
+    expected = ' or '.join(dict.fromkeys(TYPE_NAMES[t] for t in types))
+
+    def check_scalar(value, path, errors):
+        if not isinstance(value, types):
+            errors.append(f"{path}: expected {expected}")
+    return check_scalar
+
+
+SECTION_CHECKS = {key: _compile(spec) for key, spec in SOW_SCHEMA.items()}
+ITEM_CHECKS = {key: _compile(spec[0]) for key, spec in SOW_SCHEMA.items() if isinstance(spec, list)}
+
+
+def validate_sow(result):
+    """
+    Check an extraction against the documented output schema.
+
+    Args:
+        result: Parsed extraction
+
+    Returns:
+        dict: Error messages per section that is missing or malformed; empty
+            when the result is valid
+    """
+    if not isinstance(result, dict):
+        return {key: [f"{key}: missing"] for key in SOW_SECTIONS}
+    problems = {}
+    for key, check in SECTION_CHECKS.items():
+        errors = []
+        if key in result:
+            check(result[key], key, errors)
+        else:
+            errors.append(f"{key}: missing")
+        if errors:
+            problems[key] = errors
+    return problems
+
+
+def clean_section(key, value):
+    """
+    Keep what is usable of a malformed section.
+
+    Arrays lose only their malformed items; anything else is replaced by the
+    empty section.
+
+    Returns:
+        tuple: (usable value, number of items dropped)
+    """
+    if key in ITEM_CHECKS and isinstance(value, list):
+        kept = []
+        for item in value:
+            errors = []
+            ITEM_CHECKS[key](item, key, errors)
+            if not errors:
+                kept.append(item)
+        return kept, len(value) - len(kept)
+    return copy.deepcopy(EMPTY_SECTIONS[key]), 0
@@ -0,0 +1,148 @@
+import json
+import re
+from datetime import datetime
+from services.llm_service import LLMService
+
+SOW_TABLES = ('sow_scope_items', 'sow_modules', 'sow_processes', 'sow_business_units',
+              'sow_stakeholders', 'sow_licenses')
+
+LIST_MARKER = re.compile(r'^\s*[-*•]\s*')
+LICENSE_COUNT = re.compile(r'\d[\d,]*')
+
+# The stream GET /workspaces/<id>/data shows: latest completed document, latest successful stream
+CURRENT_STREAM_QUERY = """
+    SELECT w.workspace_id, d.document_id, s.stream_id, s.response_payload,
+           src.stream_id AS synced_stream_id
+    FROM workspaces w
+    LEFT JOIN documents d ON d.document_id = (
+        SELECT document_id FROM documents
+        WHERE workspace_id = w.workspace_id AND status = 'completed'
+        ORDER BY created_at DESC LIMIT 1
+    )
+    LEFT JOIN llm_streams s ON s.stream_id = (
+        SELECT stream_id FROM llm_streams
+        WHERE document_id = d.document_id AND status = 'success'
+        ORDER BY created_at DESC LIMIT 1
+    )
+    LEFT JOIN sow_sources src ON src.workspace_id = w.workspace_id
+"""
+
+
+class SowStore:
+    """
+    Relational copy of each workspace's current SoW extraction.
+
+    llm_streams keeps the full JSON payload; these tables hold its modules,
+    processes, business units, stakeholders, licenses and scope items as
+    indexed rows, so cross-workspace lookups never parse a payload.
+    sow_sources records which stream the rows came from.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def sync_workspace(self, workspace_id):
+        """
+        Rewrite a workspace's rows if its current stream has changed.
+
+        Args:
+            workspace_id (str): Workspace whose rows to refresh
+
+        Returns:
+            bool: True if the rows were rewritten
+        """
+        with self.db.transaction():
+            current = self.db.fetch_one(
+                f'{CURRENT_STREAM_QUERY} WHERE w.workspace_id = ?', (workspace_id,)
+            )
+            if not current or current['stream_id'] == current['synced_stream_id']:
+                return False
+            self._replace(current)
+        return True
+
+    def sync_all(self):
+        """
+        Bring every active workspace up to date, e.g. after the tables were added.
+
+        Returns:
+            int: Number of workspaces rewritten
+        """
+        stale = self.db.fetch_all(
+            f'''SELECT workspace_id FROM ({CURRENT_STREAM_QUERY} WHERE w.status = 'active')
+                WHERE stream_id IS NOT synced_stream_id'''
+        )
+        return sum(self.sync_workspace(row['workspace_id']) for row in stale)
+
+    def _replace(self, current):
+        workspace_id = current['workspace_id']
+        for table in SOW_TABLES:
+            self.db.execute_query(f'DELETE FROM {table} WHERE workspace_id = ?', (workspace_id,))
+
+        payload = current['response_payload']
+        # The fallback payload's placeholder scope would only pollute lookups
+        if payload and not LLMService.is_default_response(payload):
+            source = (workspace_id, current['document_id'], current['stream_id'])
+            for table, columns, rows in self._rows(json.loads(payload)):
+                if rows:
+                    placeholders = ', '.join('?' for _ in range(len(columns) + 3))
+                    self.db.execute_many(
+                        f'''INSERT INTO {table} (workspace_id, document_id, stream_id, {', '.join(columns)})
+                            VALUES ({placeholders})''',
+                        [source + row for row in rows]
+                    )
+
+        self.db.execute_query(
+            '''INSERT OR REPLACE INTO sow_sources (workspace_id, document_id, stream_id, updated_at)
+               VALUES (?, ?, ?, ?)''',
+            (workspace_id, current['document_id'], current['stream_id'], datetime.utcnow())
+        )
+
+    @staticmethod
+    def _rows(sow):
+        scope = sow.get('scope_summary') or {}
+        scope_items = [('in', _text(item), position) for position, item in enumerate(scope.get('in_scope') or [])]
+        scope_items += [('out', _text(item), position)
+                        for position, item in enumerate(scope.get('out_of_scope') or [])]
+
+        modules, processes = [], []
+        for module_position, module in enumerate(_objects(sow.get('modules'))):
+            module_name = _text(module.get('module_name'))
+            modules.append((module_name, module.get('description'), module_position))
+            processes += [(module_position, module_name, _text(process), position)
+                          for position, process in enumerate(module.get('processes') or [])]
+
+        business_units, stakeholders = [], []
+        for unit_position, unit in enumerate(_objects(sow.get('business_units'))):
+            unit_name = _text(unit.get('business_unit_name'))
+            business_units.append((unit_name, unit_position))
+            stakeholders += [(unit_position, unit_name, person.get('name'), person.get('designation'),
+                              person.get('email'), position)
+                             for position, person in enumerate(_objects(unit.get('stakeholders')))]
+
+        licenses = []
+        for position, license in enumerate(_objects(sow.get('salesforce_licenses'))):
+            count_text = license.get('count')
+            count_match = LICENSE_COUNT.search(str(count_text or ''))
+            license_count = int(count_match.group().replace(',', '')) if count_match else None
+            licenses.append((_text(license.get('license_type')), license_count,
+                             None if count_text is None else str(count_text), position))
+
+        return (
+            ('sow_scope_items', ('scope', 'item', 'position'), [row for row in scope_items if row[1]]),
+            ('sow_modules', ('module_name', 'description', 'position'), modules),
+            ('sow_processes', ('module_position', 'module_name', 'process', 'position'),
+             [row for row in processes if row[2]]),
+            ('sow_business_units', ('name', 'position'), business_units),
+            ('sow_stakeholders', ('business_unit_position', 'business_unit', 'name', 'designation', 'email',
+                                  'position'), stakeholders),
+            ('sow_licenses', ('license_type', 'license_count', 'count_text', 'position'), licenses)
+        )
+
+
+def _objects(values):
+    return [value for value in values or [] if isinstance(value, dict)]
+
+
+def _text(value):
+    # Model output mixes "- item" bullets with plain strings
+    return LIST_MARKER.sub('', str(value or '')).strip()
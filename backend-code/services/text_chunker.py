@@ -0,0 +1,71 @@
+import re
+
+# Form feeds mark page breaks; blank lines separate sections and paragraphs
+BLOCK_SEPARATOR = re.compile(r'\f|\n\s*\n')
+SECTION_HEADING = re.compile(r'^\s*(\d+(\.\d+)*[.)]?\s+\S|[A-Z][A-Z0-9 &/,-]{3,}$|(?i:section|appendix)\b)')
+
+
+def split_into_chunks(text, max_chars):
+    """
+    Split document text into chunks no longer than max_chars.
+
+    Breaks fall on page and section boundaries where possible, then on line
+    boundaries, and only cut mid-line when a single line exceeds max_chars.
+
+    Args:
+        text (str): Full document text
+        max_chars (int): Maximum length of a chunk
+
+    Returns:
+        list: Chunk strings in document order
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = []
+    current_len = 0
+
+    for block in _split_blocks(text, max_chars):
+        starts_section = bool(SECTION_HEADING.match(block.split('\n', 1)[0]))
+        # Prefer to close a chunk at a section heading once it is reasonably full
+        should_flush = current_len + len(block) > max_chars or (
+            starts_section and current_len > max_chars // 2
+        )
+        if current and should_flush:
+            chunks.append('\n\n'.join(current))
+            current, current_len = [], 0
+        current.append(block)
+        current_len += len(block) + 2
+
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def _split_blocks(text, max_chars):
+    for block in BLOCK_SEPARATOR.split(text):
+        block = block.strip()
+        if not block:
+            continue
+        if len(block) <= max_chars:
+            yield block
+            continue
+        yield from _split_long_block(block, max_chars)
+
+
+def _split_long_block(block, max_chars):
+    current = ''
+    for line in block.split('\n'):
+        while len(line) > max_chars:
+            if current:
+                yield current
+                current = ''
+            yield line[:max_chars]
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            yield current
+            current = ''
+        current = f"{current}\n{line}" if current else line
+    if current:
+        yield current
@@ -0,0 +1,99 @@
+import re
+from collections import Counter
+
+from services.text_chunker import SECTION_HEADING
+
+# Rough BPE estimate: long words split into ~4-character pieces, punctuation is its own token
+TOKEN_PIECE = re.compile(r'\w{1,4}|[^\w\s]')
+PAGE_NUMBER = re.compile(r'^(page\s*)?\d{1,4}(\s*(of|/)\s*\d{1,4})?$|^-\s*\d{1,4}\s*-$', re.IGNORECASE)
+HEADING_NUMBER = re.compile(r'^\s*(\d+(\.\d+)*)')
+# Contract clause headings that never carry scope, modules, stakeholders or licenses.
+# Matched against the whole heading title so "Warranty Claims Process" is kept.
+BOILERPLATE_CLAUSE = (r'(confidentiality|limitation of liability|indemnification|indemnity|governing law|'
+                      r'jurisdiction|force majeure|warranties|warranty disclaimer|severability|'
+                      r'entire agreement|non-solicitation|dispute resolution|notices|'
+                      r'intellectual property( rights)?)')
+BOILERPLATE_HEADING = re.compile(rf'^{BOILERPLATE_CLAUSE}( (and|&) {BOILERPLATE_CLAUSE})*$')
+# Header/footer lines are looked for this many lines in from each page edge
+PAGE_EDGE_LINES = 2
+MIN_PAGES_FOR_REPEATS = 3
+
+
+def estimate_tokens(text):
+    return len(TOKEN_PIECE.findall(text))
+
+
+def compact_text(text):
+    """
+    Shrink extracted document text before it is sent to the LLM.
+
+    Drops page numbers, headers and footers that repeat across pages and
+    legal boilerplate sections, and collapses whitespace runs. Pages are
+    expected to be separated by form feeds, as DocumentProcessor emits them.
+
+    Args:
+        text (str): Raw extracted text
+
+    Returns:
+        tuple: (compacted text, {'tokens_before': int, 'tokens_after': int})
+    """
+    pages = [_normalise_lines(page) for page in text.split('\f')]
+    repeated = _repeated_edge_lines(pages)
+
+    kept_pages = []
+    for lines in pages:
+        kept = [line for line in lines if not PAGE_NUMBER.match(line) and _repeat_key(line) not in repeated]
+        kept_pages.append('\n'.join(kept))
+
+    lines = _drop_boilerplate_sections('\n'.join(kept_pages).split('\n'))
+    compacted = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+    return compacted, {
+        'tokens_before': estimate_tokens(text),
+        'tokens_after': estimate_tokens(compacted)
+    }
+
+
+def _normalise_lines(page):
+    lines = [re.sub(r'[ \t ]+', ' ', line).strip() for line in page.split('\n')]
+    # Keep single blank lines, they mark paragraph and section boundaries for the chunker
+    return [line for index, line in enumerate(lines) if line or (index and lines[index - 1])]
+
+
+def _repeat_key(line):
+    # Digits vary between pages ("Page 3 of 12"), so compare lines with them masked
+    return re.sub(r'\d+', '#', line.lower())
+
+
+def _repeated_edge_lines(pages):
+    if len(pages) < MIN_PAGES_FOR_REPEATS:
+        return set()
+
+    page_counts = Counter()
+    for lines in pages:
+        content = [line for line in lines if line]
+        edges = content[:PAGE_EDGE_LINES] + content[-PAGE_EDGE_LINES:]
+        page_counts.update({_repeat_key(line) for line in edges})
+
+    return {key for key, count in page_counts.items() if count * 2 >= len(pages)}
+
+
+def _drop_boilerplate_sections(lines):
+    kept = []
+    skipping_number = None
+    skipping = False
+
+    for line in lines:
+        if line and SECTION_HEADING.match(line):
+            number = HEADING_NUMBER.match(line)
+            number = number.group(1) if number else None
+            # Numbered sub-clauses (12.1, 12.2, ...) stay inside a skipped section 12
+            if skipping and skipping_number and number and number.startswith(f"{skipping_number}."):
+                continue
+            title = re.sub(r'^[\d.)\s]+|[:.\s]+$', '', line).lower()
+            skipping = bool(BOILERPLATE_HEADING.match(title))
+            skipping_number = number if skipping else None
+        if not skipping:
+            kept.append(line)
+
+    return kept
@@ -0,0 +1,43 @@
+import hashlib
+import zlib
+from datetime import datetime
+
+HASH_READ_SIZE = 1024 * 1024
+
+
+class ExtractedTextStore:
+    """
+    Keeps the full extracted text of each uploaded file, zlib-compressed and
+    keyed by the SHA-256 of the file contents, so reprocessing never has to
+    parse the same PDF or DOCX twice.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def hash_file(file_path):
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(HASH_READ_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, content_hash, extractor_version):
+        entry = self.db.fetch_one(
+            '''SELECT compressed_text FROM extracted_texts
+               WHERE content_hash = ? AND extractor_version = ?''',
+            (content_hash, extractor_version)
+        )
+        if not entry:
+            return None
+        return zlib.decompress(entry['compressed_text']).decode('utf-8')
+
+    def put(self, content_hash, extractor_version, text):
+        self.db.execute_query(
+            '''INSERT OR REPLACE INTO extracted_texts
+               (content_hash, extractor_version, compressed_text, char_count, created_at)
+               VALUES (?, ?, ?, ?, ?)''',
+            (content_hash, extractor_version, zlib.compress(text.encode('utf-8')),
+             len(text), datetime.utcnow())
+        )
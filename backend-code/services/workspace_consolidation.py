@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+from services.llm_service import LLMService
+from services.sow_merge import merge_sow_results
+
+# Each live document's latest successful stream, skipping versions a completed revision replaces
+CONTRIBUTING_STREAMS_QUERY = """
+    SELECT d.document_id, s.stream_id
+    FROM documents d
+    JOIN llm_streams s ON s.stream_id = (
+        SELECT stream_id FROM llm_streams
+        WHERE document_id = d.document_id AND status = 'success'
+        ORDER BY created_at DESC LIMIT 1
+    )
+    WHERE d.workspace_id = ? AND d.status = 'completed'
+    AND NOT EXISTS (
+        SELECT 1 FROM documents revision
+        WHERE revision.previous_document_id = d.document_id AND revision.status = 'completed'
+    )
+    ORDER BY s.created_at, d.document_id
+"""
+
+
+class WorkspaceConsolidator:
+    """
+    One SoW for a workspace, merged locally from its documents' extractions.
+
+    The cached result remembers the streams it was built from. A newly
+    completed document is folded into it on its own. Removing or
+    re-extracting a document re-merges the stored per-document results
+    instead. Neither case calls the LLM.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def refresh(self, workspace_id):
+        """
+        Bring the cached result up to date with the workspace's documents and return it.
+
+        Cheap when nothing changed: two reads, without taking the write lock,
+        so clients polling the view never wait behind document writers.
+
+        Returns:
+            dict: workspace_consolidations row with sources and result_payload
+                decoded
+        """
+        current, cached, cached_sources = self._load(workspace_id)
+        if cached and cached_sources == current:
+            return self._decode(cached)
+
+        with self.db.transaction():
+            # Re-read under the write lock, in case another request rebuilt it in the meantime
+            current, cached, cached_sources = self._load(workspace_id)
+            if cached and cached_sources == current:
+                return self._decode(cached)
+            if cached and current[:len(cached_sources)] == cached_sources:
+                # Only additions since the last build: fold the new documents into the cached result
+                base = [json.loads(cached['result_payload'])]
+                added = current[len(cached_sources):]
+            else:
+                base = []
+                added = current
+
+            result = merge_sow_results(base + self._results([stream_id for _, stream_id in added]))
+            now = datetime.utcnow()
+            self.db.execute_query(
+                '''INSERT OR REPLACE INTO workspace_consolidations
+                   (workspace_id, sources, result_payload, updated_at)
+                   VALUES (?, ?, ?, ?)''',
+                (workspace_id, json.dumps(current), json.dumps(result), now)
+            )
+        print(f"Consolidated workspace {workspace_id} - "
+              f"{'folded in' if base else 'merged'} {len(added)} of {len(current)} documents")
+        return {'workspace_id': workspace_id, 'sources': current, 'result_payload': result, 'updated_at': now}
+
+    def _load(self, workspace_id):
+        """
+        Returns:
+            tuple: (current [document_id, stream_id] sources, cached row or
+                None, the cached row's sources)
+        """
+        current = [[row['document_id'], row['stream_id']]
+                   for row in self.db.fetch_all(CONTRIBUTING_STREAMS_QUERY, (workspace_id,))]
+        cached = self.db.fetch_one(
+            'SELECT * FROM workspace_consolidations WHERE workspace_id = ?', (workspace_id,)
+        )
+        return current, cached, json.loads(cached['sources']) if cached else []
+
+    def _results(self, stream_ids):
+        if not stream_ids:
+            return []
+        rows = self.db.fetch_all(
+            f'''SELECT stream_id, response_payload FROM llm_streams
+                WHERE stream_id IN ({', '.join('?' for _ in stream_ids)})''',
+            stream_ids
+        )
+        payloads = {row['stream_id']: row['response_payload'] for row in rows}
+        # A failed extraction's placeholder text would otherwise land in every merged view
+        return [json.loads(payloads[stream_id]) for stream_id in stream_ids
+                if not LLMService.is_default_response(payloads.get(stream_id))]
+
+    @staticmethod
+    def _decode(row):
+        return dict(row, sources=json.loads(row['sources']), result_payload=json.loads(row['result_payload']))
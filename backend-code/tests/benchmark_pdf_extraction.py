@@ -0,0 +1,83 @@
+"""
+Benchmark for serial vs process-pool PDF text extraction.
+
+Generates synthetic PDFs of increasing page count and times both modes:
+python tests/benchmark_pdf_extraction.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config import DOCUMENT_CONFIG  # noqa: E402
+from services.document_processor import DocumentProcessor, _extract_pdf_page_range, _get_pdf_pool  # noqa: E402
+
+PAGE_COUNTS = [10, 50, 100, 200, 400]
+LINES_PER_PAGE = 45
+
+
+def build_pdf(path, page_count):
+    """Write a minimal text PDF with page_count pages of SoW-like lines"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(page_count):
+        lines = ' '.join(
+            f"({page + 1}.{line} The vendor shall configure Sales Cloud lead routing) Tj 0 -14 Td"
+            for line in range(LINES_PER_PAGE)
+        )
+        stream = f"BT /F1 10 Tf 40 760 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>"
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref_offset = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    body += ''.join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('latin-1')
+    with open(path, 'wb') as file:
+        file.write(body)
+
+
+def time_extraction(processor, path):
+    start = time.perf_counter()
+    text = processor.extract_text(path)
+    return time.perf_counter() - start, text
+
+
+if __name__ == '__main__':
+    print("PDF Extraction Benchmark (serial vs process pool)\n")
+    print("=" * 60)
+    print(f"Workers: {DOCUMENT_CONFIG['pdf_workers']}, CPUs: {os.cpu_count()}\n")
+    # Time the parallel path at every size, not just above the production threshold
+    DOCUMENT_CONFIG['pdf_parallel_min_pages'] = 0
+    serial = DocumentProcessor(parallel=False)
+    parallel = DocumentProcessor(parallel=True)
+
+    print(f"{'pages':>6} {'serial (s)':>12} {'parallel (s)':>14} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Warm the pool so worker start-up is not billed to the first run
+        warmup_path = os.path.join(tmp_dir, 'warmup.pdf')
+        build_pdf(warmup_path, 1)
+        _get_pdf_pool().submit(_extract_pdf_page_range, warmup_path, 0, 1).result()
+
+        for page_count in PAGE_COUNTS:
+            path = os.path.join(tmp_dir, f"sow_{page_count}.pdf")
+            build_pdf(path, page_count)
+            serial_seconds, serial_text = time_extraction(serial, path)
+            parallel_seconds, parallel_text = time_extraction(parallel, path)
+            assert serial_text == parallel_text
+            print(f"{page_count:>6} {serial_seconds:>12.3f} {parallel_seconds:>14.3f} "
+                  f"{serial_seconds / parallel_seconds:>8.2f}x")
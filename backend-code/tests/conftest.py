@@ -0,0 +1,35 @@
+import os
+
+import pytest
+from flask import Flask
+
+from database.connection_pool import get_pool, close_all_pools
+from database.migrations import apply_migrations
+from routes.document_routes import document_bp
+from routes.job_routes import job_bp
+from routes.llm_routes import llm_bp
+from routes.metrics_routes import metrics_bp
+from routes.search_routes import search_bp
+from routes.sow_routes import sow_bp
+from routes.workspace_routes import workspace_bp
+from services.job_queue import JobQueue
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Blueprints on a throwaway migrated database, without the job workers running"""
+    db_path = os.path.join(str(tmp_path), 'ids.db')
+    monkeypatch.setenv('DATABASE_PATH', db_path)
+    pool = get_pool(db_path)
+    apply_migrations(pool)
+
+    app = Flask(__name__)
+    app.config['UPLOAD_FOLDER'] = os.path.join(str(tmp_path), 'uploads')
+    job_queue = JobQueue(db_path)
+    job_queue.register_handler('process_document', lambda db, payload: None)
+    app.extensions['job_queue'] = job_queue
+    for blueprint in (workspace_bp, document_bp, llm_bp, job_bp, metrics_bp, sow_bp, search_bp):
+        app.register_blueprint(blueprint, url_prefix='/api')
+
+    yield app.test_client(), pool
+    close_all_pools()
@@ -0,0 +1,191 @@
+"""
+Test file for the asyncio serving mode.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_async_server.py -v
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime
+from unittest import mock
+
+from aiohttp.test_utils import TestClient, TestServer
+from openai.openai_object import OpenAIObject
+
+from async_server import create_app
+
+SOW = {'scope_summary': {'in_scope': ['CPQ rollout'], 'out_of_scope': []},
+       'modules': [{'module_name': 'CPQ', 'processes': ['Quote']}],
+       'business_units': [],
+       'salesforce_licenses': [{'license_type': 'Revenue Cloud', 'count': '5'}],
+       'assumptions': [],
+       'validation_summary': {'json_validity': True, 'issues_detected': []}}
+
+
+def completion(content):
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+def chunk(content, finish_reason=None):
+    return OpenAIObject.construct_from({
+        'choices': [{'delta': {'content': content}, 'finish_reason': finish_reason}]
+    })
+
+
+def seed_documents(pool, tmp_path, count):
+    now = datetime.utcnow()
+    pool.execute_query(
+        '''INSERT INTO workspaces (workspace_id, name, project_type, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        ('ws-1', 'Async', 'Greenfield', 'active', now, now)
+    )
+    document_ids = []
+    for index in range(count):
+        path = tmp_path / f"sow-{index}.txt"
+        path.write_text(f"Statement of work {index}: CPQ rollout with quoting.")
+        document_ids.append(f"doc-{index}")
+        pool.execute_query(
+            '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                      status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (f"doc-{index}", 'ws-1', 'SOW', path.name, str(path), 'uploaded', now, now)
+        )
+    return document_ids
+
+
+def azure_disabled():
+    return mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+        mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': False})
+
+
+def test_queued_extractions_share_one_event_loop(client, tmp_path):
+    """Test many queued extractions wait on Azure together without a thread each"""
+    _, pool = client
+    document_ids = seed_documents(pool, tmp_path, 50)
+    in_flight = {'now': 0, 'peak': 0, 'threads': 0}
+
+    async def fake_acreate(**kwargs):
+        in_flight['now'] += 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+        in_flight['threads'] = max(in_flight['threads'], threading.active_count())
+        await asyncio.sleep(0.3)
+        in_flight['now'] -= 1
+        return completion(json.dumps(SOW))
+
+    async def run():
+        async with TestClient(TestServer(create_app(pool.db_path))) as http:
+            jobs = []
+            for document_id in document_ids:
+                response = await http.post(f"/api/documents/{document_id}/process")
+                assert response.status == 202
+                jobs.append(await response.json())
+
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                statuses = [(await (await http.get(f"/api/jobs/{job['job_id']}")).json())['status']
+                            for job in jobs]
+                if all(status in ('completed', 'failed') for status in statuses):
+                    return statuses
+            return statuses
+
+    rate_limits, cache = azure_disabled()
+    with rate_limits, cache, mock.patch('openai.ChatCompletion.acreate', side_effect=fake_acreate):
+        statuses = asyncio.run(run())
+
+    print(f"\nPeak requests in flight: {in_flight['peak']}, peak threads: {in_flight['threads']}")
+    assert statuses == ['completed'] * 50
+    assert in_flight['peak'] == 50
+    assert in_flight['threads'] < 20
+
+    rows = pool.fetch_all('SELECT status FROM documents ORDER BY document_id')
+    assert {row['status'] for row in rows} == {'completed'}
+    stream = pool.fetch_one('SELECT * FROM llm_streams WHERE document_id = ?', ('doc-0',))
+    assert json.loads(stream['response_payload'])['modules'] == SOW['modules']
+    assert stream['tokens_used'] == 120
+
+
+def test_streamed_extraction_sends_sections_as_they_arrive(client, tmp_path):
+    """Test the async events endpoint streams sections and finishes with the saved row"""
+    _, pool = client
+    seed_documents(pool, tmp_path, 1)
+    content = json.dumps(SOW)
+    pieces = [content[i:i + 40] for i in range(0, len(content), 40)]
+
+    async def fake_acreate(**kwargs):
+        assert kwargs['stream'] is True
+
+        async def chunks():
+            for piece in pieces:
+                yield chunk(piece)
+            yield chunk('', 'stop')
+        return chunks()
+
+    async def run():
+        async with TestClient(TestServer(create_app(pool.db_path))) as http:
+            started = await (await http.post('/api/documents/doc-0/process?mode=stream')).json()
+            events = await http.get(started['events_url'])
+            assert events.headers['Content-Type'] == 'text/event-stream'
+            body = await events.text()
+            replay = await (await http.get(started['events_url'])).text()
+            return started, body, replay
+
+    rate_limits, cache = azure_disabled()
+    with rate_limits, cache, mock.patch('openai.ChatCompletion.acreate', side_effect=fake_acreate):
+        started, body, replay = asyncio.run(run())
+
+    events = [block.split('\n', 1) for block in body.strip().split('\n\n')]
+    names = [name[len('event: '):] for name, _ in events]
+    print(f"\nStreamed events: {names}")
+    assert names.count('section') == len(SOW)
+    assert names[-1] == 'done'
+    done = json.loads(events[-1][1][len('data: '):])
+    assert done['stream_id'] == started['stream_id']
+    assert done['status'] == 'success'
+    assert replay.startswith('event: done')
+    assert pool.fetch_one('SELECT status FROM documents WHERE document_id = ?', ('doc-0',))['status'] == 'completed'
+
+
+def test_unreadable_file_ends_the_stream_with_an_error_event(client, tmp_path):
+    """Test the async events endpoint closes with an error event when the file cannot be read"""
+    _, pool = client
+    seed_documents(pool, tmp_path, 1)
+    (tmp_path / 'sow-0.txt').unlink()
+
+    async def run():
+        async with TestClient(TestServer(create_app(pool.db_path))) as http:
+            started = await (await http.post('/api/documents/doc-0/process?mode=stream')).json()
+            return await (await http.get(started['events_url'])).text()
+
+    body = asyncio.run(run())
+
+    assert body.startswith('event: error\n')
+    error = json.loads(body.split('data: ', 1)[1])
+    print(f"\nStream error: {error['error']}")
+    assert error['stream']['status'] == 'failed'
+    assert pool.fetch_one('SELECT status FROM documents WHERE document_id = ?', ('doc-0',))['status'] == 'failed'
+
+
+def test_health_check_reads_no_rate_limit_state(client, tmp_path):
+    """Test /api/health answers without the router, which lives on /api/diagnostics"""
+    _, pool = client
+
+    async def run():
+        async with TestClient(TestServer(create_app(pool.db_path))) as http:
+            health = await (await http.get('/api/health')).json()
+            with mock.patch('async_server.get_router', side_effect=AssertionError('router used')):
+                assert (await http.get('/api/health')).status == 200
+            diagnostics = await (await http.get('/api/diagnostics')).json()
+            return health, diagnostics
+
+    with mock.patch.dict('services.rate_limiter.RATE_LIMIT_CONFIG', {'state_path': str(tmp_path / 'rate_limit.db')}), \
+            mock.patch.dict('services.rate_limiter._limiters', clear=True):
+        health, diagnostics = asyncio.run(run())
+
+    assert 'llm_targets' not in health
+    assert diagnostics['job_queue_depth'] == 0
+    assert diagnostics['llm_targets']
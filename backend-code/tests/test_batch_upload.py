@@ -0,0 +1,103 @@
+"""
+Test file for the batch upload endpoint.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_batch_upload.py -v
+"""
+
+import io
+import os
+import sqlite3
+from unittest import mock
+
+from database.connection_pool import ConnectionPool
+
+
+def create_workspace(test_client):
+    return test_client.post('/api/workspaces', json={
+        'name': 'Batch', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+
+
+def batch_files(*names):
+    return {'files': [(io.BytesIO(b'Statement of work'), name) for name in names]}
+
+
+def test_uploads_and_queues_every_file(client):
+    """Test every file becomes a queued document with its own job"""
+    test_client, pool = client
+    workspace_id = create_workspace(test_client)
+
+    response = test_client.post(
+        f"/api/documents/upload/batch?workspace_id={workspace_id}&process=true",
+        data=batch_files('a.txt', 'b.pdf', 'c.docx')
+    )
+
+    assert response.status_code == 201
+    results = response.get_json()['results']
+    assert [result['file_name'] for result in results] == ['a.txt', 'b.pdf', 'c.docx']
+    assert all(result['document']['status'] == 'queued' for result in results)
+    assert [result['job']['payload']['document_id'] for result in results] == \
+        [result['document']['document_id'] for result in results]
+    assert pool.fetch_one('SELECT COUNT(*) AS count FROM jobs')['count'] == 3
+
+
+def test_reports_bad_files_without_failing_the_batch(client):
+    """Test an invalid file gets an error entry while the others are stored"""
+    test_client, pool = client
+    workspace_id = create_workspace(test_client)
+
+    response = test_client.post(
+        f"/api/documents/upload/batch?workspace_id={workspace_id}",
+        data=batch_files('good.txt', 'bad.exe')
+    )
+
+    assert response.status_code == 207
+    good, bad = response.get_json()['results']
+    assert good['document']['status'] == 'uploaded' and good['job'] is None
+    assert bad['document'] is None and bad['error'] == 'Invalid file type'
+    assert pool.fetch_one('SELECT COUNT(*) AS count FROM documents')['count'] == 1
+
+
+def test_full_queue_leaves_documents_uploaded(client):
+    """Test documents stay 'uploaded' when the queue cannot take the whole batch"""
+    test_client, _ = client
+    workspace_id = create_workspace(test_client)
+    test_client.application.extensions['job_queue'].max_queue_size = 1
+
+    response = test_client.post(
+        f"/api/documents/upload/batch?workspace_id={workspace_id}&process=true",
+        data=batch_files('a.txt', 'b.txt')
+    )
+
+    assert response.status_code == 503
+    for result in response.get_json()['results']:
+        assert result['document']['status'] == 'uploaded'
+        assert 'queue is full' in result['error']
+
+
+def test_failed_insert_removes_the_stored_files(client):
+    """Test files already written are deleted when the bulk insert fails"""
+    test_client, pool = client
+    workspace_id = create_workspace(test_client)
+    upload_folder = test_client.application.config['UPLOAD_FOLDER']
+
+    with mock.patch.object(ConnectionPool, 'execute_many', side_effect=sqlite3.OperationalError('disk I/O error')):
+        response = test_client.post(
+            f"/api/documents/upload/batch?workspace_id={workspace_id}",
+            data=batch_files('a.txt', 'b.txt')
+        )
+
+    assert response.status_code == 500
+    assert os.listdir(upload_folder) == []
+    assert pool.fetch_one('SELECT COUNT(*) AS count FROM documents')['count'] == 0
+
+
+def test_unknown_workspace_is_rejected(client):
+    """Test the workspace is checked once before any file is stored"""
+    test_client, pool = client
+
+    response = test_client.post('/api/documents/upload/batch?workspace_id=missing', data=batch_files('a.txt'))
+
+    assert response.status_code == 404
+    assert pool.fetch_one('SELECT COUNT(*) AS count FROM documents')['count'] == 0
@@ -0,0 +1,88 @@
+"""
+Test file for chunked map-reduce extraction.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_chunked_extraction.py -v
+"""
+
+import json
+import os
+from unittest import mock
+
+from services.llm_service import LLMService
+from services.sow_merge import merge_sow_results
+from services.text_chunker import split_into_chunks
+
+SAMPLE_SOW_PATH = os.path.join(os.path.dirname(__file__), '..', 'sample_sow.txt')
+
+
+def test_split_respects_max_chars_and_sections():
+    """Test chunks stay under the limit and start on section headings"""
+    with open(SAMPLE_SOW_PATH, encoding='utf-8') as file:
+        text = file.read()
+
+    chunks = split_into_chunks(text, 1000)
+
+    print("\n=== Testing Chunk Splitting ===")
+    print(f"Chunk sizes: {[len(chunk) for chunk in chunks]}")
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert chunks[1].startswith('MODULES AND PROCESSES')
+    assert split_into_chunks(text, len(text)) == [text]
+
+
+def test_split_cuts_oversized_lines():
+    """Test a single line longer than the limit is still split"""
+    chunks = split_into_chunks('x' * 2500, 1000)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+
+def test_merge_deduplicates_entities():
+    """Test partial results merge by module, business unit and license name"""
+    first = {
+        "scope_summary": {"in_scope": ["Lead management"], "out_of_scope": []},
+        "modules": [{"module_name": "Lead Management", "description": "", "processes": ["- Capture"]}],
+        "business_units": [{
+            "business_unit_name": "Sales",
+            "stakeholders": [{"name": "John Smith", "designation": "VP", "email": "john@example.com"}]
+        }],
+        "salesforce_licenses": [{"license_type": "Sales Cloud", "count": "unknown"}]
+    }
+    second = {
+        "scope_summary": {"in_scope": ["lead management", "Quoting"], "out_of_scope": ["Mobile"]},
+        "modules": [{"module_name": "lead management", "description": "Leads", "processes": ["- Capture", "- Score"]}],
+        "business_units": [{
+            "business_unit_name": "SALES",
+            "stakeholders": [{"name": "J. Smith", "designation": "VP", "email": "JOHN@example.com"}]
+        }],
+        "salesforce_licenses": [{"license_type": "Sales Cloud", "count": "50"}]
+    }
+
+    merged = merge_sow_results([first, second])
+
+    print("\n=== Testing Result Merge ===")
+    print(json.dumps(merged, indent=2))
+    assert merged['scope_summary']['in_scope'] == ["Lead management", "Quoting"]
+    assert merged['modules'] == [
+        {"module_name": "Lead Management", "description": "Leads", "processes": ["- Capture", "- Score"]}
+    ]
+    assert len(merged['business_units'][0]['stakeholders']) == 1
+    assert merged['salesforce_licenses'] == [{"license_type": "Sales Cloud", "count": "50"}]
+
+
+def test_long_document_is_extracted_per_chunk():
+    """Test extract_sow_insights fans out over chunks and merges the results"""
+    service = LLMService()
+    service.chunk_max_chars = 1000
+    with open(SAMPLE_SOW_PATH, encoding='utf-8') as file:
+        text = file.read()
+
+    def fake_request(chunk):
+        return {"modules": [{"module_name": chunk.split('\n', 1)[0], "processes": []}]}
+
+    with mock.patch.object(service, '_request_extraction', side_effect=fake_request) as request:
+        result = json.loads(service.extract_sow_insights(text))
+
+    assert request.call_count == len(split_into_chunks(text, 1000))
+    assert len(result['modules']) == request.call_count
+    assert result['validation_summary']['issues_detected'] == []
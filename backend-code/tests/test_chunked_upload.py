@@ -0,0 +1,126 @@
+"""
+Test file for resumable chunked uploads.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_chunked_upload.py -v
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from unittest import mock
+
+from services import chunked_upload
+
+CONTENT = b'Statement of work\n' * 1000
+
+
+def start_upload(test_client, total_size=len(CONTENT)):
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': 'Chunked', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+    response = test_client.post('/api/documents/uploads', json={
+        'workspace_id': workspace_id, 'file_name': 'large sow.txt', 'total_size': total_size
+    })
+    assert response.status_code == 201
+    return response.get_json()['upload_id']
+
+
+def put_chunk(test_client, upload_id, offset, chunk):
+    return test_client.put(f"/api/documents/uploads/{upload_id}?offset={offset}", data=chunk,
+                           content_type='application/octet-stream')
+
+
+def test_chunks_assemble_into_a_hashed_document(client):
+    """Test three chunks become one document whose hash was computed while streaming"""
+    test_client, _ = client
+    upload_id = start_upload(test_client)
+
+    for offset in range(0, len(CONTENT), 7000):
+        response = put_chunk(test_client, upload_id, offset, CONTENT[offset:offset + 7000])
+        assert response.get_json()['received_bytes'] == min(offset + 7000, len(CONTENT))
+
+    expected_hash = hashlib.sha256(CONTENT).hexdigest()
+    response = test_client.post(f"/api/documents/uploads/{upload_id}/complete", json={'sha256': expected_hash})
+
+    assert response.status_code == 201
+    document = response.get_json()
+    assert document['content_hash'] == expected_hash
+    assert document['file_name'] == 'large_sow.txt'
+    with open(document['storage_path'], 'rb') as file:
+        assert file.read() == CONTENT
+
+
+def test_resumes_from_received_bytes_after_restart(client):
+    """Test a wrong offset is refused with the resume point and the hash survives a lost hasher"""
+    test_client, _ = client
+    upload_id = start_upload(test_client)
+    put_chunk(test_client, upload_id, 0, CONTENT[:5000])
+
+    conflict = put_chunk(test_client, upload_id, 9000, CONTENT[9000:])
+    assert conflict.status_code == 409
+    resume_at = test_client.get(f"/api/documents/uploads/{upload_id}").get_json()['received_bytes']
+    assert conflict.get_json()['received_bytes'] == resume_at == 5000
+
+    # A restarted worker has no running hash and must rebuild it from the partial file
+    chunked_upload._hashers.clear()
+    put_chunk(test_client, upload_id, resume_at, CONTENT[resume_at:])
+    document = test_client.post(f"/api/documents/uploads/{upload_id}/complete").get_json()
+
+    assert document['content_hash'] == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_rejects_overflow_and_incomplete_uploads(client):
+    """Test bytes past total_size and finalising early are both refused"""
+    test_client, _ = client
+    upload_id = start_upload(test_client, total_size=10)
+
+    assert put_chunk(test_client, upload_id, 0, b'x' * 11).status_code == 413
+    put_chunk(test_client, upload_id, 0, b'x' * 4)
+    assert test_client.post(f"/api/documents/uploads/{upload_id}/complete").status_code == 409
+
+
+def test_abort_removes_partial_file(client):
+    """Test aborting deletes the partial file and closes the session"""
+    test_client, pool = client
+    upload_id = start_upload(test_client)
+    put_chunk(test_client, upload_id, 0, CONTENT[:100])
+    temp_path = pool.fetch_one('SELECT temp_path FROM upload_sessions WHERE upload_id = ?', (upload_id,))['temp_path']
+
+    assert test_client.delete(f"/api/documents/uploads/{upload_id}").status_code == 200
+    assert not os.path.exists(temp_path)
+    assert put_chunk(test_client, upload_id, 100, CONTENT[100:200]).status_code == 404
+
+
+def test_abandoned_uploads_expire_on_the_next_create(client):
+    """Test an upload idle past its TTL is expired with its partial file and this process's state"""
+    test_client, pool = client
+    abandoned = start_upload(test_client)
+    put_chunk(test_client, abandoned, 0, CONTENT[:100])
+    temp_path = pool.fetch_one('SELECT temp_path FROM upload_sessions WHERE upload_id = ?', (abandoned,))['temp_path']
+    pool.execute_query('UPDATE upload_sessions SET updated_at = ? WHERE upload_id = ?',
+                       (datetime.utcnow() - timedelta(days=2), abandoned))
+
+    active = start_upload(test_client)
+
+    statuses = {row['upload_id']: row['status'] for row in pool.fetch_all('SELECT upload_id, status FROM upload_sessions')}
+    assert statuses == {abandoned: 'expired', active: 'open'}
+    assert not os.path.exists(temp_path)
+    assert abandoned not in chunked_upload._hashers and abandoned not in chunked_upload._upload_locks
+    assert put_chunk(test_client, abandoned, 100, CONTENT[100:200]).status_code == 404
+
+
+def test_failed_complete_keeps_the_part_file_for_a_retry(client):
+    """Test a document insert that fails leaves the session open with its bytes, so completing again works"""
+    test_client, pool = client
+    upload_id = start_upload(test_client)
+    put_chunk(test_client, upload_id, 0, CONTENT)
+
+    with mock.patch.object(chunked_upload, 'NEXT_VERSION_SQL', 'no_such_column'):
+        assert test_client.post(f"/api/documents/uploads/{upload_id}/complete").status_code == 500
+
+    assert test_client.get(f"/api/documents/uploads/{upload_id}").get_json()['status'] == 'open'
+    response = test_client.post(f"/api/documents/uploads/{upload_id}/complete")
+    assert response.status_code == 201
+    with open(response.get_json()['storage_path'], 'rb') as file:
+        assert file.read() == CONTENT
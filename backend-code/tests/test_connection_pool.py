@@ -0,0 +1,64 @@
+"""
+Test file for the pooled SQLite connections.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_connection_pool.py -v
+"""
+
+import os
+import threading
+
+import pytest
+
+from database.connection_pool import ConnectionPool
+
+
+def make_pool(tmp_path):
+    pool = ConnectionPool(os.path.join(str(tmp_path), 'ids.db'))
+    pool.execute_query('CREATE TABLE items (item_id TEXT PRIMARY KEY, status TEXT)', ())
+    return pool
+
+
+def test_connection_reused_within_thread(tmp_path):
+    """Test a thread opens one connection and reuses it"""
+    pool = make_pool(tmp_path)
+    pool.execute_query('INSERT INTO items VALUES (?, ?)', ('a', 'active'))
+    assert pool.fetch_one('SELECT * FROM items WHERE item_id = ?', ('a',)) == {'item_id': 'a', 'status': 'active'}
+
+    stats = pool.stats()
+    print(f"\nPool stats: {stats}")
+    assert stats['connections_opened'] == 1
+    assert stats['pool_hits'] >= 2
+    assert pool.fetch_one('PRAGMA journal_mode')['journal_mode'] == 'wal'
+    pool.close_all()
+
+
+def test_connection_handed_to_next_thread(tmp_path):
+    """Test a finished thread's connection is reused instead of reopened"""
+    pool = make_pool(tmp_path)
+
+    for _ in range(3):
+        worker = threading.Thread(target=pool.fetch_all, args=('SELECT * FROM items',))
+        worker.start()
+        worker.join()
+
+    stats = pool.stats()
+    assert stats['connections_opened'] == 2
+    assert stats['connections_reused'] == 2
+    pool.close_all()
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    """Test statements inside a failed transaction are not committed"""
+    pool = make_pool(tmp_path)
+
+    with pytest.raises(ValueError):
+        with pool.transaction():
+            pool.execute_query('INSERT INTO items VALUES (?, ?)', ('a', 'active'))
+            raise ValueError('boom')
+
+    with pool.transaction():
+        pool.execute_many('INSERT INTO items VALUES (?, ?)', [('b', 'active'), ('c', 'active')])
+
+    assert [row['item_id'] for row in pool.fetch_all('SELECT * FROM items ORDER BY item_id')] == ['b', 'c']
+    pool.close_all()
@@ -0,0 +1,51 @@
+"""
+Test file for the local Azure OpenAI stand-in used by the load test.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_fake_azure_openai.py -v
+"""
+
+import json
+
+from loadtest.fake_azure_openai import CANNED_SOW, LatencyModel, TokenRateThrottle, create_app
+from loadtest.load_test import percentile
+
+COMPLETIONS_URL = '/openai/deployments/GPT4o/chat/completions?api-version=2024-08-01-preview'
+REQUEST = {'messages': [{'role': 'user', 'content': 'Statement of work'}], 'max_tokens': 100}
+
+
+def make_client(tpm=0, error_rate=0.0):
+    return create_app(LatencyModel('fixed:0'), TokenRateThrottle(tpm), error_rate, 0).test_client()
+
+
+def test_returns_canned_sow_in_azure_shape():
+    """Test the blocking and streamed responses both carry the canned SoW JSON"""
+    client = make_client()
+
+    body = client.post(COMPLETIONS_URL, json=REQUEST).get_json()
+    content = body['choices'][0]['message']['content']
+    assert json.loads(content.strip('`\njson')) == CANNED_SOW
+    assert body['usage']['total_tokens'] > 0
+
+    streamed = client.post(COMPLETIONS_URL, json={**REQUEST, 'stream': True}).get_data(as_text=True)
+    events = [line[len('data: '):] for line in streamed.split('\n\n') if line.startswith('data: ')]
+    assert events[-1] == '[DONE]'
+    assert ''.join(json.loads(event)['choices'][0]['delta']['content'] for event in events[:-1]) == content
+
+
+def test_throttles_and_injects_429_with_retry_after():
+    """Test both the TPM throttle and injected errors answer 429 with Retry-After"""
+    throttled = make_client(tpm=200)
+    assert throttled.post(COMPLETIONS_URL, json=REQUEST).status_code == 200
+    response = throttled.post(COMPLETIONS_URL, json=REQUEST)
+    assert response.status_code == 429 and int(response.headers['Retry-After']) >= 1
+
+    injected = make_client(error_rate=1.0).post(COMPLETIONS_URL, json=REQUEST)
+    assert injected.status_code == 429 and injected.headers['Retry-After']
+
+
+def test_percentile_is_nearest_rank():
+    """Test the load test report uses nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)) == (50, 95, 99)
+    assert percentile([], 0.5) == 0.0
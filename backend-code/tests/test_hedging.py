@@ -0,0 +1,128 @@
+"""
+Test file for the shared Azure HTTP client and hedged requests.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_hedging.py -v
+"""
+
+import asyncio
+import json
+import threading
+import time
+from unittest import mock
+
+from openai.openai_object import OpenAIObject
+
+from services import hedging
+from services.hedging import HedgePolicy, acall_hedged, call_hedged
+from services.llm_service import LLMService, get_openai
+
+
+def completion(content):
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+def warmed_policy(budget=1.0, latency=0.02):
+    policy = HedgePolicy(95, budget, 5)
+    for _ in range(10):
+        policy.observe(False, latency)
+    return policy
+
+
+def hedging_on(policy):
+    return mock.patch.dict('services.hedging.HTTP_CONFIG', {'hedge_enabled': True}), \
+        mock.patch.object(hedging, '_policy', policy)
+
+
+def test_hedges_stay_within_budget():
+    """Test a budget of 5% hedges at most 5% of calls, plus the small saved-up burst"""
+    policy = warmed_policy(budget=0.05)
+    hedges = 0
+    for _ in range(1000):
+        if policy.admit(False) is not None and policy.try_hedge():
+            hedges += 1
+
+    print(f"\nHedges allowed for 1000 slow calls: {hedges}")
+    assert 45 <= hedges <= 50
+    assert HedgePolicy(95, 1.0, 5).admit(False) is None
+
+
+def test_slow_first_byte_is_hedged_and_the_fast_answer_wins():
+    """Test a request still silent at the percentile gets a duplicate whose answer is returned"""
+    sent = []
+
+    def send(hedge):
+        sent.append(hedge)
+        time.sleep(0.01 if hedge else 1.0)
+        return 'hedge' if hedge else 'primary'
+
+    enabled, policy = hedging_on(warmed_policy())
+    with enabled, policy:
+        start = time.monotonic()
+        response = call_hedged(send, False)
+        elapsed = time.monotonic() - start
+        # Without budget the caller waits the slow request out
+        assert call_hedged(send, False, admit_hedge=lambda: False) == 'primary'
+
+    print(f"\nHedged call returned {response!r} after {elapsed:.3f}s")
+    assert response == 'hedge'
+    assert elapsed < 0.5
+    assert sent[:2] == [False, True]
+
+
+def test_async_hedge_cancels_the_loser_and_survives_a_failure():
+    """Test the event-loop variant drops the slower request and falls back when one fails"""
+    cancelled = []
+
+    async def send(hedge):
+        try:
+            await asyncio.sleep(0.01 if hedge else 1.0)
+        except asyncio.CancelledError:
+            cancelled.append(hedge)
+            raise
+        return 'hedge' if hedge else 'primary'
+
+    async def fail_fast(hedge):
+        if not hedge:
+            await asyncio.sleep(0.05)
+            return 'primary'
+        raise ConnectionError('reset')
+
+    async def admit():
+        return True
+
+    enabled, policy = hedging_on(warmed_policy())
+    with enabled, policy:
+        assert asyncio.run(acall_hedged(send, False, admit_hedge=admit)) == 'hedge'
+        assert asyncio.run(acall_hedged(fail_fast, False, admit_hedge=admit)) == 'primary'
+    assert cancelled == [False]
+
+
+def test_llm_service_uses_the_shared_session_and_timeouts():
+    """Test Azure calls share one keep-alive session, pass timeouts and can be hedged"""
+    content = json.dumps({'scope_summary': {'in_scope': ['CPQ'], 'out_of_scope': []}, 'modules': [],
+                          'business_units': [], 'salesforce_licenses': [], 'assumptions': []})
+    threads = []
+
+    def create(**kwargs):
+        threads.append(threading.current_thread().name)
+        if len(threads) == 1:
+            time.sleep(1.0)
+        return completion(content)
+
+    openai = get_openai()
+    assert openai.requestssession is get_openai().requestssession
+    enabled, policy = hedging_on(warmed_policy())
+    with enabled, policy, mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=create) as mocked:
+        start = time.monotonic()
+        result = json.loads(LLMService().extract_sow_insights('Statement of work'))
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert mocked.call_count == 2
+    assert mocked.call_args.kwargs['request_timeout'] == (5.0, 120.0)
+    assert result['scope_summary']['in_scope'] == ['CPQ']
@@ -0,0 +1,72 @@
+"""
+Import-time budget for the API's startup modules.
+
+Imports everything server.py loads in a fresh interpreter and fails if it
+takes longer than IMPORT_TIME_BUDGET_SECONDS or pulls in a module that should
+only load on first use:
+python -m pytest tests/test_import_time.py -v -s
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def server_imports():
+    """Every module server.py imports at the top level, read from its source so the list never drifts"""
+    with open(os.path.join(BACKEND_DIR, 'server.py'), encoding='utf-8') as source:
+        tree = ast.parse(source.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            modules.append(node.module)
+    return tuple(dict.fromkeys(modules))
+
+
+STARTUP_MODULES = server_imports()
+# Loaded by the first extraction (or preloaded in the gunicorn master), never at import
+LAZY_MODULES = ('openai', 'PyPDF2', 'docx', 'aiohttp', 'requests')
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get('IMPORT_TIME_BUDGET_SECONDS', 1.0))
+RUNS = 3
+
+# Modules missing from this checkout (server.py's database.db_manager) are reported, not imported
+IMPORT_SCRIPT = """
+import importlib, importlib.util, json, sys, time
+start = time.perf_counter()
+missing = []
+for name in sys.argv[1:]:
+    if importlib.util.find_spec(name) is None:
+        missing.append(name)
+        continue
+    importlib.import_module(name)
+print(json.dumps({'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules), 'missing': missing}))
+"""
+
+
+def measure_startup_imports():
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT, *STARTUP_MODULES],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_startup_imports_stay_within_budget():
+    """Test the startup modules import quickly and leave the heavy dependencies unloaded"""
+    runs = [measure_startup_imports() for _ in range(RUNS)]
+    seconds = min(run['seconds'] for run in runs)
+
+    timings = ', '.join(f"{run['seconds'] * 1000:.0f}ms" for run in runs)
+    print(f"\nStartup imports: {timings} (budget {IMPORT_TIME_BUDGET_SECONDS * 1000:.0f}ms)")
+    if runs[0]['missing']:
+        print(f"Not found, skipped: {', '.join(runs[0]['missing'])}")
+    assert {'services.http_client', 'services.llm_router', 'services.metrics'} <= set(runs[0]['modules'])
+    loaded = [name for name in LAZY_MODULES if name in runs[0]['modules']]
+    assert loaded == []
+    assert seconds <= IMPORT_TIME_BUDGET_SECONDS
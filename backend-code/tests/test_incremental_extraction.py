@@ -0,0 +1,172 @@
+"""
+Test file for document versions and section-level incremental re-extraction.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_incremental_extraction.py -v
+"""
+
+import io
+import json
+from unittest import mock
+
+from openai.openai_object import OpenAIObject
+
+from services.document_pipeline import DocumentPipeline
+from services.document_sections import build_units, split_sections, unit_key
+
+SECTIONS = {
+    'Sales Cloud': 'Lead capture from the website and assignment rules for the sales team.',
+    'Service Cloud': 'Email-to-case routing with entitlements and SLA milestones.',
+    'Integration': 'Nightly order sync from the ERP through MuleSoft.'
+}
+
+
+def sow_text(sections):
+    return '\n\n'.join(f"{number}. {title}\n{body}" for number, (title, body) in enumerate(sections.items(), 1))
+
+
+def fake_completion(**kwargs):
+    heading, body = kwargs['messages'][1]['content'].split('\n', 1)
+    result = {'modules': [{'module_name': heading.split('. ', 1)[1], 'processes': [body]}],
+              'validation_summary': {'json_validity': True, 'issues_detected': []}}
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': json.dumps(result)}}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+def upload(test_client, workspace_id, sections, previous_document_id=None):
+    query = f"workspace_id={workspace_id}"
+    if previous_document_id:
+        query += f"&previous_document_id={previous_document_id}"
+    return test_client.post(
+        f"/api/documents/upload?{query}",
+        data={'file': (io.BytesIO(sow_text(sections).encode('utf-8')), 'sow.txt')}
+    )
+
+
+def test_units_survive_renumbering_and_edits_elsewhere():
+    """Test unit keys ignore section numbers and only the edited section's unit changes"""
+    original = build_units(split_sections(sow_text(SECTIONS)), 10, 1000)
+    revised = dict({'Scope': 'Phase one only.'}, **SECTIONS)
+    revised['Integration'] = 'Hourly order sync from the ERP through MuleSoft.'
+    updated = build_units(split_sections(sow_text(revised)), 10, 1000)
+
+    assert len(original) == 3
+    assert [unit.split('\n')[0] for unit in updated] == ['1. Scope', '2. Sales Cloud', '3. Service Cloud',
+                                                         '4. Integration']
+    original_keys = {unit_key(unit) for unit in original}
+    assert [unit_key(unit) in original_keys for unit in updated] == [False, True, True, False]
+
+
+def workspace(test_client):
+    return test_client.post('/api/workspaces', json={
+        'name': 'Versions', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+
+
+def extraction_patches(**cache):
+    return (mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}),
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', dict({'enabled': False}, **cache)),
+            mock.patch.dict('services.incremental_extraction.VERSIONING_CONFIG', {'unit_min_chars': 10}),
+            mock.patch('openai.ChatCompletion.create', side_effect=fake_completion))
+
+
+def test_first_version_is_extracted_whole(client):
+    """Test a multi-unit document with nothing to reuse makes one call and goes through the result cache"""
+    test_client, pool = client
+    workspace_id = workspace(test_client)
+    document_ids = [upload(test_client, workspace_id, SECTIONS).get_json()['document_id'] for _ in range(2)]
+
+    rate_limit, cache, versioning, completion = extraction_patches(enabled=True)
+    with rate_limit, cache, versioning, completion as create:
+        for document_id in document_ids:
+            DocumentPipeline(pool).process(document_id)
+
+    assert create.call_count == 1
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM llm_result_cache')['n'] == 1
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM extraction_units')['n'] == 0
+
+
+def test_revision_only_reextracts_changed_sections(client):
+    """Test a revision re-extracts only units its predecessor has no result for, and the chain carries on"""
+    test_client, pool = client
+    workspace_id = workspace(test_client)
+
+    revised = dict(SECTIONS, Integration='Hourly order sync from the ERP through MuleSoft.')
+    del revised['Service Cloud']
+    first = upload(test_client, workspace_id, {'Sales Cloud': SECTIONS['Sales Cloud']}).get_json()
+    second = upload(test_client, workspace_id, SECTIONS, first['document_id']).get_json()
+    third = upload(test_client, workspace_id, revised, second['document_id']).get_json()
+    assert (first['version'], second['version'], third['version']) == (1, 2, 3)
+
+    rate_limit, cache, versioning, completion = extraction_patches()
+    with rate_limit, cache, versioning, completion as create:
+        DocumentPipeline(pool).process(first['document_id'])
+        assert create.call_count == 1
+        create.reset_mock()
+
+        DocumentPipeline(pool).process(second['document_id'])
+        # The single unit of the first version is the unchanged Sales Cloud section
+        assert create.call_count == 2
+        create.reset_mock()
+
+        stream = DocumentPipeline(pool).process(third['document_id'])
+
+    # Only the edited Integration section goes back to the model
+    assert create.call_count == 1
+    assert 'Hourly order sync' in create.call_args.kwargs['messages'][1]['content']
+    assert stream['tokens_used'] == 120
+
+    sow = json.loads(stream['response_payload'])
+    print(f"\nRevised modules: {sow['modules']}")
+    assert [module['module_name'] for module in sow['modules']] == ['Sales Cloud', 'Integration']
+    assert sow['modules'][1]['processes'] == ['Hourly order sync from the ERP through MuleSoft.']
+
+    units = pool.fetch_all('SELECT reused_from FROM extraction_units WHERE document_id = ? ORDER BY position',
+                           (third['document_id'],))
+    assert [unit['reused_from'] for unit in units] == [first['document_id'], None]
+
+    versions = test_client.get(f"/api/documents/{third['document_id']}/versions").get_json()
+    assert [version['version'] for version in versions] == [3, 2, 1]
+
+
+def test_single_unit_document_streams_and_stores_its_unit(client):
+    """Test a one-section document still streams as a whole and its result is kept as its unit"""
+    test_client, pool = client
+    workspace_id = workspace(test_client)
+    document_id = upload(test_client, workspace_id, {'Sales Cloud': SECTIONS['Sales Cloud']}).get_json()['document_id']
+    content = json.dumps({'modules': [{'module_name': 'Sales Cloud', 'processes': ['Lead capture']}]})
+
+    def fake_stream(**kwargs):
+        assert kwargs['stream'] is True
+        return iter(OpenAIObject.construct_from({'choices': [{'delta': {'content': piece}, 'finish_reason': None}]})
+                    for piece in (content[:20], content[20:]))
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=fake_stream):
+        pipeline = DocumentPipeline(pool)
+        events = list(pipeline.stream(pipeline.start_stream(document_id)['stream_id']))
+
+    assert 'token' in [event['event'] for event in events]
+    assert events[-1]['event'] == 'done'
+    [unit] = pool.fetch_all('SELECT result_payload FROM extraction_units WHERE document_id = ?', (document_id,))
+    assert json.loads(unit['result_payload'])['modules'][0]['module_name'] == 'Sales Cloud'
+
+
+def test_revision_must_link_within_the_workspace(client):
+    """Test previous_document_id has to be a document of the same workspace"""
+    test_client, _ = client
+    workspaces = [test_client.post('/api/workspaces', json={
+        'name': name, 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id'] for name in ('A', 'B')]
+    other = upload(test_client, workspaces[1], SECTIONS).get_json()
+
+    response = upload(test_client, workspaces[0], SECTIONS, other['document_id'])
+    assert response.status_code == 400
+    chunked = test_client.post('/api/documents/uploads', json={
+        'workspace_id': workspaces[0], 'file_name': 'sow.txt', 'total_size': 10,
+        'previous_document_id': 'missing'
+    })
+    assert chunked.status_code == 400
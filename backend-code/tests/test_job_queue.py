@@ -0,0 +1,70 @@
+"""
+Test file for the persistent background job queue.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_job_queue.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.job_queue import JobQueue, JobQueueFullError
+
+
+def test_queue_position_counts_the_jobs_ahead(client):
+    """Test positions follow creation order across single and batch enqueues and move up as jobs start"""
+    _, pool = client
+    job_queue = JobQueue(pool.db_path)
+    job_queue.register_handler('noop', lambda db, payload: None)
+
+    first, second = (job_queue.enqueue('noop', {'index': index}) for index in range(2))
+    batch = job_queue.enqueue_many('noop', [{'index': index} for index in range(2, 5)])
+
+    assert [first['queue_position'], second['queue_position']] == [1, 2]
+    assert [job['queue_position'] for job in batch] == [3, 4, 5]
+
+    pool.execute_query('UPDATE jobs SET status = ? WHERE job_id = ?', ('running', first['job_id']))
+    assert job_queue.get_job(first['job_id'])['queue_position'] is None
+    assert job_queue.get_job(batch[1]['job_id'])['queue_position'] == 3
+
+
+def test_recovery_fails_jobs_past_max_attempts(client):
+    """Test a stale job is requeued until it has used up its attempts, then failed and cleaned up"""
+    _, pool = client
+    abandoned = []
+    job_queue = JobQueue(pool.db_path, stale_after_seconds=60, max_attempts=3)
+    job_queue.register_handler('noop', lambda db, payload: None,
+                               on_abandoned=lambda db, payload: abandoned.append(payload['index']))
+    stale = datetime.utcnow() - timedelta(minutes=5)
+    for job_id, attempts in (('retry', 2), ('give-up', 3)):
+        pool.execute_query(
+            '''INSERT INTO jobs (job_id, job_type, payload, status, attempts, claimed_by, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (job_id, 'noop', f'{{"index": "{job_id}"}}', 'running', attempts, 'dead-worker', stale, stale)
+        )
+
+    job_queue._recover_jobs()
+
+    retry, give_up = job_queue.get_job('retry'), job_queue.get_job('give-up')
+    assert (retry['status'], retry['queue_position']) == ('queued', 1)
+    assert give_up['status'] == 'failed'
+    assert give_up['error'] == 'Abandoned after 3 attempts'
+    assert abandoned == ['give-up']
+
+
+def test_queue_size_is_shared_by_every_process(client):
+    """Test the cap counts jobs queued by other queues on the same table, not just this one's"""
+    _, pool = client
+    queues = [JobQueue(pool.db_path, max_queue_size=3) for _ in range(2)]
+    for job_queue in queues:
+        job_queue.register_handler('noop', lambda db, payload: None)
+
+    queues[0].enqueue('noop', {'index': 0})
+    queues[1].enqueue_many('noop', [{'index': 1}, {'index': 2}])
+
+    with pytest.raises(JobQueueFullError):
+        queues[0].enqueue('noop', {'index': 3})
+    with pytest.raises(JobQueueFullError):
+        queues[1].enqueue_many('noop', [{'index': 3}])
+    assert [job_queue.depth() for job_queue in queues] == [3, 3]
@@ -0,0 +1,136 @@
+"""
+Test file for local JSON repair, schema validation and cut-off section retries.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_json_repair.py -v
+"""
+
+import io
+import json
+from unittest import mock
+
+import pytest
+from openai.openai_object import OpenAIObject
+
+from services.json_repair import repair_json
+from services.llm_service import LLMService
+from services.sow_schema import validate_sow
+
+
+def chunk(content, finish_reason=None):
+    return OpenAIObject.construct_from({
+        'choices': [{'delta': {'content': content}, 'finish_reason': finish_reason}]
+    })
+
+
+def completion(content, finish_reason='stop'):
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': content}, 'finish_reason': finish_reason}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+@pytest.mark.parametrize('content, expected, truncated', [
+    ('```json\n{"a": [1, 2]}\n```', {'a': [1, 2]}, False),
+    ('Here is the result:\n{"a": [1, 2,], "b": {"c": "x",},}\nLet me know!', {'a': [1, 2], 'b': {'c': 'x'}}, False),
+    ('```json\n{"a": ["one", "two"], "b": ["thr', {'a': ['one', 'two'], 'b': []}, True),
+    ('{"a": {"b": [1, {"c": 2}', {'a': {'b': [1, {'c': 2}]}}, True),
+    ('{"a": "line one\nline two", "b": "}"]', {'a': 'line one\nline two', 'b': '}'}, False),
+])
+def test_repair_json(content, expected, truncated):
+    """Test fences, prose, trailing commas and cut-off structures are fixed locally"""
+    assert repair_json(content) == (expected, truncated)
+
+
+def test_repair_json_gives_up_without_an_object():
+    """Test text with no JSON object still raises a decode error"""
+    with pytest.raises(json.JSONDecodeError):
+        repair_json('Sorry, I cannot help with that.')
+
+
+def test_validate_sow_reports_sections():
+    """Test the validator names each missing or malformed section"""
+    problems = validate_sow({
+        'scope_summary': {'in_scope': ['CPQ'], 'out_of_scope': []},
+        'modules': [{'module_name': 'CPQ', 'processes': ['Quote']}, {'description': 'No name'}],
+        'business_units': [],
+        'salesforce_licenses': [{'license_type': 'Sales Cloud', 'count': 40}],
+        'assumptions': 'none',
+    })
+    assert problems == {
+        'modules': ['modules[1].module_name: missing'],
+        'assumptions': ['assumptions: expected array'],
+        'validation_summary': ['validation_summary: missing'],
+    }
+
+
+def test_cut_off_answer_only_requests_the_missing_sections():
+    """Test an answer stopped at max_tokens keeps its complete sections and asks for the rest"""
+    first = ('```json\n{"scope_summary": {"in_scope": ["CPQ"], "out_of_scope": []},\n'
+             ' "modules": [{"module_name": "CPQ", "processes": ["Quote"]}, {"module_name": "Bill')
+    second = json.dumps({
+        'modules': [{'module_name': 'CPQ', 'processes': ['Quote']}, {'module_name': 'Billing'}],
+        'business_units': [],
+        'salesforce_licenses': [{'license_type': 'Revenue Cloud', 'count': '5'}],
+        'assumptions': []
+    })
+    service = LLMService()
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create',
+                       side_effect=[completion(first, 'length'), completion(second)]) as create:
+        result = json.loads(service.extract_sow_insights('Statement of work'))
+
+    assert create.call_count == 2
+    followup = create.call_args.kwargs['messages'][-1]['content']
+    print(f"\nFollow-up request: {followup}")
+    assert 'modules, business_units, salesforce_licenses, assumptions' in followup
+    assert 'scope_summary' not in followup
+    assert result['scope_summary']['in_scope'] == ['CPQ']
+    assert [module['module_name'] for module in result['modules']] == ['CPQ', 'Billing']
+    assert result['salesforce_licenses'] == [{'license_type': 'Revenue Cloud', 'count': '5'}]
+    assert result['validation_summary'] == {'json_validity': True, 'issues_detected': []}
+    assert service.tokens_used == 240
+
+
+def test_malformed_items_are_dropped_not_the_extraction():
+    """Test a complete but malformed answer is trimmed locally without another request"""
+    content = json.dumps({
+        'scope_summary': {'in_scope': [], 'out_of_scope': []},
+        'modules': [{'module_name': 'CPQ'}, {'processes': ['Orphan']}],
+        'validation_summary': {'json_validity': 'true', 'issues_detected': []}
+    }) + ','
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', return_value=completion(content)) as create:
+        result = json.loads(LLMService().extract_sow_insights('Statement of work'))
+
+    assert create.call_count == 1
+    assert result['modules'] == [{'module_name': 'CPQ'}]
+    assert result['business_units'] == []
+    assert result['validation_summary']['issues_detected'] == ['Dropped 1 malformed item(s) from modules']
+
+
+def test_unrepairable_stream_ends_with_an_error_event(client):
+    """Test a streamed answer with no JSON in it fails the document and ends the SSE stream with 'error'"""
+    test_client, pool = client
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': 'Repair', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+    document_id = test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(b'Statement of work for Sales Cloud'), 'sow.txt')}
+    ).get_json()['document_id']
+    started = test_client.post(f"/api/documents/{document_id}/process?mode=stream").get_json()
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create',
+                       return_value=iter([chunk('Sorry, I cannot help with that.'), chunk('', 'stop')])):
+        body = test_client.get(started['events_url']).get_data(as_text=True)
+
+    name, data = body.strip().split('\n\n')[-1].split('\n', 1)
+    assert name == 'event: error'
+    error = json.loads(data[len('data: '):])
+    print(f"\nError event: {error['error']}")
+    assert error['stream']['status'] == 'failed'
+    assert pool.fetch_one('SELECT status FROM documents WHERE document_id = ?', (document_id,))['status'] == 'failed'
+    assert test_client.get(started['events_url']).status_code == 409
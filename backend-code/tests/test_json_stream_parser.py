@@ -0,0 +1,48 @@
+"""
+Test file for incremental parsing of streamed LLM output.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_json_stream_parser.py -v
+"""
+
+import json
+
+from services.json_stream_parser import SectionStreamParser
+
+
+def test_sections_emitted_as_they_close():
+    """Test each top-level key is reported once its value is complete"""
+    sow_data = {
+        "scope_summary": {"in_scope": ["Lead \"capture\" {web}"], "out_of_scope": []},
+        "modules": [{"module_name": "Lead Management", "processes": ["- Scoring, routing"]}],
+        "validation_summary": {"json_validity": True, "issues_detected": []}
+    }
+    content = "```json\n" + json.dumps(sow_data, indent=2) + "\n```"
+    parser = SectionStreamParser()
+    emitted = []
+
+    print("\n=== Testing Streamed Section Parsing ===")
+    for index in range(0, len(content), 7):
+        for key, value in parser.feed(content[index:index + 7]):
+            emitted.append(key)
+            assert value == sow_data[key]
+
+    print(f"Emitted sections: {emitted}")
+    assert emitted == list(sow_data)
+
+
+def test_section_not_emitted_before_close():
+    """Test a partially streamed section is held back"""
+    parser = SectionStreamParser()
+    assert parser.feed('{"scope_summary": {"in_scope": ["a"]}, "modules": [{"module_') == [
+        ("scope_summary", {"in_scope": ["a"]})
+    ]
+    assert parser.feed('name": "X"}]') == [("modules", [{"module_name": "X"}])]
+
+
+def test_scalar_sections():
+    """Test scalar values close on the following comma or brace"""
+    parser = SectionStreamParser()
+    assert parser.feed('{"count": 12, "flag": true, "label": "a,b"}') == [
+        ("count", 12), ("flag", True), ("label", "a,b")
+    ]
@@ -0,0 +1,189 @@
+"""
+Test file for routing Azure OpenAI calls across deployments.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_llm_router.py -v
+"""
+
+import json
+import os
+import time
+from collections import Counter
+from unittest import mock
+
+import openai
+import pytest
+from openai.openai_object import OpenAIObject
+
+from services import hedging, llm_router
+from services.hedging import HedgePolicy
+from services.llm_router import DeploymentRouter, load_targets
+from services.llm_service import LLMService
+from services.rate_limiter import TokenBucketLimiter, get_rate_limiter
+
+CONTENT = json.dumps({'scope_summary': {'in_scope': ['CPQ'], 'out_of_scope': []}, 'modules': [],
+                      'business_units': [], 'salesforce_licenses': [], 'assumptions': []})
+
+
+def completion(content):
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+def targets(*specs):
+    return load_targets([{'endpoint': f"https://{region}.openai.azure.com/", 'deployment': 'GPT4o', **extra}
+                         for region, extra in specs])
+
+
+@pytest.fixture
+def rate_limits(tmp_path):
+    """Rate limiting on, with quota state in a throwaway file"""
+    state_path = os.path.join(str(tmp_path), 'rate_limit.db')
+    with mock.patch.dict('services.rate_limiter.RATE_LIMIT_CONFIG', {'state_path': state_path}), \
+            mock.patch.dict('services.llm_router.RATE_LIMIT_CONFIG', {'enabled': True}), \
+            mock.patch.dict('services.rate_limiter._limiters', clear=True):
+        yield
+
+
+def test_traffic_follows_weight_and_free_quota(rate_limits):
+    """Test calls split by weight, and a throttled deployment stops getting them"""
+    router = DeploymentRouter(targets(('eastus', {'weight': 1}), ('westus', {'weight': 1}),
+                                      ('swedencentral', {'weight': 2, 'tokens_per_minute': 160000})))
+    picks = Counter(router.pick().name for _ in range(4000))
+    print(f"\nPicks by target: {dict(picks)}")
+    assert set(picks) == {'eastus.openai.azure.com/GPT4o', 'westus.openai.azure.com/GPT4o',
+                          'swedencentral.openai.azure.com/GPT4o'}
+    assert 0.45 < picks['swedencentral.openai.azure.com/GPT4o'] / 4000 < 0.55
+    assert 0.2 < picks['eastus.openai.azure.com/GPT4o'] / 4000 < 0.3
+
+    # A 429 blocks the eastus bucket; new calls go elsewhere instead of waiting it out
+    router.targets[0].limiter().block_for(60)
+    with mock.patch('services.rate_limiter.TokenBucketLimiter._bucket') as single_reads:
+        picks = Counter(router.pick().name for _ in range(2000))
+    assert picks['eastus.openai.azure.com/GPT4o'] == 0
+    assert not single_reads.called
+
+
+def test_failing_target_is_ejected_and_probed_again(rate_limits):
+    """Test consecutive failures eject a target for a doubling period, and a success restores it"""
+    now = [0.0]
+    router = DeploymentRouter(targets(('eastus', {}), ('westus', {})), eject_after_failures=2,
+                              eject_seconds=10, clock=lambda: now[0])
+    east, west = router.targets
+    router.record_failure(east)
+    assert {router.pick().name for _ in range(200)} == {east.name, west.name}
+
+    router.record_failure(east)
+    assert {router.pick().name for _ in range(200)} == {west.name}
+    # Calls already in flight that fail do not extend the ejection
+    router.record_failure(east)
+    assert east.ejected_until == 10
+
+    now[0] = 11
+    assert east.name in {router.pick().name for _ in range(200)}
+    router.record_failure(east)
+    assert east.ejected_until == 31
+
+    now[0] = 32
+    router.record_success(east, False, 1.5)
+    router.record_failure(east)
+    assert east.ejected_until == 31
+    assert router.status()[0]['healthy'] is True
+    assert router.status()[0]['latency_ms'] == {'blocking': 1500}
+
+
+def test_llm_service_fails_over_and_stops_calling_an_ejected_target(rate_limits):
+    """Test a regional outage costs one failed request per call until the target is ejected"""
+    router = DeploymentRouter(targets(('eastus', {}), ('westus', {})), eject_after_failures=2)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs['api_base'])
+        if 'eastus' in kwargs['api_base']:
+            raise openai.error.APIConnectionError('Connection refused')
+        return completion(CONTENT)
+
+    with mock.patch.object(llm_router, '_router', router), \
+            mock.patch('openai.ChatCompletion.create', side_effect=create):
+        results = [json.loads(LLMService().extract_sow_insights(f"Statement of work {i}")) for i in range(20)]
+
+    print(f"\nRequests sent: {Counter(calls)}")
+    assert all(result['scope_summary']['in_scope'] == ['CPQ'] for result in results)
+    assert calls.count('https://eastus.openai.azure.com/') == 2
+    assert calls.count('https://westus.openai.azure.com/') == 20
+    assert router.status()[0]['healthy'] is False
+
+
+def test_rate_limited_deployment_hands_calls_to_the_next(rate_limits):
+    """Test a 429 on one deployment moves the call to another instead of backing off"""
+    router = DeploymentRouter(targets(('eastus', {}), ('westus', {})))
+    east_limiter = get_rate_limiter(router.targets[0].name)
+
+    def create(**kwargs):
+        if 'eastus' in kwargs['api_base']:
+            raise openai.error.RateLimitError('Too many requests', headers={'retry-after': '30'})
+        return completion(CONTENT)
+
+    with mock.patch.object(llm_router, '_router', router), \
+            mock.patch('openai.ChatCompletion.create', side_effect=create) as mocked:
+        start = time.monotonic()
+        # Enough calls that eastus is picked before its 429, whatever the draws
+        for i in range(20):
+            LLMService().extract_sow_insights(f"Statement of work {i}")
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 5
+    assert east_limiter.available() == 0.0
+    assert mocked.call_args.kwargs['engine'] == 'GPT4o'
+    assert sum('eastus' in call.kwargs['api_base'] for call in mocked.call_args_list) <= 1
+
+
+def test_single_target_keeps_its_deployment_name():
+    """Test the default configuration is one target named after AZURE_OPENAI_DEPLOYMENT"""
+    [target] = load_targets([{}])
+    assert (target.name, target.deployment, target.weight) == ('GPT4o', 'GPT4o', 1.0)
+    with pytest.raises(ValueError):
+        targets(('eastus', {}), ('eastus', {}))
+
+
+def test_hedged_call_settles_both_reservations(rate_limits):
+    """Test a hedge won by the second target refunds the over-estimate on both targets' buckets"""
+    router = DeploymentRouter(targets(('eastus', {}), ('westus', {})))
+    policy = HedgePolicy(95, 1.0, 5)
+    for _ in range(10):
+        policy.observe(False, 0.02)
+    sent = []
+
+    def create(**kwargs):
+        sent.append(kwargs['api_base'])
+        if len(sent) == 1:
+            time.sleep(1.0)
+        return completion(CONTENT)
+
+    with mock.patch.object(llm_router, '_router', router), \
+            mock.patch.dict('services.hedging.HTTP_CONFIG', {'hedge_enabled': True}), \
+            mock.patch.object(hedging, '_policy', policy), \
+            mock.patch.object(TokenBucketLimiter, 'refund', autospec=True) as refund, \
+            mock.patch('openai.ChatCompletion.create', side_effect=create):
+        LLMService().extract_sow_insights('Statement of work')
+
+    assert len(set(sent)) == 2
+    refunds = {limiter.name: tokens for limiter, tokens in (call.args for call in refund.call_args_list)}
+    print(f"\nRefunds: {refunds}")
+    assert set(refunds) == {target.name for target in router.targets}
+    assert len(set(refunds.values())) == 1 and list(refunds.values())[0] > 0
+
+
+def test_target_status_is_served_by_diagnostics(client, rate_limits):
+    """Test per-target routing state is reported by /api/diagnostics"""
+    test_client, _ = client
+    router = DeploymentRouter(targets(('eastus', {}), ('westus', {})))
+    router.targets[0].limiter().block_for(60)
+
+    with mock.patch.object(llm_router, '_router', router):
+        diagnostics = test_client.get('/api/diagnostics').get_json()
+
+    assert diagnostics['job_queue_depth'] == 0
+    assert [target['name'] for target in diagnostics['llm_targets']] == [target.name for target in router.targets]
@@ -0,0 +1,126 @@
+"""
+Test file for per-stage timing and the Prometheus /api/metrics endpoint.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_metrics.py -v
+"""
+
+import io
+import json
+import multiprocessing
+import os
+from unittest import mock
+
+from openai.openai_object import OpenAIObject
+
+from services.document_pipeline import DocumentPipeline
+from services.metrics import Counter, Gauge, Histogram, Registry, SharedMetricsStore
+
+COMPLETION = OpenAIObject.construct_from({
+    'choices': [{'message': {'content': json.dumps({'modules': [], 'validation_summary': {'issues_detected': []}})}}],
+    'usage': {'prompt_tokens': 1200, 'completion_tokens': 300, 'total_tokens': 1500}
+})
+
+
+def shared_registry(state_path):
+    registry = Registry()
+    metrics = (registry.register(Counter('test_requests_total', 'Requests', ('outcome',))),
+               registry.register(Gauge('test_queue_depth', 'Queue depth')),
+               registry.register(Histogram('test_seconds', 'Latency', ('stage',), buckets=(0.1, 1))))
+    registry.share(state_path, flush_seconds=0)
+    return registry, metrics
+
+
+def other_worker(state_path, flushed, release):
+    registry, (requests, depth, seconds) = shared_registry(state_path)
+    requests.inc(3, outcome='success')
+    depth.set(5)
+    seconds.observe(0.5, stage='a')
+    registry.flush()
+    flushed.set()
+    release.wait(10)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test a histogram renders cumulative buckets, +Inf, sum and count"""
+    histogram = Histogram('test_seconds', 'Test histogram', ('stage',), buckets=(0.1, 1))
+    histogram.observe(0.05, stage='a')
+    histogram.observe(0.5, stage='a')
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 2' in lines
+    assert 'test_seconds_count{stage="a"} 2' in lines
+
+
+def test_processing_records_tokens_and_stage_timings(client):
+    """Test usage from the response lands in llm_streams and every stage shows up in /api/metrics"""
+    test_client, pool = client
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': 'Metrics', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+    document_id = test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(b'Statement of work for Sales Cloud'), 'sow.txt')}
+    ).get_json()['document_id']
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', return_value=COMPLETION):
+        stream = DocumentPipeline(pool).process(document_id)
+
+    assert stream['tokens_used'] == 1500
+
+    response = test_client.get('/api/metrics')
+    body = response.get_data(as_text=True)
+    assert response.mimetype == 'text/plain'
+    for stage in ('file_save', 'text_extraction', 'compaction', 'llm_request', 'json_parse'):
+        assert f'ids_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'ids_db_write_duration_seconds_count{operation="INSERT",table="llm_streams"}' in body
+    assert 'ids_llm_requests_total{outcome="success"}' in body
+    assert 'ids_job_queue_depth 0' in body
+
+
+def test_shared_registry_renders_every_worker(tmp_path):
+    """Test each worker renders the sum over all workers, and an exited worker's gauges drop out"""
+    state_path = os.path.join(str(tmp_path), 'metrics.db')
+    context = multiprocessing.get_context('spawn')
+    flushed, release = context.Event(), context.Event()
+    worker = context.Process(target=other_worker, args=(state_path, flushed, release))
+    worker.start()
+    assert flushed.wait(30)
+
+    registry, (requests, depth, seconds) = shared_registry(state_path)
+    requests.inc(outcome='success')
+    depth.set(2)
+    seconds.observe(0.05, stage='a')
+
+    body = registry.render()
+    print(f"\nWhile both run:\n{body}")
+    assert 'test_requests_total{outcome="success"} 4' in body
+    assert 'test_queue_depth 7' in body
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in body
+    assert 'test_seconds_bucket{stage="a",le="1"} 2' in body
+    assert 'test_seconds_count{stage="a"} 2' in body
+
+    release.set()
+    worker.join(30)
+    body = registry.render()
+    assert 'test_requests_total{outcome="success"} 4' in body
+    assert 'test_queue_depth 2' in body
+
+
+def test_unshared_gauge_is_not_summed(tmp_path):
+    """Test a gauge that already covers every process renders its own value, not the workers' sum"""
+    state_path = os.path.join(str(tmp_path), 'metrics.db')
+    registry = Registry()
+    depth = registry.register(Gauge('test_jobs_queued', 'Jobs queued', shared=False))
+    registry.share(state_path, flush_seconds=0)
+    # A live worker that last saw a different count
+    SharedMetricsStore(state_path).write(os.getppid(), {'test_jobs_queued': [(json.dumps([]), 5)]})
+
+    depth.set(3)
+
+    assert 'test_jobs_queued 3' in registry.render()
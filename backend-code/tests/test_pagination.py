@@ -0,0 +1,83 @@
+"""
+Test file for keyset pagination and fields= projection on the list endpoints.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_pagination.py -v
+"""
+
+import json
+
+
+def seed_workspaces(pool, count):
+    # Pairs share a created_at so the id tie-breaker is exercised
+    for index in range(count):
+        created_at = f"2024-01-{index // 2 + 1:02d} 00:00:00"
+        pool.execute_query(
+            '''INSERT INTO workspaces (workspace_id, name, project_type, licenses, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (f"ws-{index:02d}", f"Workspace {index}", 'Greenfield', json.dumps(['Sales Cloud']),
+             'active', created_at, created_at)
+        )
+
+
+def test_pages_cover_every_workspace_once(client):
+    """Test following next_cursor visits every workspace exactly once, newest first"""
+    test_client, pool = client
+    seed_workspaces(pool, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+        page = test_client.get('/api/workspaces', query_string=params).get_json()
+        assert len(page['items']) <= 3
+        seen.extend(item['workspace_id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [f"ws-{index:02d}" for index in reversed(range(7))]
+
+
+def test_fields_projection_keeps_keyset_columns(client):
+    """Test fields= trims the payload but always returns the cursor columns"""
+    test_client, pool = client
+    seed_workspaces(pool, 2)
+
+    page = test_client.get('/api/workspaces?fields=name').get_json()
+    assert set(page['items'][0]) == {'created_at', 'workspace_id', 'name'}
+
+    page = test_client.get('/api/workspaces?fields=licenses').get_json()
+    assert page['items'][0]['licenses'] == ['Sales Cloud']
+
+
+def test_rejects_bad_arguments(client):
+    """Test unknown fields, bad limits and tampered cursors return 400"""
+    test_client, _ = client
+    assert test_client.get('/api/workspaces?fields=password').status_code == 400
+    assert test_client.get('/api/workspaces?limit=0').status_code == 400
+    assert test_client.get('/api/workspaces?cursor=not-a-cursor').status_code == 400
+    assert test_client.get('/api/documents/workspace/ws-1?limit=abc').status_code == 400
+
+
+def test_documents_are_paged_per_workspace(client):
+    """Test the documents listing pages the same way and skips deleted rows"""
+    test_client, pool = client
+    seed_workspaces(pool, 1)
+    for index, status in enumerate(('uploaded', 'deleted', 'completed', 'uploaded')):
+        pool.execute_query(
+            '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                      status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (f"doc-{index}", 'ws-00', 'SOW', f"doc-{index}.txt", '/tmp/x', status,
+             '2024-01-01 00:00:00', '2024-01-01 00:00:00')
+        )
+
+    first = test_client.get('/api/documents/workspace/ws-00?limit=2&fields=status').get_json()
+    second = test_client.get(
+        f"/api/documents/workspace/ws-00?limit=2&cursor={first['next_cursor']}"
+    ).get_json()
+
+    assert [item['document_id'] for item in first['items']] == ['doc-3', 'doc-2']
+    assert [item['document_id'] for item in second['items']] == ['doc-0']
+    assert second['next_cursor'] is None
@@ -0,0 +1,110 @@
+"""
+Query plan regression test for the route SQL.
+
+Drives every read and update route against a migrated database, records the
+SQL they run and fails if EXPLAIN QUERY PLAN shows a full table scan:
+python -m pytest tests/test_query_plans.py -v
+"""
+
+import io
+import re
+
+from database.migrations import apply_migrations, MIGRATIONS
+from routes.pagination import encode_cursor
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)\b(?! USING (COVERING )?INDEX| VIRTUAL TABLE)')
+SUBQUERY = re.compile(r'^(CO-ROUTINE|MATERIALIZE) (\w+)')
+APP_TABLES = ('workspaces', 'documents', 'llm_streams', 'jobs', 'upload_sessions', 'sow_sources',
+              'sow_licenses', 'sow_stakeholders', 'sow_business_units', 'sow_modules', 'sow_processes',
+              'sow_scope_items', 'search_entries', 'workspace_consolidations')
+LAST_PAGE_CURSOR = encode_cursor(['9999-12-31 00:00:00', 'zzzz'])
+
+
+def exercise_routes(client):
+    workspace = client.post('/api/workspaces', json={
+        'name': 'Plan Check', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()
+    workspace_id = workspace['workspace_id']
+    document = client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(b'Statement of work'), 'sow.txt')}
+    ).get_json()
+    document_id = document['document_id']
+    revision = client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}&previous_document_id={document_id}",
+        data={'file': (io.BytesIO(b'Statement of work, revised'), 'sow_v2.txt')}
+    ).get_json()
+    client.post(
+        f"/api/documents/upload/batch?workspace_id={workspace_id}&process=true",
+        data={'files': [(io.BytesIO(b'Statement of work'), 'batch.txt')]}
+    )
+    upload = client.post('/api/documents/uploads', json={
+        'workspace_id': workspace_id, 'file_name': 'chunked.txt', 'total_size': 4
+    }).get_json()
+    client.put(f"/api/documents/uploads/{upload['upload_id']}?offset=0", data=b'sow!')
+    client.get(f"/api/documents/uploads/{upload['upload_id']}")
+    client.post(f"/api/documents/uploads/{upload['upload_id']}/complete")
+    job = client.post(f"/api/documents/{document_id}/process").get_json()
+    stream = client.post(f"/api/documents/{document_id}/process?mode=stream").get_json()
+
+    client.get('/api/workspaces')
+    client.get(f"/api/workspaces?limit=1&fields=name&cursor={LAST_PAGE_CURSOR}")
+    client.get(f"/api/workspaces/{workspace_id}")
+    client.get(f"/api/workspaces/{workspace_id}/data")
+    client.get(f"/api/workspaces/{workspace_id}/consolidated")
+    client.put(f"/api/workspaces/{workspace_id}", json={'name': 'Renamed'})
+    client.get(f"/api/documents/{document_id}")
+    client.get(f"/api/documents/{revision['document_id']}/versions")
+    client.get(f"/api/documents/workspace/{workspace_id}")
+    client.get(f"/api/documents/workspace/{workspace_id}?limit=1&cursor={LAST_PAGE_CURSOR}")
+    client.get(f"/api/llm-streams/document/{document_id}/latest")
+    client.get(f"/api/llm-streams/{stream['stream_id']}")
+    client.get(f"/api/jobs/{job['job_id']}")
+    client.get('/api/sow/licenses?license_type=Sales Cloud&cursor=WzFd')
+    client.get('/api/sow/stakeholders?business_unit=Sales')
+    client.get('/api/sow/stakeholders?email=jane.doe@example.com')
+    client.get(f"/api/sow/business-units?workspace_id={workspace_id}")
+    client.get('/api/sow/modules?module_name=Sales Cloud')
+    client.get('/api/sow/processes?module_name=Sales Cloud')
+    client.get('/api/sow/scope-items?scope=in')
+    client.get(f"/api/search?q=integration&workspace_id={workspace_id}&kind=text&kind=modules")
+    client.delete(f"/api/documents/{revision['document_id']}")
+    client.delete(f"/api/workspaces/{workspace_id}")
+
+
+def test_migrations_are_idempotent(client):
+    """Test a second run applies nothing and every version is recorded"""
+    _, pool = client
+    assert apply_migrations(pool) == []
+    versions = [row['version'] for row in pool.fetch_all('SELECT version FROM schema_migrations ORDER BY version')]
+    assert versions == [version for version, _, _ in MIGRATIONS]
+
+
+def test_route_queries_use_indexes(client):
+    """Test no route query falls back to a full table scan"""
+    test_client, pool = client
+    statements = []
+    # The test client runs requests on this thread, so this is the connection the routes use
+    pool._connection().set_trace_callback(statements.append)
+    exercise_routes(test_client)
+    pool._connection().set_trace_callback(None)
+
+    checked = 0
+    offenders = []
+    for statement in set(statements):
+        if not re.match(r'\s*(SELECT|UPDATE|DELETE)', statement, re.IGNORECASE):
+            continue
+        if not any(re.search(rf'\b{table}\b', statement) for table in APP_TABLES):
+            continue
+        checked += 1
+        plan = [row['detail'] for row in pool.fetch_all(f"EXPLAIN QUERY PLAN {statement}")]
+        # Reading back a LIMITed subquery is not a table scan
+        subqueries = {match.group(2) for match in map(SUBQUERY.match, plan) if match}
+        for detail in plan:
+            scan = FULL_SCAN.match(detail)
+            if scan and scan.group(1) not in subqueries:
+                offenders.append(f"{detail} <- {' '.join(statement.split())}")
+
+    print(f"\n=== Checked {checked} distinct route queries ===")
+    assert checked >= 10
+    assert offenders == []
@@ -0,0 +1,133 @@
+"""
+Test file for the shared Azure OpenAI rate limiter and 429 retries.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_rate_limiter.py -v
+"""
+
+import io
+import os
+from unittest import mock
+
+import openai
+import pytest
+
+from services.document_pipeline import DocumentPipeline, ExtractionFailedError
+from services.llm_service import LLMService
+from services.rate_limiter import TokenBucketLimiter, RateLimitTimeoutError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(tmp_path, clock, name='gpt', tokens_per_minute=600, requests_per_minute=60, max_wait=120):
+    return TokenBucketLimiter(os.path.join(str(tmp_path), 'rate_limit.db'), name, tokens_per_minute,
+                              requests_per_minute, max_wait, clock=clock, sleep=clock.sleep)
+
+
+def test_waits_for_tokens_to_refill(tmp_path):
+    """Test a full bucket admits at once and the next call waits for the refill"""
+    clock = FakeClock()
+    limiter = make_limiter(tmp_path, clock)
+
+    assert limiter.acquire(600) == 0
+    waited = limiter.acquire(100)
+
+    # 600 TPM refills 10 tokens a second, so 100 tokens take about 10 seconds
+    assert 10 <= waited <= 12.5
+
+
+def test_state_is_shared_between_limiters(tmp_path):
+    """Test two limiters on the same state file, like two processes, draw from one quota"""
+    clock = FakeClock()
+    first = make_limiter(tmp_path, clock)
+    second = make_limiter(tmp_path, clock)
+
+    first.acquire(500)
+    second.acquire(100)
+
+    assert second.acquire(50) > 0
+    assert clock.sleeps
+
+
+def test_block_for_holds_off_every_caller(tmp_path):
+    """Test a Retry-After block applies even when tokens are available"""
+    clock = FakeClock()
+    make_limiter(tmp_path, clock).block_for(5)
+
+    assert make_limiter(tmp_path, clock).acquire(1) >= 5
+
+
+def test_gives_up_after_max_wait(tmp_path):
+    """Test acquire raises instead of queueing forever"""
+    clock = FakeClock()
+    limiter = make_limiter(tmp_path, clock, max_wait=3)
+    limiter.acquire(600)
+
+    with pytest.raises(RateLimitTimeoutError):
+        limiter.acquire(600)
+
+
+def test_retries_429_no_sooner_than_retry_after():
+    """Test a 429 is retried after its Retry-After and the second attempt's result is used"""
+    service = LLMService()
+    rate_limited = openai.error.RateLimitError('Too many requests', headers={'retry-after': '7'})
+    response = {'choices': [{'message': {'content': '{"modules": []}'}}], 'usage': {'total_tokens': 10}}
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=[rate_limited, response]) as create, \
+            mock.patch('services.llm_service.time.sleep') as sleep:
+        result = service._create_completion([{'role': 'user', 'content': 'sow'}])
+
+    assert result is response
+    assert create.call_count == 2
+    assert 7 <= sleep.call_args[0][0] <= 7.7
+
+
+def test_raises_after_max_retries():
+    """Test persistent 429s surface once retries are exhausted"""
+    service = LLMService()
+    rate_limited = openai.error.RateLimitError('Too many requests')
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False, 'max_retries': 2}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=rate_limited) as create, \
+            mock.patch('services.llm_service.time.sleep'):
+        with pytest.raises(openai.error.RateLimitError):
+            service._create_completion([{'role': 'user', 'content': 'sow'}])
+
+    assert create.call_count == 3
+
+
+def test_exhausted_retries_fail_the_document(client):
+    """Test the fallback payload after persistent 429s fails the run instead of completing the document"""
+    test_client, pool = client
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': 'Throttled', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+    document_id = test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(b'Statement of work for Sales Cloud'), 'sow.txt')}
+    ).get_json()['document_id']
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False, 'max_retries': 1}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': False}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=openai.error.RateLimitError('Too many requests')), \
+            mock.patch('services.llm_service.time.sleep'):
+        with pytest.raises(ExtractionFailedError, match='Too many requests'):
+            DocumentPipeline(pool).process(document_id)
+
+    assert pool.fetch_one('SELECT status FROM documents WHERE document_id = ?', (document_id,))['status'] == 'failed'
+    streams = pool.fetch_all('SELECT status FROM llm_streams WHERE document_id = ?', (document_id,))
+    assert [stream['status'] for stream in streams] == ['failed']
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM sow_modules')['n'] == 0
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM search_entries')['n'] == 0
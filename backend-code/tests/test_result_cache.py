@@ -0,0 +1,107 @@
+"""
+Test file for the LLM result cache.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_result_cache.py -v
+"""
+
+import io
+import json
+from unittest import mock
+
+import pytest
+from openai.openai_object import OpenAIObject
+
+from services.document_pipeline import DocumentPipeline, ExtractionFailedError
+from services.result_cache import ResultCache
+
+SOW = {'scope_summary': {'in_scope': ['Sales Cloud rollout'], 'out_of_scope': []},
+       'modules': [{'module_name': 'Sales Cloud', 'processes': ['Lead capture']}],
+       'business_units': [],
+       'salesforce_licenses': [],
+       'assumptions': [],
+       'validation_summary': {'json_validity': True, 'issues_detected': []}}
+
+# Four sections of about 2500 characters, so the default unit size splits the document in two
+SECTIONS = ['Sales Cloud', 'Service Cloud', 'Integration', 'Data Migration']
+
+
+def sow_text():
+    body = 'The partner configures, tests and documents the {} workstream for every region. '
+    return '\n\n'.join(f"{number}. {title}\n{body.format(title) * 30}" for number, title in enumerate(SECTIONS, 1))
+
+
+def completion(**kwargs):
+    return OpenAIObject.construct_from({
+        'choices': [{'message': {'content': json.dumps(SOW)}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    })
+
+
+def upload(test_client):
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': 'Cache', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+    return test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(sow_text().encode('utf-8')), 'sow.txt')}
+    ).get_json()['document_id']
+
+
+def extract(pool, document_id, **openai_config):
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': True}), \
+            mock.patch.dict('services.llm_service.OPENAI_CONFIG', openai_config), \
+            mock.patch('openai.ChatCompletion.create', side_effect=completion) as create:
+        stream = DocumentPipeline(pool).process(document_id)
+    return stream, create.call_count
+
+
+def test_repeat_extraction_of_a_multi_section_document_hits_the_cache(client):
+    """Test processing the same multi-section document twice makes one Azure call and reuses its result"""
+    test_client, pool = client
+    document_id = upload(test_client)
+
+    first, first_calls = extract(pool, document_id)
+    second, second_calls = extract(pool, document_id)
+
+    print(f"\nAzure calls: {first_calls} then {second_calls}")
+    assert (first_calls, second_calls) == (1, 0)
+    assert (first['tokens_used'], second['tokens_used']) == (120, 0)
+    assert json.loads(second['response_payload']) == json.loads(first['response_payload'])
+    [entry] = pool.fetch_all('SELECT hit_count, tokens_used FROM llm_result_cache')
+    assert (entry['hit_count'], entry['tokens_used']) == (1, 120)
+
+
+def test_changing_the_model_settings_misses_the_cache(client):
+    """Test a new model fingerprint extracts again and purge_stale drops the old entry"""
+    test_client, pool = client
+    document_id = upload(test_client)
+
+    extract(pool, document_id)
+    _, calls = extract(pool, document_id, temperature=0.5)
+
+    assert calls == 1
+    fingerprints = [row['model_fingerprint'] for row in pool.fetch_all(
+        'SELECT model_fingerprint FROM llm_result_cache ORDER BY created_at')]
+    assert len(set(fingerprints)) == 2
+
+    ResultCache(pool).purge_stale(fingerprints[1])
+    assert [row['model_fingerprint'] for row in pool.fetch_all(
+        'SELECT model_fingerprint FROM llm_result_cache')] == [fingerprints[1]]
+
+
+def test_fallback_results_are_not_cached(client):
+    """Test a failed extraction is not stored, so the next attempt calls Azure again"""
+    test_client, pool = client
+    document_id = upload(test_client)
+
+    with mock.patch.dict('services.llm_service.RATE_LIMIT_CONFIG', {'enabled': False, 'max_retries': 0}), \
+            mock.patch.dict('services.document_pipeline.CACHE_CONFIG', {'enabled': True}), \
+            mock.patch('openai.ChatCompletion.create', side_effect=RuntimeError('Azure is down')):
+        with pytest.raises(ExtractionFailedError):
+            DocumentPipeline(pool).process(document_id)
+
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM llm_result_cache')['n'] == 0
+    _, calls = extract(pool, document_id)
+    assert calls == 1
@@ -0,0 +1,122 @@
+"""
+Test file for the full-text search index and /api/search.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_search.py -v
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from database.migrations import apply_migrations
+from routes.pagination import encode_cursor
+from services.search_index import SearchIndex, build_match_query
+
+SOW = {
+    "scope_summary": {"in_scope": ["SAP integration for orders"], "out_of_scope": ["Marketing Cloud"]},
+    "modules": [{"module_name": "Service Cloud", "description": "Case handling",
+                 "processes": ["- Email-to-case routing"]}],
+    "business_units": [],
+    "salesforce_licenses": [{"license_type": "Service Cloud", "count": "40"}],
+    "assumptions": []
+}
+
+
+def seed_document(pool, workspace_id, document_id, file_name):
+    now = datetime.utcnow()
+    pool.execute_query(
+        '''INSERT OR IGNORE INTO workspaces (workspace_id, name, project_type, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (workspace_id, f"Workspace {workspace_id}", 'Greenfield', 'active', now, now)
+    )
+    pool.execute_query(
+        '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                  status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        (document_id, workspace_id, 'SOW', file_name, '/tmp/x', 'completed', now, now)
+    )
+    return pool.fetch_one('SELECT * FROM documents WHERE document_id = ?', (document_id,))
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('sap integration', '{title body} : ("sap" "integration")'),
+    ('integrat*', '{title body} : ("integrat"*)'),
+    ('"field service" OR', '{title body} : ("field service" "OR")'),
+    ('e-mail NEAR(', '{title body} : ("e mail" "NEAR")'),
+])
+def test_build_match_query_quotes_user_input(query, expected):
+    """Test FTS5 syntax in user input is neutralized into quoted terms"""
+    assert build_match_query(query) == expected
+
+
+def test_search_ranks_highlights_and_filters(client):
+    """Test hits come from text and SoW sections, escaped and marked, and honour filters"""
+    test_client, pool = client
+    index = SearchIndex(pool)
+    first = seed_document(pool, 'ws-1', 'doc-1', 'acme_sow.pdf')
+    second = seed_document(pool, 'ws-2', 'doc-2', 'globex_sow.pdf')
+    index.index_document(first, 'The <ERP> integrations run nightly.', 's-1', json.dumps(SOW))
+    index.index_document(second, 'Globex needs an SAP integration too.', None, None)
+
+    response = test_client.get('/api/search?q=integration')
+    hits = response.get_json()['items']
+    print(f"\nSearch hits: {[(hit['document_id'], hit['kind'], hit['snippet']) for hit in hits]}")
+    assert response.status_code == 200
+    assert {(hit['document_id'], hit['kind']) for hit in hits} == {('doc-1', 'text'), ('doc-1', 'scope'),
+                                                                   ('doc-2', 'text')}
+    text_hit = next(hit for hit in hits if hit['document_id'] == 'doc-1' and hit['kind'] == 'text')
+    assert text_hit['snippet'] == 'The &lt;ERP&gt; <mark>integrations</mark> run nightly.'
+    assert text_hit['workspace_name'] == 'Workspace ws-1'
+
+    filtered = test_client.get('/api/search?q=integration&workspace_id=ws-2').get_json()['items']
+    assert [hit['document_id'] for hit in filtered] == ['doc-2']
+    modules = test_client.get('/api/search?q=email&kind=modules').get_json()['items']
+    assert [(hit['document_id'], hit['stream_id']) for hit in modules] == [('doc-1', 's-1')]
+
+    # File names are weighted above body text
+    by_name = test_client.get('/api/search?q=globex').get_json()['items']
+    assert by_name[0]['title'] == '<mark>globex</mark>_sow.pdf'
+
+
+def test_reindexing_replaces_entries_and_pages(client):
+    """Test a reprocessed document drops its old entries and results page by cursor"""
+    test_client, pool = client
+    index = SearchIndex(pool)
+    document = seed_document(pool, 'ws-1', 'doc-1', 'sow.pdf')
+    index.index_document(document, 'Legacy mainframe migration', 's-1', json.dumps(SOW))
+    index.index_document(document, 'Cloud migration only', 's-2', json.dumps(SOW))
+
+    assert test_client.get('/api/search?q=mainframe').get_json()['items'] == []
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM search_index')['n'] == \
+        pool.fetch_one('SELECT COUNT(*) AS n FROM search_entries')['n']
+
+    page = test_client.get('/api/search?q=cloud&limit=1').get_json()
+    assert len(page['items']) == 1 and page['next_cursor'] == encode_cursor([1])
+    rest = test_client.get(f"/api/search?q=cloud&limit=10&cursor={page['next_cursor']}").get_json()
+    assert rest['next_cursor'] is None
+    assert page['items'][0] not in rest['items']
+
+
+def test_search_rejects_bad_input(client):
+    """Test empty queries and unknown kinds are 400s rather than FTS errors"""
+    test_client, _ = client
+    assert test_client.get('/api/search?q=%22%22').status_code == 400
+    assert test_client.get('/api/search?q=x&kind=nope').status_code == 400
+
+
+def test_backfill_runs_once_as_a_migration(client):
+    """Test migration 14 indexes documents completed before the index existed, and is not repeated"""
+    _, pool = client
+    seed_document(pool, 'ws-1', 'doc-1', 'acme_sow.pdf')
+    pool.execute_query(
+        '''INSERT INTO llm_streams (stream_id, document_id, response_payload, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        ('s-1', 'doc-1', json.dumps(SOW), 'success', '2024-01-01', '2024-01-01')
+    )
+    pool.execute_query('DELETE FROM schema_migrations WHERE version = ?', (14,))
+
+    assert 14 in apply_migrations(pool)
+    assert {hit['stream_id'] for hit in SearchIndex(pool).search('email routing')} == {'s-1'}
+    assert 14 not in apply_migrations(pool)
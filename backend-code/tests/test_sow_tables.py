@@ -0,0 +1,121 @@
+"""
+Test file for the normalized SoW tables and their query endpoints.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_sow_tables.py -v
+"""
+
+import json
+from datetime import datetime
+
+from database.migrations import apply_migrations
+from services.llm_service import LLMService
+from services.sow_store import SowStore
+
+SOW = {
+    "scope_summary": {"in_scope": ["- Lead management", "Field service scheduling"], "out_of_scope": ["CPQ"]},
+    "modules": [
+        {"module_name": "Field Service", "description": "Dispatch and scheduling",
+         "processes": ["- Work order creation", "- Technician dispatch"]}
+    ],
+    "business_units": [
+        {"business_unit_name": "Operations", "stakeholders": [
+            {"name": "Ana Ruiz", "designation": "COO", "email": "ana.ruiz@example.com"}]}
+    ],
+    "salesforce_licenses": [
+        {"license_type": "Field Service Lightning", "count": "1,200"},
+        {"license_type": "Sales Cloud", "count": "TBD"}
+    ]
+}
+
+
+def seed(pool, workspace_id, streams):
+    now = datetime.utcnow()
+    pool.execute_query(
+        '''INSERT INTO workspaces (workspace_id, name, project_type, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (workspace_id, f"Workspace {workspace_id}", 'Greenfield', 'active', now, now)
+    )
+    pool.execute_query(
+        '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                  status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        (f"{workspace_id}-doc", workspace_id, 'SOW', 'sow.txt', '/tmp/x', 'completed', now, now)
+    )
+    for stream_id, payload, created_at in streams:
+        pool.execute_query(
+            '''INSERT INTO llm_streams (stream_id, document_id, response_payload, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (stream_id, f"{workspace_id}-doc", json.dumps(payload), 'success', created_at, created_at)
+        )
+
+
+def test_sync_writes_indexed_rows_queryable_across_workspaces(client):
+    """Test extraction rows land in the tables and filters match case-insensitively"""
+    test_client, pool = client
+    seed(pool, 'ws-1', [('s-1', SOW, '2024-01-01')])
+    seed(pool, 'ws-2', [('s-2', dict(SOW, salesforce_licenses=[{"license_type": "Sales Cloud"}]), '2024-01-01')])
+    assert SowStore(pool).sync_all() == 2
+
+    licenses = test_client.get('/api/sow/licenses?license_type=field service lightning').get_json()
+    print(f"\nFSL licenses: {licenses['items']}")
+    assert [row['workspace_id'] for row in licenses['items']] == ['ws-1']
+    assert licenses['items'][0]['license_count'] == 1200
+    assert licenses['items'][0]['workspace_name'] == 'Workspace ws-1'
+
+    sales = test_client.get('/api/sow/licenses?license_type=Sales Cloud&limit=1').get_json()
+    assert len(sales['items']) == 1 and sales['next_cursor']
+    rest = test_client.get(f"/api/sow/licenses?license_type=Sales Cloud&cursor={sales['next_cursor']}").get_json()
+    assert {row['workspace_id'] for row in sales['items'] + rest['items']} == {'ws-1', 'ws-2'}
+
+    stakeholders = test_client.get('/api/sow/stakeholders?business_unit=OPERATIONS&workspace_id=ws-1').get_json()
+    assert [row['email'] for row in stakeholders['items']] == ['ana.ruiz@example.com']
+
+    processes = test_client.get('/api/sow/processes?module_name=Field Service&workspace_id=ws-1').get_json()
+    assert [row['process'] for row in processes['items']] == ['Work order creation', 'Technician dispatch']
+
+    scope = test_client.get('/api/sow/scope-items?scope=out&workspace_id=ws-1').get_json()
+    assert [row['item'] for row in scope['items']] == ['CPQ']
+
+
+def test_sync_follows_the_latest_stream_and_skips_unchanged(client):
+    """Test rows are replaced by a newer extraction and left alone when nothing changed"""
+    _, pool = client
+    renamed = dict(SOW, modules=[{"module_name": "Service Cloud", "processes": []}])
+    seed(pool, 'ws-1', [('s-old', SOW, '2024-01-01'), ('s-new', renamed, '2024-02-01')])
+    store = SowStore(pool)
+
+    assert store.sync_workspace('ws-1') is True
+    assert store.sync_workspace('ws-1') is False
+    modules = pool.fetch_all('SELECT module_name, stream_id FROM sow_modules WHERE workspace_id = ?', ('ws-1',))
+    assert modules == [{'module_name': 'Service Cloud', 'stream_id': 's-new'}]
+
+
+def test_fallback_payload_and_deleted_workspaces_are_hidden(client):
+    """Test a failed extraction clears the rows and deleted workspaces drop out of queries"""
+    test_client, pool = client
+    fallback = LLMService()._get_default_response('timeout')
+    seed(pool, 'ws-1', [('s-1', SOW, '2024-01-01')])
+    seed(pool, 'ws-2', [('s-2', SOW, '2024-01-01'), ('s-3', fallback, '2024-02-01')])
+    SowStore(pool).sync_all()
+
+    assert pool.fetch_all('SELECT id FROM sow_scope_items WHERE workspace_id = ?', ('ws-2',)) == []
+
+    pool.execute_query('UPDATE workspaces SET status = ? WHERE workspace_id = ?', ('deleted', 'ws-1'))
+    response = test_client.get('/api/sow/modules?module_name=Field Service')
+    assert response.status_code == 200
+    assert response.get_json()['items'] == []
+    assert test_client.get('/api/sow/unknown').status_code == 404
+    assert test_client.get('/api/sow/licenses?fields=nope').status_code == 400
+
+
+def test_backfill_runs_once_as_a_migration(client):
+    """Test migration 13 fills the tables for earlier extractions and is not repeated"""
+    _, pool = client
+    seed(pool, 'ws-1', [('s-1', SOW, '2024-01-01')])
+    # As on a database last migrated before the backfill shipped
+    pool.execute_query('DELETE FROM schema_migrations WHERE version = ?', (13,))
+
+    assert 13 in apply_migrations(pool)
+    assert pool.fetch_one('SELECT stream_id FROM sow_sources WHERE workspace_id = ?', ('ws-1',))['stream_id'] == 's-1'
+    assert 13 not in apply_migrations(pool)
@@ -0,0 +1,79 @@
+"""
+Test file for claiming and expiring reserved streamed extractions.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_stream_claims.py -v
+"""
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from services.document_pipeline import DocumentPipeline
+
+
+def upload(test_client, workspace_id, name):
+    return test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(b'Statement of work for Sales Cloud'), name)}
+    ).get_json()['document_id']
+
+
+def workspace(test_client):
+    return test_client.post('/api/workspaces', json={
+        'name': 'Streams', 'project_type': 'Greenfield', 'licenses': ['Sales Cloud']
+    }).get_json()['workspace_id']
+
+
+def test_only_one_client_claims_a_pending_stream(client):
+    """Test concurrent subscribers race on one conditional update and only one wins"""
+    test_client, pool = client
+    document_id = upload(test_client, workspace(test_client), 'sow.txt')
+    started = test_client.post(f"/api/documents/{document_id}/process?mode=stream").get_json()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        claims = list(executor.map(lambda _: DocumentPipeline(pool).claim_stream(started['stream_id']), range(8)))
+
+    assert claims.count(True) == 1
+    assert test_client.get(started['events_url']).status_code == 409
+
+
+def test_abandoned_streams_expire_and_release_their_documents(client):
+    """Test old unclaimed reservations fail with their documents, but not documents a job still holds"""
+    test_client, pool = client
+    workspace_id = workspace(test_client)
+    abandoned, queued, fresh = (upload(test_client, workspace_id, f"sow-{i}.txt") for i in range(3))
+    for document_id in (abandoned, queued, fresh):
+        test_client.post(f"/api/documents/{document_id}/process?mode=stream")
+    pool.execute_query('UPDATE llm_streams SET created_at = ? WHERE document_id IN (?, ?)',
+                       (datetime.utcnow() - timedelta(hours=1), abandoned, queued))
+    pool.execute_query(
+        '''INSERT INTO jobs (job_id, job_type, payload, status, attempts, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        ('job-1', 'process_document', f'{{"document_id": "{queued}"}}', 'queued', 0,
+         datetime.utcnow(), datetime.utcnow())
+    )
+
+    assert DocumentPipeline(pool).expire_stale_streams(600, 900) == 2
+
+    statuses = {row['document_id']: row['status'] for row in pool.fetch_all('SELECT document_id, status FROM documents')}
+    assert statuses == {abandoned: 'failed', queued: 'queued', fresh: 'queued'}
+    streams = {row['document_id']: row['status'] for row in pool.fetch_all('SELECT document_id, status FROM llm_streams')}
+    assert streams == {abandoned: 'failed', queued: 'failed', fresh: 'pending'}
+
+
+def test_unreadable_file_ends_the_stream_with_an_error_event(client):
+    """Test a failure outside the LLM still closes the SSE response with an error event and the reason"""
+    test_client, pool = client
+    document_id = upload(test_client, workspace(test_client), 'sow.txt')
+    started = test_client.post(f"/api/documents/{document_id}/process?mode=stream").get_json()
+    pool.execute_query('UPDATE documents SET storage_path = ? WHERE document_id = ?', ('missing.txt', document_id))
+
+    body = test_client.get(started['events_url']).get_data(as_text=True)
+
+    assert body.startswith('event: error\n')
+    error = json.loads(body.split('data: ', 1)[1])
+    print(f"\nStream error: {error['error']}")
+    assert error['stream']['status'] == 'failed'
+    assert pool.fetch_one('SELECT status FROM documents WHERE document_id = ?', (document_id,))['status'] == 'failed'
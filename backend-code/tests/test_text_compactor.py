@@ -0,0 +1,55 @@
+"""
+Test file for token-budget input compaction.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_text_compactor.py -v
+"""
+
+import os
+
+from services.text_compactor import compact_text, estimate_tokens
+
+SAMPLE_SOW_PATH = os.path.join(os.path.dirname(__file__), '..', 'sample_sow.txt')
+
+
+def build_pages(bodies):
+    return '\f'.join(
+        f"ACME Corp    Statement of Work    Confidential\n\n{body}\n\n\nPage {index + 1} of {len(bodies)}"
+        for index, body in enumerate(bodies)
+    )
+
+
+def test_strips_repeated_headers_and_page_numbers():
+    """Test header lines on every page and page numbers are dropped, content is kept"""
+    bodies = ['Scope: Sales Cloud rollout', 'Stakeholder: Jane Doe, CIO', 'Licenses: 50 Sales Cloud']
+    compacted, stats = compact_text(build_pages(bodies))
+
+    print("\n=== Testing Header Stripping ===")
+    print(f"Tokens: {stats['tokens_before']} -> {stats['tokens_after']}")
+    assert 'ACME Corp' not in compacted
+    assert 'Page' not in compacted
+    assert all(body in compacted for body in bodies)
+    assert stats['tokens_after'] < stats['tokens_before']
+
+
+def test_drops_boilerplate_sections_only():
+    """Test legal clauses and their sub-clauses go while similarly named scope headings stay"""
+    text = ('4. Modules\nService Cloud case management\n'
+            '11. Limitation of Liability\n11.1 Neither party is liable.\n11.2 Caps apply.\n'
+            '12. Warranty Claims Process\nTrack dealer warranty claims\n'
+            'GOVERNING LAW AND JURISDICTION\nThe laws of Delaware apply.')
+    compacted, _ = compact_text(text)
+
+    assert 'Neither party' not in compacted and 'Delaware' not in compacted
+    assert 'Service Cloud case management' in compacted
+    assert 'Track dealer warranty claims' in compacted
+
+
+def test_collapses_whitespace_without_touching_sample_content():
+    """Test whitespace runs shrink but every word of a clean document survives"""
+    with open(SAMPLE_SOW_PATH, encoding='utf-8') as file:
+        text = file.read()
+    compacted, stats = compact_text(text.replace(' ', '   '))
+
+    assert compacted.split() == text.split()
+    assert stats['tokens_after'] == estimate_tokens(text.strip())
@@ -0,0 +1,85 @@
+"""
+Test file for the extracted text store.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_text_store.py -v
+"""
+
+import hashlib
+import io
+from unittest import mock
+
+from services.document_pipeline import DocumentPipeline
+from services.document_processor import EXTRACTOR_VERSION, DocumentProcessor
+from services.text_store import ExtractedTextStore
+
+TEXT = 'Statement of work: Service Cloud rollout with email-to-case routing. ' * 200
+
+
+def upload(test_client, name, content=TEXT):
+    workspace_id = test_client.post('/api/workspaces', json={
+        'name': name, 'project_type': 'Greenfield', 'licenses': ['Service Cloud']
+    }).get_json()['workspace_id']
+    return test_client.post(
+        f"/api/documents/upload?workspace_id={workspace_id}",
+        data={'file': (io.BytesIO(content.encode('utf-8')), 'sow.txt')}
+    ).get_json()['document_id']
+
+
+def extract(pool, document_id):
+    """Extract a document's text, returning it and how many times a file was parsed"""
+    pipeline = DocumentPipeline(pool)
+    with mock.patch.object(DocumentProcessor, 'extract_text', autospec=True,
+                           side_effect=DocumentProcessor.extract_text) as parse:
+        text, _ = pipeline.prepare_text(pipeline.get_document(document_id))
+    return text, parse.call_count
+
+
+def test_store_and_load_round_trip(client, tmp_path):
+    """Test text comes back unchanged, compressed at rest, and only for the version that stored it"""
+    _, pool = client
+    path = tmp_path / 'sow.txt'
+    path.write_text(TEXT, encoding='utf-8')
+    store = ExtractedTextStore(pool)
+    content_hash = store.hash_file(str(path))
+    assert content_hash == hashlib.sha256(TEXT.encode('utf-8')).hexdigest()
+
+    store.put(content_hash, EXTRACTOR_VERSION, TEXT)
+
+    assert store.get(content_hash, EXTRACTOR_VERSION) == TEXT
+    assert store.get(content_hash, 'older') is None
+    row = pool.fetch_one('SELECT compressed_text, char_count FROM extracted_texts')
+    assert row['char_count'] == len(TEXT)
+    assert len(row['compressed_text']) < len(TEXT) / 10
+
+
+def test_same_file_in_two_documents_is_parsed_once(client):
+    """Test a second upload of identical content reads the stored text instead of parsing again"""
+    test_client, pool = client
+    first = upload(test_client, 'First')
+    second = upload(test_client, 'Second')
+
+    first_text, first_parses = extract(pool, first)
+    second_text, second_parses = extract(pool, second)
+
+    assert (first_parses, second_parses) == (1, 0)
+    assert first_text == second_text == TEXT.strip()
+    assert pool.fetch_one('SELECT COUNT(*) AS n FROM extracted_texts')['n'] == 1
+
+
+def test_missing_stored_text_falls_back_to_parsing(client):
+    """Test a document whose stored text is gone, or was stored by another extractor version, is parsed again"""
+    test_client, pool = client
+    document_id = upload(test_client, 'Missing')
+    extract(pool, document_id)
+
+    pool.execute_query('DELETE FROM extracted_texts', ())
+    text, parses = extract(pool, document_id)
+    assert (text, parses) == (TEXT.strip(), 1)
+
+    pool.execute_query('UPDATE extracted_texts SET extractor_version = ?', ('older',))
+    text, parses = extract(pool, document_id)
+    assert (text, parses) == (TEXT.strip(), 1)
+    # One row per file: the re-extracted text replaces the stale version's
+    versions = [row['extractor_version'] for row in pool.fetch_all('SELECT extractor_version FROM extracted_texts')]
+    assert versions == [EXTRACTOR_VERSION]
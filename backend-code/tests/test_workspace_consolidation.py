@@ -0,0 +1,107 @@
+"""
+Test file for the consolidated workspace view.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_workspace_consolidation.py -v
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+from services import workspace_consolidation
+from services.workspace_consolidation import WorkspaceConsolidator
+
+START = datetime(2024, 1, 1)
+
+
+def sow(module_name, license_type):
+    return {'scope_summary': {'in_scope': [f"{module_name} rollout"], 'out_of_scope': []},
+            'modules': [{'module_name': module_name, 'processes': [f"{module_name} setup"]}],
+            'business_units': [],
+            'salesforce_licenses': [{'license_type': license_type, 'count': '10'}],
+            'assumptions': [],
+            'validation_summary': {'json_validity': True, 'issues_detected': []}}
+
+
+def seed_document(pool, workspace_id, document_id, minute, result, previous_document_id=None):
+    created = START + timedelta(minutes=minute)
+    pool.execute_query(
+        '''INSERT OR IGNORE INTO workspaces (workspace_id, name, project_type, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        (workspace_id, 'Consolidated', 'Greenfield', 'active', START, START)
+    )
+    pool.execute_query(
+        '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                  previous_document_id, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        (document_id, workspace_id, 'SOW', f"{document_id}.txt", '/tmp/x', previous_document_id,
+         'completed', created, created)
+    )
+    pool.execute_query(
+        '''INSERT INTO llm_streams (stream_id, document_id, response_payload, status, created_at)
+           VALUES (?, ?, ?, ?, ?)''',
+        (f"s-{document_id}", document_id, json.dumps(result), 'success', created)
+    )
+
+
+def test_added_documents_fold_into_the_cached_result(client):
+    """Test a new document is merged onto the cached result without re-reading the others"""
+    _, pool = client
+    consolidator = WorkspaceConsolidator(pool)
+    seed_document(pool, 'ws-1', 'doc-1', 1, sow('Sales Cloud', 'Sales Cloud'))
+    seed_document(pool, 'ws-1', 'doc-2', 2, sow('Service Cloud', 'Sales Cloud'))
+    consolidator.refresh('ws-1')
+
+    seed_document(pool, 'ws-1', 'doc-3', 3, sow('Sales Cloud', 'Service Cloud'))
+    with mock.patch.object(workspace_consolidation, 'merge_sow_results',
+                           wraps=workspace_consolidation.merge_sow_results) as merge, \
+            mock.patch('openai.ChatCompletion.create') as create:
+        consolidated = consolidator.refresh('ws-1')
+        consolidator.refresh('ws-1')
+
+    # Cached result plus the one new extraction; the second refresh had nothing to do
+    assert merge.call_count == 1
+    assert len(merge.call_args.args[0]) == 2
+    assert create.call_count == 0
+
+    result = consolidated['result_payload']
+    print(f"\nConsolidated modules: {result['modules']}")
+    assert [module['module_name'] for module in result['modules']] == ['Sales Cloud', 'Service Cloud']
+    assert [item['license_type'] for item in result['salesforce_licenses']] == ['Sales Cloud', 'Service Cloud']
+    assert consolidated['sources'] == [['doc-1', 's-doc-1'], ['doc-2', 's-doc-2'], ['doc-3', 's-doc-3']]
+
+
+def test_removed_and_superseded_documents_fold_out(client):
+    """Test deleting a document or completing a revision drops the old contribution"""
+    test_client, pool = client
+    seed_document(pool, 'ws-1', 'doc-1', 1, sow('Sales Cloud', 'Sales Cloud'))
+    seed_document(pool, 'ws-1', 'doc-2', 2, sow('Service Cloud', 'Service Cloud'))
+    first = test_client.get('/api/workspaces/ws-1/consolidated')
+    assert first.status_code == 200
+    assert test_client.get('/api/workspaces/ws-1/consolidated',
+                           headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    assert test_client.delete('/api/documents/doc-2').status_code == 200
+    response = test_client.get('/api/workspaces/ws-1/consolidated').get_json()
+    assert [module['module_name'] for module in response['sow_data']['modules']] == ['Sales Cloud']
+    assert response['sources'] == [{'document_id': 'doc-1', 'stream_id': 's-doc-1'}]
+
+    seed_document(pool, 'ws-1', 'doc-1-v2', 3, sow('Field Service', 'Sales Cloud'), 'doc-1')
+    response = test_client.get('/api/workspaces/ws-1/consolidated').get_json()
+    assert [module['module_name'] for module in response['sow_data']['modules']] == ['Field Service']
+    assert test_client.get('/api/workspaces/missing/consolidated').status_code == 404
+    assert test_client.delete('/api/documents/doc-2').status_code == 404
+
+
+def test_unchanged_view_is_served_without_the_write_lock(client):
+    """Test polling an up-to-date view never opens a write transaction"""
+    test_client, pool = client
+    seed_document(pool, 'ws-1', 'doc-1', 1, sow('Sales Cloud', 'Sales Cloud'))
+    assert test_client.get('/api/workspaces/ws-1/consolidated').status_code == 200
+
+    with mock.patch.object(type(pool), 'transaction', side_effect=AssertionError('write lock taken')):
+        response = test_client.get('/api/workspaces/ws-1/consolidated')
+
+    assert response.status_code == 200
+    assert [module['module_name'] for module in response.get_json()['sow_data']['modules']] == ['Sales Cloud']
@@ -0,0 +1,78 @@
+"""
+Test file for the consolidated workspace data endpoint.
+
+Run this file after completing backend changes to verify functionality:
+python -m pytest tests/test_workspace_data.py -v
+"""
+
+import json
+from datetime import datetime
+
+
+def seed_workspace(pool):
+    now = datetime.utcnow()
+    pool.execute_query(
+        '''INSERT INTO workspaces (workspace_id, name, project_type, licenses, status, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        ('ws-1', 'Acme', 'Greenfield', json.dumps(['Sales Cloud']), 'active', now, now)
+    )
+    for document_id, status, created_at in (('doc-old', 'completed', '2024-01-01'),
+                                            ('doc-new', 'completed', '2024-02-01'),
+                                            ('doc-failed', 'failed', '2024-03-01')):
+        pool.execute_query(
+            '''INSERT INTO documents (document_id, workspace_id, document_type, file_name, storage_path,
+                                      status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (document_id, 'ws-1', 'SOW', f"{document_id}.txt", '/tmp/x', status, created_at, created_at)
+        )
+    for stream_id, status, created_at in (('s-1', 'success', '2024-02-01'),
+                                          ('s-2', 'success', '2024-02-02'),
+                                          ('s-3', 'failed', '2024-02-03')):
+        pool.execute_query(
+            '''INSERT INTO llm_streams (stream_id, document_id, response_payload, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (stream_id, 'doc-new', json.dumps({'modules': [stream_id]}), status, created_at, created_at)
+        )
+
+
+def test_returns_latest_completed_document_and_stream(client):
+    """Test the newest completed document and its newest successful stream are returned"""
+    test_client, pool = client
+    seed_workspace(pool)
+
+    response = test_client.get('/api/workspaces/ws-1/data')
+    data = response.get_json()
+
+    print(f"\nWorkspace data keys: {sorted(data)}")
+    assert response.status_code == 200
+    assert data['workspace']['licenses'] == ['Sales Cloud']
+    assert data['document']['document_id'] == 'doc-new'
+    assert data['stream']['stream_id'] == 's-2'
+    assert data['sow_data'] == {'modules': ['s-2']}
+
+
+def test_conditional_get_returns_304_until_data_changes(client):
+    """Test If-None-Match short-circuits until a row's updated_at changes"""
+    test_client, pool = client
+    seed_workspace(pool)
+
+    etag = test_client.get('/api/workspaces/ws-1/data').headers['ETag']
+    cached = test_client.get('/api/workspaces/ws-1/data', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    pool.execute_query('UPDATE llm_streams SET updated_at = ? WHERE stream_id = ?', ('2024-05-01', 's-2'))
+    changed = test_client.get('/api/workspaces/ws-1/data', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_workspace_without_documents(client):
+    """Test an empty workspace returns nulls and unknown workspaces 404"""
+    test_client, pool = client
+    seed_workspace(pool)
+    pool.execute_query('DELETE FROM documents', ())
+
+    data = test_client.get('/api/workspaces/ws-1/data').get_json()
+    assert (data['document'], data['stream'], data['sow_data']) == (None, None, None)
+    assert test_client.get('/api/workspaces/missing/data').status_code == 404
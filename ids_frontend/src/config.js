@@ -1,5 +1,7 @@
 const config = {
   apiBaseUrl: process.env.REACT_APP_API_BASE_URL || 'http://localhost:5000/api',
+  maxUploadSize: 500 * 1024 * 1024,
+  chunkRetries: 3,
 };
 
 export default config;
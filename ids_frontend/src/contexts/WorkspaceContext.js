@@ -1,5 +1,5 @@
 import React, { createContext, useState, useContext, useCallback } from 'react';
-import { workspaceAPI, documentAPI, llmAPI } from '../services/api';
+import { workspaceAPI, documentAPI, llmAPI, uploadResumable } from '../services/api';
 
 const WorkspaceContext = createContext();
 
@@ -11,19 +11,21 @@ export const useWorkspace = () => {
   return context;
 };
 
-const useFetchWorkspaces = (setWorkspaces, setLoading, setError) => {
-  return useCallback(async () => {
+const useFetchWorkspaces = (setWorkspaces, setNextCursor, setLoading, setError) => {
+  return useCallback(async (cursor = null) => {
     try {
       setLoading(true);
       setError(null);
-      const response = await workspaceAPI.getAll();
-      setWorkspaces(response.data);
+      const response = await workspaceAPI.getAll(cursor ? { cursor } : {});
+      const { items, next_cursor: nextCursor } = response.data;
+      setWorkspaces((prev) => (cursor ? [...prev, ...items] : items));
+      setNextCursor(nextCursor);
     } catch (err) {
       setError(err.message || 'Failed to fetch workspaces');
     } finally {
       setLoading(false);
     }
-  }, [setWorkspaces, setLoading, setError]);
+  }, [setWorkspaces, setNextCursor, setLoading, setError]);
 };
 
 const useCreateWorkspace = (setWorkspaces, setCurrentWorkspace, setLoading, setError) => {
@@ -79,19 +81,35 @@ const useDeleteWorkspace = (setWorkspaces, setLoading, setError) => {
   }, [setWorkspaces, setLoading, setError]);
 };
 
+const streamExtraction = (streamId, setSowData) => new Promise((resolve, reject) => {
+  const source = new EventSource(llmAPI.eventsUrl(streamId));
+  source.addEventListener('section', (event) => {
+    const { key, value } = JSON.parse(event.data);
+    setSowData((prev) => ({ ...(prev || {}), [key]: value }));
+  });
+  source.addEventListener('done', (event) => {
+    source.close();
+    resolve(JSON.parse(event.data));
+  });
+  // Fires for the server's own 'error' event, which carries data, and for a dropped connection
+  source.addEventListener('error', (event) => {
+    source.close();
+    const reason = event.data ? JSON.parse(event.data).error : null;
+    reject(new Error(reason || 'Lost connection while processing document'));
+  });
+});
+
 const useUploadAndProcess = (setCurrentDocument, setSowData, setLoading, setError) => {
   return useCallback(async (workspaceId, file) => {
     try {
       setLoading(true);
       setError(null);
-      const formData = new FormData();
-      formData.append('file', file);
-      formData.append('document_type', 'SOW');
-      const uploadResponse = await documentAPI.upload(workspaceId, formData);
+      const uploadResponse = await uploadResumable(workspaceId, file);
       const document = uploadResponse.data;
       setCurrentDocument(document);
-      const processResponse = await documentAPI.process(document.document_id);
-      const streamData = processResponse.data;
+      setSowData(null);
+      const processResponse = await documentAPI.processStream(document.document_id);
+      const streamData = await streamExtraction(processResponse.data.stream_id, setSowData);
       if (streamData.response_payload) {
         setSowData(JSON.parse(streamData.response_payload));
       }
@@ -168,6 +186,7 @@ const useLoadWorkspaceData = (setCurrentWorkspace, setSowData, setCurrentDocumen
 
 export const WorkspaceProvider = ({ children }) => {
   const [workspaces, setWorkspaces] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [currentWorkspace, setCurrentWorkspace] = useState(null);
   const [currentDocument, setCurrentDocument] = useState(null);
   const [sowData, setSowData] = useState(null);
@@ -181,7 +200,7 @@ export const WorkspaceProvider = ({ children }) => {
     duration: 4000
   });
 
-  const fetchWorkspaces = useFetchWorkspaces(setWorkspaces, setLoading, setError);
+  const fetchWorkspaces = useFetchWorkspaces(setWorkspaces, setNextCursor, setLoading, setError);
   const createWorkspace = useCreateWorkspace(setWorkspaces, setCurrentWorkspace, setLoading, setError);
   const updateWorkspace = useUpdateWorkspace(setWorkspaces, setLoading, setError);
   const deleteWorkspace = useDeleteWorkspace(setWorkspaces, setLoading, setError);
@@ -189,6 +208,10 @@ export const WorkspaceProvider = ({ children }) => {
   const loadSowData = useLoadSowData(setSowData, setLoading, setError);
   const loadWorkspaceData = useLoadWorkspaceData(setCurrentWorkspace, setSowData, setCurrentDocument, setLoading, setError);
 
+  const fetchMoreWorkspaces = useCallback(() => {
+    if (nextCursor) fetchWorkspaces(nextCursor);
+  }, [fetchWorkspaces, nextCursor]);
+
   const clearWorkspaceData = useCallback(() => {
     setCurrentWorkspace(null);
     setCurrentDocument(null);
@@ -222,7 +245,8 @@ export const WorkspaceProvider = ({ children }) => {
 
   const value = {
     workspaces, currentWorkspace, currentDocument, sowData, loading, error,
-    fetchWorkspaces, createWorkspace, updateWorkspace, deleteWorkspace,
+    hasMoreWorkspaces: Boolean(nextCursor),
+    fetchWorkspaces, fetchMoreWorkspaces, createWorkspace, updateWorkspace, deleteWorkspace,
     uploadAndProcessDocument, loadSowData, loadWorkspaceData, clearWorkspaceData,
     setCurrentWorkspace, setSowData,
     sidebarCollapsed, toggleSidebar, collapseSidebar, expandSidebar,
@@ -3,6 +3,7 @@ import './DocumentUploadModal.css';
 import Modal from '../../components/common/Modal';
 import Button from '../../components/common/Button';
 import { useWorkspace } from '../../contexts/WorkspaceContext';
+import config from '../../config';
 
 const FileInfo = ({ file, loading, onRemove }) => (
   <div className="document-upload-file-info">
@@ -23,7 +24,7 @@ const EmptyDropzone = () => (
   <>
     <span className="material-symbols-outlined document-upload-icon">cloud_upload</span>
     <p className="document-upload-text"><strong>Click to upload</strong> or drag and drop</p>
-    <p className="document-upload-hint">PDF, DOC, DOCX, or TXT (Max 10MB)</p>
+    <p className="document-upload-hint">PDF, DOC, DOCX, or TXT (Max 500MB)</p>
   </>
 );
 
@@ -33,8 +34,8 @@ const validateFile = (file) => {
   if (!validTypes.includes(file.type)) {
     return 'Please upload a valid document (PDF, DOC, DOCX, or TXT)';
   }
-  if (file.size > 10 * 1024 * 1024) {
-    return 'File size must be less than 10MB';
+  if (file.size > config.maxUploadSize) {
+    return 'File size must be less than 500MB';
   }
   return null;
 };
@@ -91,7 +91,7 @@ const useWorkspaceHandlers = (workspaces, loading, error, fetchWorkspaces, delet
 
 const WorkspaceList = () => {
   const { workspaces, loading, error, fetchWorkspaces, deleteWorkspace, 
-    currentWorkspace, sowData, loadWorkspaceData, collapseSidebar, showSnackbar } = useWorkspace();
+    hasMoreWorkspaces, fetchMoreWorkspaces, currentWorkspace, sowData, loadWorkspaceData, collapseSidebar, showSnackbar } = useWorkspace();
   
   const {
     isFormOpen, setIsFormOpen,
@@ -126,6 +126,11 @@ const WorkspaceList = () => {
           ))}
         </div>
       )}
+      {hasMoreWorkspaces && (
+        <div className="workspace-list-more">
+          <Button onClick={fetchMoreWorkspaces} variant="secondary" loading={loading}>Load more</Button>
+        </div>
+      )}
       {!loading && workspaces.length === 0 && <EmptyState onCreate={handleCreateNew} />}
       <WorkspaceForm isOpen={isFormOpen} onClose={() => setIsFormOpen(false)}
         onSuccess={handleFormSuccess} workspace={editingWorkspace} />
@@ -9,7 +9,7 @@ const api = axios.create({
 });
 
 export const workspaceAPI = {
-  getAll: () => api.get('/workspaces'),
+  getAll: (params = {}) => api.get('/workspaces', { params }),
   getById: (id) => api.get(`/workspaces/${id}`),
   getData: (id) => api.get(`/workspaces/${id}/data`),
   create: (data) => api.post('/workspaces', data),
@@ -26,13 +26,92 @@ export const documentAPI = {
       params: { workspace_id: workspaceId },
     });
   },
+  uploadBatch: (workspaceId, files, { process = false } = {}) => {
+    const formData = new FormData();
+    files.forEach((file) => formData.append('files', file));
+    return api.post(`/documents/upload/batch`, formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+      params: { workspace_id: workspaceId, process },
+    });
+  },
   process: (documentId) => api.post(`/documents/${documentId}/process`),
+  processStream: (documentId) => api.post(`/documents/${documentId}/process`, null, {
+    params: { mode: 'stream' },
+  }),
   getById: (documentId) => api.get(`/documents/${documentId}`),
-  getByWorkspace: (workspaceId) => api.get(`/documents/workspace/${workspaceId}`),
+  getVersions: (documentId) => api.get(`/documents/${documentId}/versions`),
+  getByWorkspace: (workspaceId, params = {}) => api.get(`/documents/workspace/${workspaceId}`, { params }),
+};
+
+export const uploadAPI = {
+  create: (data) => api.post('/documents/uploads', data),
+  getById: (uploadId) => api.get(`/documents/uploads/${uploadId}`),
+  appendChunk: (uploadId, offset, chunk) => api.put(`/documents/uploads/${uploadId}`, chunk, {
+    headers: { 'Content-Type': 'application/octet-stream' },
+    params: { offset },
+  }),
+  complete: (uploadId) => api.post(`/documents/uploads/${uploadId}/complete`, {}),
+  abort: (uploadId) => api.delete(`/documents/uploads/${uploadId}`),
+};
+
+const uploadKey = (workspaceId, file) => `upload:${workspaceId}:${file.name}:${file.size}:${file.lastModified}`;
+
+const openUpload = async (workspaceId, file, documentType, previousDocumentId) => {
+  const savedId = localStorage.getItem(uploadKey(workspaceId, file));
+  if (savedId) {
+    try {
+      const response = await uploadAPI.getById(savedId);
+      if (response.data.status === 'open') return response.data;
+    } catch (err) {
+      // Unknown or expired session, start a new one
+    }
+  }
+  const response = await uploadAPI.create({
+    workspace_id: workspaceId, file_name: file.name, total_size: file.size, document_type: documentType,
+    previous_document_id: previousDocumentId,
+  });
+  localStorage.setItem(uploadKey(workspaceId, file), response.data.upload_id);
+  return response.data;
+};
+
+// Sends the file in chunks; a retried or reloaded upload carries on from the server's received_bytes.
+// Pass previousDocumentId to upload a revision, so only its changed sections are re-extracted.
+export const uploadResumable = async (
+  workspaceId, file, { documentType = 'SOW', previousDocumentId = null, onProgress } = {}
+) => {
+  const session = await openUpload(workspaceId, file, documentType, previousDocumentId);
+  let offset = session.received_bytes;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      const response = await uploadAPI.appendChunk(
+        session.upload_id, offset, file.slice(offset, offset + session.chunk_size)
+      );
+      offset = response.data.received_bytes;
+      failures = 0;
+      if (onProgress) onProgress(offset / file.size);
+    } catch (err) {
+      failures += 1;
+      if (failures > config.chunkRetries) throw err;
+      const status = await uploadAPI.getById(session.upload_id);
+      offset = status.data.received_bytes;
+    }
+  }
+  const response = await uploadAPI.complete(session.upload_id);
+  localStorage.removeItem(uploadKey(workspaceId, file));
+  return response;
 };
 
 export const llmAPI = {
   getLatestStream: (documentId) => api.get(`/llm-streams/document/${documentId}/latest`),
+  getStream: (streamId) => api.get(`/llm-streams/${streamId}`),
+  eventsUrl: (streamId) => `${config.apiBaseUrl}/llm-streams/${streamId}/events`,
+};
+
+export const jobAPI = {
+  getById: (jobId) => api.get(`/jobs/${jobId}`),
 };
 
 export default api;